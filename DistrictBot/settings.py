@@ -19,6 +19,26 @@ WHATSAPP_ACCESS_TOKEN = "EAAxqmpy3mjcBQgM8GbbZAGnZCBeroyFeXc54w2ZAXGVggZBsb2TGSa
 WHATSAPP_VERIFY_TOKEN = "district_verify"
 WHATSAPP_BUSINESS_ACCOUNT_ID = "1491606039636455"
 WHATSAPP_BUSINESS_ID = "1491606039636455"
+WHATSAPP_GRAPH_URL = os.getenv("WHATSAPP_GRAPH_URL", "https://graph.facebook.com/v21.0")
+# Outbound Graph API HTTP client: keep-alive pool size per worker, (connect, read) timeouts in seconds
+WHATSAPP_HTTP_POOL_SIZE = int(os.getenv("WHATSAPP_HTTP_POOL_SIZE", "10"))
+WHATSAPP_CONNECT_TIMEOUT = float(os.getenv("WHATSAPP_CONNECT_TIMEOUT", "3.05"))
+WHATSAPP_READ_TIMEOUT = float(os.getenv("WHATSAPP_READ_TIMEOUT", "15"))
+# Outbox: store sends in OutboundMessage and deliver them with `python manage.py send_outbox`
+WHATSAPP_OUTBOX = os.getenv("WHATSAPP_OUTBOX", "false").lower() in ("1", "true", "yes")
+OUTBOX_RATE_PER_SECOND = float(os.getenv("OUTBOX_RATE_PER_SECOND", "20"))  # per WHATSAPP_PHONE_ID
+OUTBOX_BURST = int(os.getenv("OUTBOX_BURST", "40"))
+OUTBOX_RECIPIENT_RATE_PER_SECOND = float(os.getenv("OUTBOX_RECIPIENT_RATE_PER_SECOND", "1"))
+OUTBOX_RECIPIENT_BURST = int(os.getenv("OUTBOX_RECIPIENT_BURST", "5"))
+
+# Webhook processing mode:
+#   "sync"  – run the flow inside the webhook request (default)
+#   "queue" – store the payload and ack immediately; run `python manage.py process_inbound`
+WEBHOOK_MODE = os.getenv("WEBHOOK_MODE", "sync")
+# Parallel lanes used by process_inbound; one phone number always maps to the same lane
+INBOUND_LANES = int(os.getenv("INBOUND_LANES", "4"))
+# Attempts per queued payload (with backoff) before it is marked failed
+INBOUND_MAX_ATTEMPTS = int(os.getenv("INBOUND_MAX_ATTEMPTS", "5"))
 
 # Support contact phone (used in complaint follow-up and FAQ responses)
 SUPPORT_PHONE = "255 000 000 000"
@@ -27,12 +47,69 @@ SUPPORT_PHONE = "255 000 000 000"
 # NOTE: no default value here – the key must come from the environment.
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+# OpenAI client: pooled connections, split timeouts, retries on 429/5xx and a circuit breaker
+OPENAI_HTTP_POOL_SIZE = int(os.getenv("OPENAI_HTTP_POOL_SIZE", "10"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "3.05"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "20"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_BREAKER_THRESHOLD = int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5"))
+OPENAI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("OPENAI_BREAKER_COOLDOWN_SECONDS", "30"))
+OPENAI_STATS_LOG_SECONDS = float(os.getenv("OPENAI_STATS_LOG_SECONDS", "300"))
+# Prompts include only the taarifa excerpts relevant to the question (0 = send the whole text)
+AI_CONTEXT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "1500"))
+AI_CONTEXT_TOP_K = int(os.getenv("AI_CONTEXT_TOP_K", "6"))
+# Upper bound on the time spent producing one reply (crawl + OpenAI calls); then the fallback reply is sent
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "25"))
+# Start the document-only and website answers of a free-form question concurrently (costs extra tokens)
+AI_SPECULATIVE = os.getenv("AI_SPECULATIVE", "false").lower() in ("1", "true", "yes")
+AI_SPECULATIVE_WORKERS = int(os.getenv("AI_SPECULATIVE_WORKERS", "8"))
+# How long rewritten/generated AI answers stay in the shared cache (seconds)
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Free-form question answers, keyed on the normalized question; "not available" answers expire sooner
+AI_QA_CACHE_TTL_SECONDS = int(os.getenv("AI_QA_CACHE_TTL_SECONDS", str(24 * 3600)))
+AI_QA_NEGATIVE_TTL_SECONDS = int(os.getenv("AI_QA_NEGATIVE_TTL_SECONDS", str(15 * 60)))
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
-# Logo image URL sent with welcome message
+# Logo image URL sent with welcome message (uploaded once to WhatsApp; the media id is cached)
 LOGO_URL = "https://olodonyotech.s3.eu-north-1.amazonaws.com/chemba/chemba.jpeg"
 
+# Runtime files (shared cache, generated data); must be writable by every worker
+RUNTIME_DIR = Path(os.getenv("RUNTIME_DIR", BASE_DIR / "var"))
+# Answers generated offline by `manage.py pregenerate_answers` (served before any live OpenAI call)
+PREGENERATED_ANSWERS_PATH = Path(os.getenv("PREGENERATED_ANSWERS_PATH", RUNTIME_DIR / "pregenerated_answers.json"))
+# Content catalog compiled from chatbot/texts/<lang>.json by `manage.py compile_content` (hot-reloaded)
+CONTENT_CATALOG_PATH = Path(os.getenv("CONTENT_CATALOG_PATH", RUNTIME_DIR / "content.json"))
+
+# Text of chembadc.go.tz written by `manage.py crawl_chembadc` (run from cron) and read by the bot
+CHEMBADC_SNAPSHOT_PATH = Path(os.getenv("CHEMBADC_SNAPSHOT_PATH", RUNTIME_DIR / "chembadc_snapshot.json"))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "8"))
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))
+
+# Chat sessions (chatbot/sessions.py): "db" (default, any number of workers/hosts), "cache" (reads
+# from the shared Django cache, saves to the DB) or "lru" (this process only: one message worker)
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "db")
+CHAT_SESSION_IDLE_SECONDS = int(os.getenv("CHAT_SESSION_IDLE_SECONDS", "600"))
+# A turn whose session was saved by another worker meanwhile is re-run up to this many times in all
+CHAT_SESSION_SAVE_ATTEMPTS = int(os.getenv("CHAT_SESSION_SAVE_ATTEMPTS", "3"))
+CHAT_SESSION_LRU_SIZE = int(os.getenv("CHAT_SESSION_LRU_SIZE", "10000"))
+CHAT_SESSION_WRITE_BEHIND_SECONDS = float(os.getenv("CHAT_SESSION_WRITE_BEHIND_SECONDS", "1.0"))
+
+# Ticket ids DCT-YYMMDD-NNNN (chatbot/tickets.py): numbers reserved from the DB per round trip.
+# 1 keeps ids strictly increasing across processes; larger blocks trade that for throughput.
+TICKET_ID_BLOCK_SIZE = int(os.getenv("TICKET_ID_BLOCK_SIZE", "1"))
+
+# Cache shared by all gunicorn workers on this host (WhatsApp media ids, AI answers, ...)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": RUNTIME_DIR / "cache",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
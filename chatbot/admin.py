@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import ChatSession, Ticket
+from django.utils import timezone
+from .models import ChatSession, Ticket, InboundEvent, ProcessedMessage, OutboundMessage
 
 
 @admin.register(ChatSession)
@@ -16,3 +17,32 @@ class TicketAdmin(admin.ModelAdmin):
     list_filter = ("ticket_type", "status")
     search_fields = ("ticket_id", "phone_number", "message")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(InboundEvent)
+class InboundEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "next_attempt_at", "created_at", "processed_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "processed_at", "locked_at")
+    actions = ["retry_events"]
+
+    @admin.action(description="Retry selected events now")
+    def retry_events(self, request, queryset):
+        count = queryset.exclude(status=InboundEvent.STATUS_PROCESSING).update(
+            status=InboundEvent.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(), locked_at=None
+        )
+        self.message_user(request, f"{count} event(s) queued for processing.")
+
+
+@admin.register(ProcessedMessage)
+class ProcessedMessageAdmin(admin.ModelAdmin):
+    list_display = ("wamid", "created_at")
+    search_fields = ("wamid",)
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ("id", "to", "status", "attempts", "next_attempt_at", "wamid", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to", "wamid")
+    readonly_fields = ("created_at", "sent_at", "locked_at")
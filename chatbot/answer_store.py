@@ -0,0 +1,45 @@
+# chatbot/answer_store.py – versioned file of pre-generated AI answers
+import logging
+from datetime import datetime, timezone
+
+from .jsonfile import JsonFile, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerStore(JsonFile):
+    """
+    JSON file mapping cache keys to pre-generated answers, written by
+    `manage.py pregenerate_answers` and read by every worker.
+
+    The file records the version it was generated for; if that differs from the
+    running version the whole store is treated as stale and ignored. The file is
+    re-read when it changes (checked at most every `check_interval` seconds).
+    """
+
+    def parse(self, data):
+        if not isinstance(data, dict):
+            raise ValueError("not a pre-generated answer store")
+        answers = dict(data.get("answers") or {})
+        logger.info("ChembaBot: loaded %s pre-generated answers (version=%s)", len(answers), data.get("version"))
+        return {"version": data.get("version"), "answers": answers}
+
+    def get(self, key, version):
+        """Answer for key, or None if the store is missing, stale (other version) or lacks the key."""
+        data = self.data
+        if data is None or data["version"] != version:
+            return None
+        return data["answers"].get(key)
+
+    def write(self, version, answers):
+        """Atomically replace the store with `answers` generated for `version`."""
+        write_json(
+            self.path,
+            {
+                "version": version,
+                "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "answers": answers,
+            },
+            indent=1,
+        )
+        self.reload()
@@ -1,17 +1,12 @@
 # chatbot/api_views.py – REST API for swali and malalamiko (no auth)
 import json
-import random
-import string
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 from .models import Ticket
-
-
-def _generate_ticket_id():
-    return "DCT-" + "".join(random.choices(string.digits, k=5))
+from .tickets import next_ticket_id
 
 
 @csrf_exempt
@@ -29,7 +24,7 @@ def api_submit_swali(request):
     question = (body.get("question") or "").strip()
     if not question:
         return JsonResponse({"error": "question is required"}, status=400)
-    ticket_id = _generate_ticket_id()
+    ticket_id = next_ticket_id()
     Ticket.objects.create(
         phone_number="api",
         ticket_type=Ticket.TYPE_QUESTION,
@@ -51,10 +46,7 @@ def api_get_swali_answer(request, question_id):
     POST /api/swali/<question_id>/
     Returns question, status, and answer from dashboard admin only. No AI / no internet.
     """
-    ticket = Ticket.objects.filter(
-        ticket_id=question_id,
-        ticket_type=Ticket.TYPE_QUESTION,
-    ).first()
+    ticket = Ticket.objects.lookup(question_id, Ticket.TYPE_QUESTION).first()
     if not ticket:
         return JsonResponse({"error": "Question not found"}, status=404)
     return JsonResponse({
@@ -85,7 +77,7 @@ def api_submit_malalamiko(request):
     if not message:
         return JsonResponse({"error": "message is required"}, status=400)
     department = (body.get("department") or "").strip()
-    ticket_id = _generate_ticket_id()
+    ticket_id = next_ticket_id()
     Ticket.objects.create(
         phone_number="api",
         ticket_type=Ticket.TYPE_COMPLAINT,
@@ -109,10 +101,7 @@ def api_get_malalamiko(request, malalamiko_id):
     POST /api/malalamiko/<malalamiko_id>/
     Returns status and answer (feedback) from dashboard admin only. No AI / no internet.
     """
-    ticket = Ticket.objects.filter(
-        ticket_id=malalamiko_id,
-        ticket_type=Ticket.TYPE_COMPLAINT,
-    ).first()
+    ticket = Ticket.objects.lookup(malalamiko_id, Ticket.TYPE_COMPLAINT).first()
     if not ticket:
         return JsonResponse({"error": "Malalamiko not found"}, status=404)
     return JsonResponse({
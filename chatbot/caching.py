@@ -0,0 +1,251 @@
+# chatbot/caching.py – in-process and shared caching helpers
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU mapping with an optional time-to-live per entry.
+    Expired entries are dropped lazily on access; the oldest entry is evicted when full.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at | None, value)
+        self._lock = threading.Lock()
+
+    def _expiry(self, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def _get_live(self, key):
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return _MISSING
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (self._expiry(ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get_live(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value=True, ttl=None):
+        """Store value only if key is absent (or expired). Returns True if it was stored."""
+        with self._lock:
+            if self._get_live(key) is not _MISSING:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_live(key) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+def make_key(*parts):
+    """Stable hex digest of the given parts (used as cache key)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-level cache for expensive responses (e.g. OpenAI answers).
+
+    Reads hit an in-process LRU first (microseconds) and then the shared Django cache,
+    which every gunicorn worker on the host can read. invalidate() bumps a namespace
+    generation stored in the shared cache; other workers pick it up within
+    GENERATION_CHECK_SECONDS. `hits` / `misses` count lookups in this process.
+    """
+
+    GENERATION_CHECK_SECONDS = 5
+
+    def __init__(self, namespace, ttl=None, local_maxsize=256):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._local = LRUCache(maxsize=local_maxsize, ttl=ttl)
+        self._generation = None
+        self._generation_checked = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _generation_value(self):
+        now = time.monotonic()
+        if self._generation is None or now - self._generation_checked > self.GENERATION_CHECK_SECONDS:
+            try:
+                self._generation = cache.get(f"{self.namespace}:generation") or 0
+            except Exception:
+                self._generation = self._generation or 0
+            self._generation_checked = now
+        return self._generation
+
+    def _full_key(self, key):
+        return f"{self.namespace}:{self._generation_value()}:{key}"
+
+    def get(self, key, default=None):
+        full_key = self._full_key(key)
+        value = self._local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        try:
+            value = cache.get(full_key, _MISSING)
+        except Exception:
+            value = _MISSING
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._local.set(full_key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        full_key = self._full_key(key)
+        ttl = self.ttl if ttl is None else ttl
+        self._local.set(full_key, value, ttl=ttl)
+        try:
+            cache.set(full_key, value, ttl)
+        except Exception:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def invalidate(self):
+        """Drop every entry of this namespace (in all workers)."""
+        generation = self._generation_value() + 1
+        try:
+            cache.set(f"{self.namespace}:generation", generation, None)
+        except Exception:
+            pass
+        self._generation = generation
+        self._generation_checked = time.monotonic()
+        self._local.clear()
+
+
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (leader) runs the
+    function, later callers block until it finishes and share its result (or exception).
+
+    refresh() starts the call in a background thread instead, for serving stale content
+    while it is recomputed. Counters are per process.
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.background = 0
+
+    def _join(self, key):
+        """Return (flight, is_leader), registering a new flight if none is running."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self.leaders += 1
+            return flight, True
+
+    def _run(self, key, flight, fn, args, kwargs):
+        try:
+            flight.result = fn(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def do(self, key, fn, *args, wait_timeout=None, default=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless a call for `key` is already running, in which case
+        wait (at most wait_timeout seconds, then return `default`) for that call's result.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            self._run(key, flight, fn, args, kwargs)
+        elif not flight.event.wait(wait_timeout):
+            self.timeouts += 1
+            return default
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
+
+    def refresh(self, key, fn, *args, **kwargs):
+        """Start fn in a background thread unless a call for `key` is running. Returns True if started."""
+        with self._lock:
+            if key in self._flights:
+                self.coalesced += 1
+                return False
+            flight = self._flights[key] = _Flight()
+            self.leaders += 1
+            self.background += 1
+        threading.Thread(
+            target=self._run, args=(key, flight, fn, args, kwargs), name=f"refresh-{self.name}", daemon=True
+        ).start()
+        return True
+
+    def stats(self):
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "background": self.background,
+        }
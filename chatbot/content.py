@@ -0,0 +1,171 @@
+# chatbot/content.py – citizen-facing content catalog (chatbot/texts/<lang>.json), compiled and hot-reloaded
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+from .jsonfile import JsonFile, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = Path(__file__).resolve().parent / "texts"
+DEFAULT_LANGUAGE = "sw"
+
+# Keys the bot reads; `compile_content` refuses a catalog whose default language lacks any of them
+REQUIRED_KEYS = (
+    "faq",
+    "council.menu",
+    "council.back_hint",
+    *(f"council.details.{n}" for n in range(1, 11)),
+    *(f"dept_info.{dept}" for dept in ("ardhi", "electricity", "health", "maji", "business", "other")),
+    *(f"info_blocks.{key}" for key in ("district_intro", "government_institutions", "opportunities")),
+)
+
+CONTENT_CATALOG_PATH = Path(
+    getattr(settings, "CONTENT_CATALOG_PATH", None)
+    or Path(getattr(settings, "RUNTIME_DIR", Path(settings.BASE_DIR) / "var")) / "content.json"
+)
+
+
+def _join(value, where):
+    """A source text is a string or a list of lines (easier to edit and diff)."""
+    if isinstance(value, list) and all(isinstance(line, str) for line in value):
+        value = "\n".join(value)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{where}: expected a non-empty string or list of lines")
+    return value
+
+
+def _flatten(data, prefix, where, out):
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            _flatten(value, f"{name}.", where, out)
+        else:
+            out[name] = _join(value, f"{where}: {name}")
+    return out
+
+
+def load_sources(source_dir=SOURCE_DIR):
+    """{language: parsed source file}, default language first."""
+    sources = {}
+    for path in sorted(Path(source_dir).glob("*.json"), key=lambda p: (p.stem != DEFAULT_LANGUAGE, p.stem)):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("language") != path.stem:
+            raise ValueError(f"{path.name}: \"language\" must be {path.stem!r}")
+        sources[path.stem] = data
+    if DEFAULT_LANGUAGE not in sources:
+        raise ValueError(f"{source_dir}: missing {DEFAULT_LANGUAGE}.json")
+    return sources
+
+
+def compile_sources(sources):
+    """
+    Validate the per-language sources and build the compiled catalog: flat "section.key"
+    texts per language, with keys missing from a language filled from the default one,
+    council detail replies pre-rendered with their back hint, the knowledge documents of
+    all languages joined for the AI, and a version hashed over all of it.
+    """
+    languages = {}
+    knowledge = []
+    for lang, data in sources.items():
+        data = dict(data)
+        data.pop("language")
+        for i, document in enumerate(data.pop("knowledge", None) or ()):
+            knowledge.append(_join(document, f"{lang}.json: knowledge[{i}]"))
+        languages[lang] = _flatten(data, "", f"{lang}.json", {})
+
+    default = languages[DEFAULT_LANGUAGE]
+    missing = [key for key in REQUIRED_KEYS if key not in default]
+    if missing:
+        raise ValueError(f"{DEFAULT_LANGUAGE}.json: missing " + ", ".join(missing))
+    if not knowledge:
+        raise ValueError("no knowledge documents")
+    for lang, texts in languages.items():
+        unknown = sorted(set(texts) - set(default))
+        if unknown:
+            raise ValueError(f"{lang}.json: keys not in {DEFAULT_LANGUAGE}.json: " + ", ".join(unknown))
+        merged = {**default, **texts}
+        for key in default:
+            if key.startswith("council.details."):
+                merged["council.reply." + key.rsplit(".", 1)[1]] = merged[key] + "\n\n" + merged["council.back_hint"]
+        languages[lang] = merged
+
+    compiled = {"languages": languages, "knowledge": "\n\n".join(knowledge)}
+    canonical = json.dumps(compiled, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    compiled["version"] = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+    return compiled
+
+
+def write_catalog(path, compiled):
+    """Atomically replace the compiled catalog, so workers never load a half-written file."""
+    data = {**compiled, "compiled_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    write_json(path, data, separators=(",", ":"))
+
+
+class ContentCatalog(JsonFile):
+    """
+    Read side of the content catalog. Loads the compiled file written by
+    `manage.py compile_content`, or compiles the sources in memory when that file is
+    missing, unreadable or older than the sources (e.g. in development). The file is
+    re-loaded when it changes (checked at most every `check_interval` seconds), so a
+    new catalog goes live without restarting the workers; a broken one is ignored.
+    """
+
+    keep_on_error = True
+
+    def __init__(self, path, source_dir=SOURCE_DIR, check_interval=10.0):
+        super().__init__(path, check_interval)
+        self.source_dir = Path(source_dir)
+        self._data = self._load_initial()
+        self._checked = time.monotonic()
+
+    def parse(self, data):
+        if not (isinstance(data, dict) and data.get("version") and data.get("languages") and data.get("knowledge")):
+            raise ValueError("not a compiled content catalog")
+        if self._data is not None and data["version"] != self._data["version"]:
+            logger.info("ChembaBot: content catalog reloaded (version %s -> %s)", self._data["version"], data["version"])
+        return data
+
+    def _load_initial(self):
+        try:
+            # Remembered even when the file is not used, so only a newly written one is loaded later
+            self._stamp = self._file_stamp()
+            newest_source = max(p.stat().st_mtime_ns for p in self.source_dir.glob("*.json"))
+            if self._stamp[0] >= newest_source:
+                data = self.parse(read_json(self.path))
+                logger.info("ChembaBot: loaded content catalog %s (version=%s)", self.path, data["version"])
+                return data
+            logger.warning("ChembaBot: content catalog %s is older than its sources; run compile_content", self.path)
+        except (OSError, ValueError) as e:
+            logger.info("ChembaBot: no usable compiled content catalog (%s); compiling the sources", e)
+        return compile_sources(load_sources(self.source_dir))
+
+    @property
+    def version(self):
+        return self.data["version"]
+
+    @property
+    def knowledge(self):
+        """Official reference text for the AI (all knowledge documents, default language first)."""
+        return self.data["knowledge"]
+
+    def get(self, key, lang=DEFAULT_LANGUAGE, default=None):
+        """Text of `key` in `lang` (the default language for unknown languages)."""
+        languages = self.data["languages"]
+        texts = languages.get(lang) or languages[DEFAULT_LANGUAGE]
+        return texts.get(key, default)
+
+    def text(self, key, lang=DEFAULT_LANGUAGE):
+        text = self.get(key, lang)
+        if text is None:
+            raise KeyError(key)
+        return text
+
+
+# Loaded at import, so a preloaded gunicorn master hands the parsed catalog to its workers
+catalog = ContentCatalog(CONTENT_CATALOG_PATH)
@@ -0,0 +1,279 @@
+# chatbot/crawler.py – crawl of the official Chemba DC website into a shared text snapshot
+import hashlib
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import requests
+from django.conf import settings
+
+from .http_client import get_session
+from .jsonfile import JsonFile, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ChembaBot/1.0 (+https://chembadc.go.tz/)"
+CRAWL_MAX_PAGES = getattr(settings, "CRAWL_MAX_PAGES", 8)
+CRAWL_WORKERS = getattr(settings, "CRAWL_WORKERS", 4)
+CRAWL_TIMEOUT = (3.05, 10)
+
+
+# Tags whose content is never visible text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+# Tags that start a new text block
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "div", "dl", "dt", "figcaption",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+    "p", "pre", "section", "table", "td", "th", "tr", "ul",
+}
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+
+class PageExtractor(HTMLParser):
+    """
+    One-pass, incremental HTML extractor: feed() it chunks as they arrive and read
+    `blocks` (visible text split at block-level tags, whitespace collapsed) and
+    `links` (same-site, absolute, without fragment/query, in document order).
+    """
+
+    def __init__(self, page_url):
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self.root_netloc = urlparse(page_url).netloc
+        self.blocks = []
+        self.links = []
+        self._seen_links = set()
+        self._skip_depth = 0
+        self._parts = []
+
+    def _end_block(self):
+        if self._parts:
+            text = " ".join("".join(self._parts).split())
+            if text:
+                self.blocks.append(text)
+            self._parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._add_link(href)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <img/>, ... never open a skipped section
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._add_link(href)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    def _add_link(self, href):
+        parsed = urlparse(urljoin(self.page_url, href.strip()))
+        if parsed.netloc != self.root_netloc or parsed.scheme not in ("http", "https"):
+            return
+        # Normalise to avoid fragments and query-only duplicates
+        clean = parsed._replace(fragment="", query="").geturl()
+        if clean not in self._seen_links:
+            self._seen_links.add(clean)
+            self.links.append(clean)
+
+    def close(self):
+        super().close()
+        self._end_block()
+
+
+def extract_page(html, page_url):
+    """(blocks, links) of a complete HTML document; see PageExtractor."""
+    parser = PageExtractor(page_url)
+    parser.feed(html)
+    parser.close()
+    return parser.blocks, parser.links
+
+
+def block_hash(text):
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _fetch_page(session, url, previous, timeout):
+    """
+    GET one page, conditionally if we have its ETag / Last-Modified from the previous crawl,
+    streaming the body through PageExtractor.
+    Returns (page_dict, outcome) with outcome in {"fetched", "not_modified", "failed"}.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if previous:
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+    try:
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as resp:
+            if resp.status_code == 304 and previous:
+                return dict(previous, checked_at=time.time()), "not_modified"
+            if resp.status_code != 200:
+                logger.info("ChembaBot: crawl %s status_code=%s", url, resp.status_code)
+                return previous, "failed"
+            resp.encoding = resp.encoding or "utf-8"
+            parser = PageExtractor(url)
+            received = 0
+            for chunk in resp.iter_content(chunk_size=16384, decode_unicode=True):
+                parser.feed(chunk)
+                received += len(chunk)
+                if received > MAX_PAGE_BYTES:
+                    logger.warning("ChembaBot: crawl %s truncated at %s chars", url, received)
+                    break
+            parser.close()
+    except requests.RequestException as e:
+        logger.warning("ChembaBot: crawl error fetching %s: %s", url, e)
+        return previous, "failed"
+    if not parser.blocks and not parser.links:
+        logger.info("ChembaBot: crawl %s returned no content", url)
+        return previous, "failed"
+    page = {
+        "url": url,
+        "etag": resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "blocks": parser.blocks,
+        "links": parser.links,
+        "checked_at": time.time(),
+    }
+    return page, "fetched"
+
+
+def crawl(start_url, previous=None, max_pages=CRAWL_MAX_PAGES, workers=CRAWL_WORKERS, deadline=None):
+    """
+    Breadth-first crawl of the site of start_url, fetching each level concurrently.
+
+    `previous` is an earlier snapshot: its validators make unchanged pages cheap 304s whose
+    text is reused without re-extraction, and its pages stand in for ones that fail now.
+    Returns (snapshot, stats) where stats counts fetched / not_modified / failed pages.
+    """
+    previous_pages = (previous or {}).get("pages") or {}
+    session = get_session("crawler", workers)
+    pages = {}
+    order = []
+    stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+    seen = {start_url}
+    frontier = [start_url]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="crawler") as pool:
+        while frontier and len(order) < max_pages:
+            if deadline is not None and deadline.expired():
+                logger.warning("ChembaBot: crawl stopped by deadline after %s pages", len(order))
+                break
+            batch = frontier[: max_pages - len(order)]
+            frontier = frontier[len(batch):]
+            timeout = CRAWL_TIMEOUT
+            if deadline is not None:
+                timeout = (deadline.timeout(CRAWL_TIMEOUT[0]), deadline.timeout(CRAWL_TIMEOUT[1]))
+            results = pool.map(lambda url: _fetch_page(session, url, previous_pages.get(url), timeout), batch)
+            for url, (page, outcome) in zip(batch, results):
+                stats[outcome] += 1
+                if not page:
+                    continue
+                pages[url] = page
+                order.append(url)
+                for link in page.get("links") or []:
+                    if link not in seen:
+                        seen.add(link)
+                        frontier.append(link)
+    snapshot = {
+        "url": start_url,
+        "crawled_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "order": order,
+        "pages": pages,
+    }
+    return snapshot, stats
+
+
+def page_texts(snapshot):
+    """
+    [(url, text)] per page in crawl order, with boilerplate removed: a block (menu, header,
+    footer, ...) found on more than one page is kept only where it first appears.
+    """
+    pages = (snapshot or {}).get("pages") or {}
+    ordered = [pages[url] for url in (snapshot or {}).get("order") or [] if url in pages]
+    page_blocks = [page.get("blocks") or ([page["text"]] if page.get("text") else []) for page in ordered]
+    pages_with_block = Counter()
+    for blocks in page_blocks:
+        pages_with_block.update({block_hash(b) for b in blocks})
+    emitted = set()
+    result = []
+    for page, blocks in zip(ordered, page_blocks):
+        kept = []
+        for block in blocks:
+            h = block_hash(block)
+            if pages_with_block[h] > 1:
+                if h in emitted:
+                    continue
+                emitted.add(h)
+            kept.append(block)
+        text = "\n".join(kept)
+        if text:
+            result.append((page.get("url", ""), text))
+    return result
+
+
+def snapshot_text(snapshot, max_chars=8000):
+    """
+    Unique page texts of a snapshot in crawl order, within max_chars. The budget is shared
+    fairly: short pages are kept whole and what they leave goes to the longer ones.
+    """
+    texts = page_texts(snapshot)
+    if not texts:
+        return ""
+    separator = "\n\n"
+    remaining = max(0, max_chars - len(separator) * (len(texts) - 1))
+    budgets = {}
+    by_length = sorted(range(len(texts)), key=lambda i: len(texts[i][1]))
+    for n, i in enumerate(by_length):
+        share = remaining // (len(texts) - n)
+        budgets[i] = min(len(texts[i][1]), share)
+        remaining -= budgets[i]
+    parts = [text[: budgets[i]].strip() for i, (_url, text) in enumerate(texts)]
+    return separator.join(p for p in parts if p)[:max_chars]
+
+
+def load_snapshot(path):
+    try:
+        return read_json(path)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, snapshot):
+    """Atomically replace the snapshot file, so readers never see a half-written file."""
+    write_json(path, snapshot)
+
+
+class SiteSnapshot(JsonFile):
+    """
+    Read side of the crawl snapshot for request handlers: text() is an in-memory read,
+    and the file is re-loaded when it changes (checked at most every check_interval s).
+    """
+
+    def get(self):
+        return self.data
+
+    def text(self, max_chars=8000):
+        return snapshot_text(self.get(), max_chars)
@@ -68,11 +68,8 @@ def logout_view(request):
 def dashboard_home(request):
     """List all tickets (maswali and malalamiko). Login required."""
     tab = request.GET.get("tab", "all")
-    qs = Ticket.objects.all().order_by("-created_at")
-    if tab == "maswali":
-        qs = qs.filter(ticket_type=Ticket.TYPE_QUESTION)
-    elif tab == "malalamiko":
-        qs = qs.filter(ticket_type=Ticket.TYPE_COMPLAINT)
+    ticket_type = {"maswali": Ticket.TYPE_QUESTION, "malalamiko": Ticket.TYPE_COMPLAINT}.get(tab)
+    qs = Ticket.objects.dashboard_tab(ticket_type)
     return render(request, "dashboard/ticket_list.html", {"tickets": qs, "tab": tab})
 
 
@@ -102,6 +99,8 @@ def ticket_feedback(request, ticket_id):
             result = send_message(phone, msg)
             if result.get("error"):
                 messages.warning(request, f"Feedback imehifadhiwa lakini ujumbe wa WhatsApp haukutumiwa: {result.get('error')}")
+            elif result.get("queued"):
+                messages.success(request, "Feedback imehifadhiwa na ujumbe wa WhatsApp umewekwa kwenye foleni ya kutumwa.")
             else:
                 messages.success(request, "Feedback imehifadhiwa na mteja amepokea ujumbe wa WhatsApp.")
         else:
@@ -0,0 +1,46 @@
+# chatbot/deadline.py – time budget for one inbound message (webhook turn)
+import time
+
+
+class Deadline:
+    """
+    Absolute point in time by which a turn must have produced its reply.
+
+    Each stage asks for its share of what is left (timeout(), share()) instead of using
+    its own fixed timeout, so the whole chain of crawls and OpenAI calls stays within the
+    budget. Deadline(None) never expires (offline commands, benchmarks).
+    """
+
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else time.monotonic() + max(0.0, float(seconds))
+
+    @classmethod
+    def at(cls, expires_at):
+        deadline = cls()
+        deadline.expires_at = expires_at
+        return deadline
+
+    def remaining(self):
+        """Seconds left (never negative), or None for an unlimited deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def timeout(self, cap):
+        """Timeout for one blocking call: `cap`, shortened to what is left of the budget."""
+        remaining = self.remaining()
+        return cap if remaining is None else min(cap, remaining)
+
+    def share(self, fraction):
+        """Sub-deadline using only `fraction` of the remaining time (leaves room for later stages)."""
+        remaining = self.remaining()
+        if remaining is None:
+            return Deadline()
+        return Deadline.at(time.monotonic() + remaining * fraction)
+
+    def __repr__(self):
+        remaining = self.remaining()
+        return "Deadline(unlimited)" if remaining is None else f"Deadline(remaining={remaining:.2f}s)"
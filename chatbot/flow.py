@@ -3,12 +3,27 @@ District Citizen Services – WhatsApp bot conversation flow.
 Single database stores session only; all responses are static/simple.
 """
 import re
-import random
-import string
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
 from django.conf import settings
 
 from .ai_utils import rewrite_info_answer, answer_from_web_search
+from .deadline import Deadline
+from . import content, replies
+from .replies import TICKET_ID, Button, CreateTicket, ListTickets, Reply
+from .intents import (
+    INTENT_COMPLAINT,
+    INTENT_GREETING,
+    INTENT_MATCHER,
+    INTENT_MENU,
+    INTENT_QUESTION,
+    is_menu_like,
+    match_intent,
+)
+
+# Time budget for producing the reply to one message (crawls + OpenAI calls); on expiry we fall back
+TURN_DEADLINE_SECONDS = getattr(settings, "TURN_DEADLINE_SECONDS", 25)
 
 # Common footer lines used on AI-formatted informational replies
 FOOTER_LINE_SW = "Kama una swali jingine, karibu nikuhudumie au jibu # kama unahitaji kuanza upya 🙏🏽"
@@ -67,6 +82,8 @@ def _t(lang, en, sw):
     - If lang is 'en', return the English string.
     - Otherwise return the Kiswahili string (default).
     """
+    if lang == "sw" or lang == "en":
+        return en if lang == "en" else sw
     lang_code = (lang or "").lower()
     if lang_code.startswith("en"):
         return en
@@ -89,95 +106,37 @@ def _no_record_found(lang="sw"):
     )
 
 
-# ---- Department info (static) ----
-DEPT_INFO = {
-    "ardhi": """Ardhi Department Services:
-- Land ownership verification
-- Plot allocation
-- Title deed processing
-
-Office Hours:
-Monday to Friday
-8:00 AM – 3:30 PM""",
-    "electricity": """Electricity Department Services:
-- New connection requests
-- Meter reading and billing
-- Fault reporting
-
-Office Hours:
-Monday to Friday
-8:00 AM – 3:30 PM""",
-    "health": """Health Department Services:
-- Health certificates
-- Clinic referrals
-- Public health information
-
-Office Hours:
-Monday to Friday
-8:00 AM – 3:30 PM""",
-    "maji": """Maji (Water) Department Services:
-- Water connection requests
-- Billing and payments
-- Supply issues
-
-Office Hours:
-Monday to Friday
-8:00 AM – 3:30 PM""",
-    "business": """Business & Trade Department Services:
-- Business registration
-- Trade licenses
-- Market information
-
-Office Hours:
-Monday to Friday
-8:00 AM – 3:30 PM""",
-    "other": """For other services, please visit the district office or contact the main reception.""",
-}
+# ---- Static content rewritten by AI (main menu options 1, 2 and 4) ----
+# Texts live in the content catalog (chatbot/texts/<lang>.json, see content.py) under
+# "info_blocks.<key>"; each block is "header\n\nbody", the header is kept as-is and the body
+# is rewritten. `manage.py pregenerate_answers` generates every block in every language.
+AI_INFO_BLOCKS = ("district_intro", "government_institutions", "opportunities")
 
-# ---- Department info Kiswahili ----
-DEPT_INFO_SW = {
-    "ardhi": """Huduma za Idara ya Ardhi:
-- Uthibitishaji wa umiliki wa ardhi
-- Ugawaji wa viwanja
-- Usindikaji wa hati miliki
-
-Saa za Ofisi:
-Jumatatu hadi Ijumaa
-8:00 asubuhi – 3:30 alasiri""",
-    "electricity": """Huduma za Umeme:
-- Maombi ya muunganisho mpya
-- Kusoma mita na bili
-- Ripoti ya hitilafu
-
-Saa za Ofisi:
-Jumatatu hadi Ijumaa
-8:00 asubuhi – 3:30 alasiri""",
-    "health": """Huduma za Afya:
-- Vibali vya afya
-- Rufaa za kliniki
-- Taarifa za afya ya umma
-
-Saa za Ofisi:
-Jumatatu hadi Ijumaa
-8:00 asubuhi – 3:30 alasiri""",
-    "maji": """Huduma za Maji:
-- Maombi ya muunganisho wa maji
-- Bili na malipo
-- Masuala ya usambazaji
-
-Saa za Ofisi:
-Jumatatu hadi Ijumaa
-8:00 asubuhi – 3:30 alasiri""",
-    "business": """Huduma za Biashara na Soko:
-- Usajili wa biashara
-- Leseni za biashara
-- Taarifa za soko
-
-Saa za Ofisi:
-Jumatatu hadi Ijumaa
-8:00 asubuhi – 3:30 alasiri""",
-    "other": """Kwa huduma zingine, tafadhali tembelea ofisi ya wilaya au wasiliana na mapokezi.""",
-}
+LANGUAGES = ("sw", "en")
+
+
+def split_info_block(base):
+    """Split a static block into (header, body) at the first blank line."""
+    if "\n\n" in base:
+        header, body = base.split("\n\n", 1)
+    else:
+        header, body = base, ""
+    return header, body
+
+
+def info_block(key):
+    """Static block `key` of AI_INFO_BLOCKS (Kiswahili source; the AI rewrites it per language)."""
+    return content.catalog.text(f"info_blocks.{key}")
+
+
+def _info_answer(key, lang, deadline=None):
+    """AI-rewritten static block with the common footer present exactly once."""
+    header, body = split_info_block(info_block(key))
+    reply = rewrite_info_answer(header, body, lang=lang, deadline=deadline)
+    footer = _footer(lang)
+    if not reply.strip().endswith(footer):
+        reply = reply.rstrip() + "\n\n" + footer
+    return reply
 
 
 def _get_dept_by_number(num_str, with_other=True):
@@ -191,10 +150,6 @@ def _get_dept_by_number(num_str, with_other=True):
     return None
 
 
-def _generate_ticket_id():
-    return "DCT-" + "".join(random.choices(string.digits, k=5))
-
-
 def _ticket_status_message(ctx, lang="sw"):
     """
     Build a status message for the last submitted complaint/ticket based on
@@ -326,31 +281,6 @@ def get_welcome_message(lang="sw", name=None):
     return get_main_menu(lang, name=name)
 
 
-# Greetings: if user sends any of these (exact match, case-insensitive), clear session and send welcome
-GREETING_WORDS = frozenset({
-    "hi", "hello", "hellow", "helo", "hey", "boss", "hei",
-    "habari", "mambo", "niaje", "vipi", "vp", "kwema", "salama", "oi", "bablai",
-    "za sahizi", "za asubuhi",
-})
-
-# Complaint: if user message contains any of these (substring), go to option 7 (Wasilisha Malalamiko)
-COMPLAINT_PHRASES = (
-    "malalamiko", "kero", "changamoto",
-    "nina malalamiko", "nataka kukalamika", "naomba kukalamika", "kuna malalamiko",
-)
-
-# Question keywords: exact match only – go to submit-question flow (e.g. "swali", "maswali")
-# NOTE: We *skip* this when in TRACK_CHOICE so "swali"/"maswali" is used for tracking.
-QUESTION_KEYWORDS = frozenset({
-    "swali", "maswali",
-})
-
-# Messages that look like menu choices – do not run free-form Q&A on these
-MENU_LIKE_PHRASES = frozenset({
-    "menyu kuu", "wasilisha swali", "malalamiko", "maswali",
-    "fuatilia tiketi", "fuatilia tiketi yangu",
-})
-
 # No-answer reply: direct user to write their question or press #
 NO_ANSWER_REPLY = (
     "Samahani, hatuna jibu la swali lako kwenye mfumo wetu wa taarifa.\n\n"
@@ -358,763 +288,631 @@ NO_ANSWER_REPLY = (
 )
 
 
-def process_message(session_state, session_context, session_language, user_message, profile_name=None):
-    """
-    Process one user message. No DB for applications/complaints; session only.
-    profile_name: optional WhatsApp display name for personalised welcome/menu.
-    Returns: (next_state, context_update_dict, reply_text)
-    """
-    state = session_state or WELCOME
-    ctx = dict(session_context or {})
-    msg = (user_message or "").strip()
-    reply = ""
-    next_state = state
-    name = (profile_name or "").strip() or None
 
-    # ----- # = reset session (default key) -----
-    if msg == "#":
-        next_state = MAIN_MENU
-        ctx = {}
-        reply = get_welcome_message(session_language or "sw", name=name)
-        return next_state, ctx, reply
+# ---- Pre-rendered replies (immutable, shared by every turn) ----
 
-    # ----- Greeting words: clear session and send welcome (same as #) -----
-    msg_lower = msg.lower()
-    if msg_lower in GREETING_WORDS:
-        next_state = MAIN_MENU
-        ctx = {}
-        reply = get_welcome_message(session_language or "sw", name=name)
-        return next_state, ctx, reply
+def _lang_key(lang):
+    return _t(lang, "en", "sw")
 
-    # ----- Complaint intent (substring): go to option 7 (Wasilisha Malalamiko) -----
-    if any(phrase in msg_lower for phrase in COMPLAINT_PHRASES):
-        next_state = SUBMIT_DEPT
-        ctx.pop("submit_dept", None)
-        lang = session_language or "sw"
+
+def _menu_reply(lang, name=None):
+    """Welcome / main menu; sent with the logo when one is configured."""
+    return Reply(get_main_menu(lang, name=name), replies.MENU, media=replies.LOGO)
+
+
+@lru_cache(maxsize=16)
+def _faq_reply(version, lang):
+    """FAQ (main menu option 5) with the submit-question button; rebuilt when the content version changes."""
+    return Reply(
+        content.catalog.text("faq", lang),
+        replies.BUTTONS,
+        buttons=(Button("wasilisha_swali", _t(lang, "Submit a question", "Wasilisha swali")),),
+        prompt=_t(
+            lang,
+            "Didn't find the question you were looking for? Tap the button below to write your question and you will receive an answer within 24 hours.",
+            "Je, hujapata swali ulilokuwa unataka kupata majibu yake? Bonyeza button hapa chini kuandika swali lako na utajibiwa ndani ya masaa 24.",
+        ),
+    )
+
+
+_TRACK_CHOICE_REPLIES = {
+    lang: Reply(
+        _t(lang, "What would you like to track?", "Unataka Fuatilia?"),
+        replies.CHOICE,
+        buttons=(
+            Button("malalamiko", _t(lang, "Complaints", "Malalamiko")),
+            Button("maswali", _t(lang, "Questions", "Maswali")),
+        ),
+    )
+    for lang in LANGUAGES
+}
+
+_TRACK_LIST_REPLIES = {
+    (lang, ticket_type): Reply(
+        "",
+        replies.BUTTONS,
+        buttons=(Button("menyu_kuu", _t(lang, "Main menu", "Menyu kuu")),),
+        prompt=_t(lang, "Back to main menu:", "Kurudi kwenye menyu kuu:"),
+        actions=(ListTickets(ticket_type),),
+    )
+    for lang in LANGUAGES
+    for ticket_type in ("complaint", "question")
+}
+
+_TICKET_BUTTONS = {
+    lang: (
+        Button("menyu_kuu", _t(lang, "Main menu", "Menyu kuu")),
+        Button("fuatilia_tiketi", _t(lang, "Track my ticket", "Fuatilia tiketi")),
+    )
+    for lang in LANGUAGES
+}
+
+
+@dataclass(slots=True)
+class Turn:
+    """One inbound message and the session it arrived in, as seen by the handlers."""
+
+    state: str
+    ctx: dict
+    language: str | None
+    msg: str
+    name: str | None
+    deadline: Deadline
+    intent: str | None = None
+
+    @property
+    def lang(self):
+        return self.language or "sw"
+
+
+def _complaint_dept_prompt(lang):
+    return _t(
+        lang,
+        "Choose the department related to your complaint:\n"
+        "1️⃣ Land\n"
+        "2️⃣ Electricity\n"
+        "3️⃣ Health\n"
+        "4️⃣ Water\n"
+        "5️⃣ Business & Market",
+        "Chagua idara inayohusika na malalamiko yako:\n"
+        "1️⃣ Ardhi\n"
+        "2️⃣ Umeme\n"
+        "3️⃣ Afya\n"
+        "4️⃣ Maji\n"
+        "5️⃣ Biashara na Soko",
+    )
+
+
+def _submit_question_prompt(lang):
+    return _t(
+        lang,
+        "Please type your question below. You will receive an answer within 24 hours.",
+        "Andika swali lako hapa chini. Utapokea majibu ndani ya masaa 24.",
+    )
+
+
+def _council_menu(lang):
+    return content.catalog.text("council.menu", _lang_key(lang))
+
+
+# ---- Global intents: checked in order before the state handler; None = not handled ----
+
+# ----- # = reset session (default key) -----
+def _pre_reset(turn):
+    if turn.msg == "#":
+        return MAIN_MENU, {}, _menu_reply(turn.lang, turn.name)
+    return None
+
+
+# ----- Greeting words: clear session and send welcome (same as #) -----
+def _pre_greeting(turn):
+    if turn.intent == INTENT_GREETING:
+        return MAIN_MENU, {}, _menu_reply(turn.lang, turn.name)
+    return None
+
+
+# ----- Complaint intent (substring): go to option 7 (Wasilisha Malalamiko) -----
+def _pre_complaint(turn):
+    if turn.intent == INTENT_COMPLAINT:
+        turn.ctx.pop("submit_dept", None)
+        return SUBMIT_DEPT, turn.ctx, _complaint_dept_prompt(turn.lang)
+    return None
+
+
+# ----- Free-form question: answer from internet search (Tanzania-focused) -----
+# Skip when already in SUBMIT_QUESTION or SUBMIT_MESSAGE so the user can type
+# and submit their question/complaint to admin without AI at that stage.
+# Only for message that looks like a question (length + ? or space), not menu phrases.
+def _pre_free_form_question(turn):
+    msg = turn.msg
+    if (
+        turn.state in (SUBMIT_QUESTION, SUBMIT_MESSAGE)
+        or len(msg) < 6
+        or ("?" not in msg and " " not in msg)
+        or turn.intent == INTENT_MENU
+        # "maswali" is a question keyword and a menu phrase; other question keywords still get answers
+        or (turn.intent == INTENT_QUESTION and is_menu_like(msg))
+    ):
+        return None
+    lang = turn.lang
+    answer_text, answered = answer_from_web_search(msg, lang, deadline=turn.deadline)
+    if answered and answer_text:
+        return MAIN_MENU, {}, answer_text.rstrip() + "\n\n" + _footer(lang)
+    # No answer from search: send to swali section with prompt
+    return SUBMIT_QUESTION, {}, NO_ANSWER_REPLY
+
+
+# ----- Question keywords (e.g. "swali"): go to Maswali ya Haraka – submit question flow -----
+# Skip this when in TRACK_CHOICE so that "swali"/"maswali" is used for tracking instead.
+def _pre_question_keyword(turn):
+    if turn.intent == INTENT_QUESTION and turn.state != TRACK_CHOICE:
+        return SUBMIT_QUESTION, turn.ctx, _submit_question_prompt(turn.lang)
+    return None
+
+
+# (pre-handler, intents it reacts to or None for every message), in priority order
+PRE_HANDLERS = (
+    (_pre_reset, None),
+    (_pre_greeting, {INTENT_GREETING}),
+    (_pre_complaint, {INTENT_COMPLAINT}),
+    (_pre_free_form_question, {None, INTENT_GREETING, INTENT_COMPLAINT}),
+    (_pre_question_keyword, {INTENT_QUESTION}),
+)
+
+# Menu digits and short button replies make up most traffic and repeat all day
+_match_intent_cached = lru_cache(maxsize=4096)(match_intent)
+
+# Per intent, the pre-handlers that can apply to it (a plain "1" only runs two)
+_PRE_CHAINS = {
+    intent: tuple(handler for handler, intents in PRE_HANDLERS if intents is None or intent in intents)
+    for intent in (None, *INTENT_MATCHER.intents)
+}
+
+
+# ----- Welcome / first message -> main menu (default Kiswahili) -----
+def _handle_welcome(turn):
+    return MAIN_MENU, turn.ctx, _menu_reply("sw", turn.name)
+
+
+# ----- Language choice (option 4 from main menu) -----
+def _handle_language_choice(turn):
+    next_state = turn.state
+    lang_prompt_en = "Please choose language:\n1️⃣ Kiswahili\n2️⃣ English"
+    lang_prompt_sw = "Chagua lugha:\n1️⃣ Kiswahili\n2️⃣ English"
+    lang_prompt = lang_prompt_sw if turn.language == "sw" else lang_prompt_en
+    if turn.msg == "1":
+        turn.ctx["language"] = "sw"
+        next_state = MAIN_MENU
+        reply = _menu_reply("sw", turn.name)
+    elif turn.msg == "2":
+        turn.ctx["language"] = "en"
+        next_state = MAIN_MENU
+        reply = _menu_reply("en", turn.name)
+    else:
+        reply = lang_prompt
+    return next_state, turn.ctx, reply
+
+
+# ----- Main menu -----
+def _handle_main_menu(turn):
+    next_state = turn.state
+    lang = turn.lang
+    if turn.msg == "1":
+        # Utangulizi wa Wilaya – full content from taarifa.md, rewritten via AI
+        reply = _info_answer("district_intro", lang, turn.deadline)
+        next_state = MAIN_MENU
+    elif turn.msg == "2":
+        # Taasisi za Serikali – full content from taarifa.md, rewritten via AI
+        reply = _info_answer("government_institutions", lang, turn.deadline)
+        next_state = MAIN_MENU
+    elif turn.msg == "3":
+        # Halmashauri ya Wilaya – open sub-menu to avoid long single message
+        turn.ctx["council_mode"] = "menu"
+        next_state = COUNCIL_MENU
+        reply = _council_menu("sw")
+    elif turn.msg == "4":
+        # Fursa zilizopo katika Wilaya – content from taarifa.md (plus brief explanation), rewritten via AI
+        reply = _info_answer("opportunities", lang, turn.deadline)
+        next_state = MAIN_MENU
+    elif turn.msg == "5":
+        # Maswali ya Haraka – Maswali Yanayoulizwa Mara kwa Mara (FAQ) – STATIC, no AI
+        reply = _faq_reply(content.catalog.version, _lang_key(lang))
+    elif turn.msg == "9":
+        # Change language: go to LANGUAGE_CHOICE state
+        next_state = LANGUAGE_CHOICE
+        reply = _t(
+            lang,
+            "Please choose language:\n1️⃣ Kiswahili\n2️⃣ English",
+            "Chagua lugha:\n1️⃣ Kiswahili\n2️⃣ English",
+        )
+    elif turn.msg == "6":
+        # Angalia Hali ya Maombi (re-use existing check status flow)
+        next_state = CHECK_DEPT
         reply = _t(
             lang,
-            "Choose the department related to your complaint:\n"
+            "Choose the department whose application status you want to check:\n"
             "1️⃣ Land\n"
             "2️⃣ Electricity\n"
             "3️⃣ Health\n"
             "4️⃣ Water\n"
-            "5️⃣ Business & Market",
-            "Chagua idara inayohusika na malalamiko yako:\n"
-            "1️⃣ Ardhi\n"
+            "5️⃣ Business & Market\n"
+            "6️⃣ Other",
+            "Chagua idara unayotaka kuangalia hali ya maombi:\n"
+            "1️⃣ Ardhi (Ardhi)\n"
             "2️⃣ Umeme\n"
             "3️⃣ Afya\n"
             "4️⃣ Maji\n"
-            "5️⃣ Biashara na Soko",
+            "5️⃣ Biashara na Soko\n"
+            "6️⃣ Nyingine",
         )
-        return next_state, ctx, reply
-
-    # ----- Free-form question: answer from internet search (Tanzania-focused) -----
-    # Skip when already in SUBMIT_QUESTION or SUBMIT_MESSAGE so the user can type
-    # and submit their question/complaint to admin without AI at that stage.
-    # Only for message that looks like a question (length + ? or space), not menu phrases.
-    if (
-        state not in (SUBMIT_QUESTION, SUBMIT_MESSAGE)
-        and len(msg) >= 6
-        and ("?" in msg or " " in msg)
-        and msg_lower not in MENU_LIKE_PHRASES
-    ):
-        lang = session_language or "sw"
-        answer_text, answered = answer_from_web_search(msg, lang)
-        if answered and answer_text:
-            next_state = MAIN_MENU
-            ctx = {}
-            reply = answer_text.rstrip() + "\n\n" + _footer(lang)
-            return next_state, ctx, reply
-        # No answer from search: send to swali section with prompt
-        next_state = SUBMIT_QUESTION
-        ctx = {}
-        reply = NO_ANSWER_REPLY
-        return next_state, ctx, reply
-
-    # ----- Question keywords (e.g. "swali"): go to Maswali ya Haraka – submit question flow -----
-    # Skip this when in TRACK_CHOICE so that "swali"/"maswali" is used for tracking instead.
-    if msg_lower in QUESTION_KEYWORDS and state != TRACK_CHOICE:
+    elif turn.msg == "7":
+        # Wasilisha Malalamiko (re-use existing submit complaint flow)
+        next_state = SUBMIT_DEPT
+        reply = _complaint_dept_prompt(lang)
+    elif turn.msg in ("Wasilisha swali", "Submit a question"):
+        # Button from FAQ (option 5): go to submit-question flow
         next_state = SUBMIT_QUESTION
-        reply = _t(
-            session_language or "sw",
-            "Please type your question below. You will receive an answer within 24 hours.",
-            "Andika swali lako hapa chini. Utapokea majibu ndani ya masaa 24.",
-        )
-        return next_state, ctx, reply
-
-    # ----- Welcome / first message -> main menu (default Kiswahili) -----
-    if state == WELCOME:
+        reply = _submit_question_prompt(turn.lang)
+    elif turn.msg == "8":
+        # Fuatilia Malalamiko/Maswali Yangu – show choice (view sends 2 buttons)
+        next_state = TRACK_CHOICE
+        reply = _TRACK_CHOICE_REPLIES[_lang_key(turn.lang)]
+    else:
+        reply = _invalid_option("sw")
+    return next_state, turn.ctx, reply
+
+
+# ----- Halmashauri sub-menu (option 3) -----
+def _handle_council_menu(turn):
+    next_state = turn.state
+    lang = turn.lang
+    mode = turn.ctx.get("council_mode", "menu")
+
+    # 0 = back to main menu
+    if turn.msg == "0":
         next_state = MAIN_MENU
-        reply = get_welcome_message("sw", name=name)
-        return next_state, ctx, reply
-
-    # ----- Language choice (option 4 from main menu) -----
-    if state == LANGUAGE_CHOICE:
-        lang_prompt_en = "Please choose language:\n1️⃣ Kiswahili\n2️⃣ English"
-        lang_prompt_sw = "Chagua lugha:\n1️⃣ Kiswahili\n2️⃣ English"
-        lang_prompt = lang_prompt_sw if session_language == "sw" else lang_prompt_en
-        if msg == "1":
-            ctx["language"] = "sw"
-            next_state = MAIN_MENU
-            reply = get_welcome_message("sw", name=name)
-        elif msg == "2":
-            ctx["language"] = "en"
-            next_state = MAIN_MENU
-            reply = get_welcome_message("en", name=name)
-        else:
-            reply = lang_prompt
-        return next_state, ctx, reply
-
-    # ----- Main menu -----
-    if state == MAIN_MENU:
-        lang = session_language or "sw"
-        if msg == "1":
-            # Utangulizi wa Wilaya – full content from taarifa.md, rewritten via AI
-            base = (
-                "1️⃣ Utangulizi wa Wilaya ya Chemba\n\n"
-                "• Jiografia na mipaka ya Wilaya: Wilaya ya Chemba kwa upande wa Kaskazini imepakana na Wilaya ya Kondoa, "
-                "Mashariki imepakana na Wilaya ya Kiteto, Kusini imepakana na Wilaya ya Bahi, Kusini Mashariki imepakana na "
-                "Wilaya ya Chamwino, Magharibi imepakana na Wilaya ya Manyoni na Wilaya ya Singida na Kaskazini Magharibi "
-                "imepakana na Wilaya ya Hanang.\n"
-                "• Muundo wa utawala (Tarafa, Kata, Vijiji): Tarafa 4, Kata 26 na Vijiji 114.\n\n"
-                "• Idadi ya watu: Wilaya ina jumla ya wakazi 339,333 (Me- 170,837 na Ke- 168,496).\n"
-                "• Jimbo: Wilaya ya Chemba ina Jimbo 1 la Uchaguzi.\n"
-                "• Halmashauri: Wilaya ya Chemba ina Halmashauri 1 ya Wilaya.\n\n"
-                "• Dira ya Wilaya ya Chemba: Kuwa Halmashauri yenye utawala bora inayotoa huduma bora zenye ubora wa hali ya juu, "
-                "inayochochea ukuaji endelevu wa uchumi na maendeleo jumuishi kwa wakazi wote.\n"
-                "• Dhima ya Halmashauri: Kutoa utawala bora wa Serikali za Mitaa, kusimamia rasilimali kwa ufanisi, na kuboresha "
-                "utoaji wa huduma ili kuendeleza maendeleo endelevu ya kijamii na kiuchumi.\n\n"
-                "• Maadili ya Msingi:\n"
-                "  - Uwajibikaji: Kudumisha wajibu na uwajibikaji katika utoaji wa huduma na utekelezaji wa miradi ya maendeleo.\n"
-                "  - Ubora katika Huduma: Kutoa huduma bora, kwa wakati, na zinazokidhi mahitaji ya jamii.\n"
-                "  - Ufanisi na Thamani ya Fedha: Kuhakikisha matumizi bora ya rasilimali katika utoaji wa huduma na uhamasishaji wa uwekezaji.\n"
-                "  - Uwazi: Kukuza uwazi na upatikanaji wa taarifa ili kuongeza imani ya umma.\n"
-                "  - Uadilifu: Kudumisha uaminifu, maadili mema, utawala wa sheria, na heshima kwa utu wa binadamu.\n"
-                "  - Ubunifu wa Kimaendeleo: Kuweka na kutumia mbinu bunifu kuboresha utoaji wa huduma na maendeleo ya uchumi wa eneo.\n"
-                "  - Ushirikiano na Kazi kwa Pamoja: Kukuza ushirikiano miongoni mwa watumishi, wadau, na washirika wa maendeleo."
-            )
-            if "\n\n" in base:
-                header, body = base.split("\n\n", 1)
-            else:
-                header, body = base, ""
-            reply = rewrite_info_answer(header, body, lang=lang)
-            # Ensure common footer is present exactly once
-            footer = _footer(lang)
-            if not reply.strip().endswith(footer):
-                reply = reply.rstrip() + "\n\n" + footer
-            next_state = MAIN_MENU
-        elif msg == "2":
-            # Taasisi za Serikali – full content from taarifa.md, rewritten via AI
-            base = (
-                "2️⃣ Taasisi za Serikali zinazopatikana ndani ya Wilaya ya Chemba\n\n"
-                "• TRA: Mamlaka ya Mapato Tanzania, ilianzishwa kwa Sheria ya Bunge Na. 11 ya mwaka 1995, na ilianza kufanya "
-                "kazi tarehe 1 Julai 1996. Katika kutekeleza majukumu yake ya kisheria, TRA inaongozwa kwa sheria na ina "
-                "jukumu la kusimamia kwa uadilifu kodi mbalimbali za Serikali Kuu.\n\n"
-                "• VETA: Taasisi hii ilianzishwa kwa Sheria ya Bunge Na. 1 ya mwaka 1994 ikiwa na jukumu la kuratibu, kusimamia, "
-                "kuwezesha, kukuza na kutoa elimu ya ufundi na mafunzo nchini Tanzania. Chuo cha VETA Chemba kinatoa mafunzo "
-                "katika fani za mapambo, ushonaji, umeme wa majumbani, uchomeleaji, ujasiriamali na ujenzi.\n\n"
-                "• RUWASA: Taasisi hii ina jukumu la kuandaa mipango, kusanifu miradi ya maji, kujenga na kusimamia uendeshaji "
-                "wake. Inaendeleza vyanzo vya maji kwa kufanya utafiti wa maji chini ya ardhi na kuchimba visima pamoja na "
-                "kujenga mabwawa, pamoja na kufanya matengenezo makubwa ya miundombinu ya maji vijijini. Mpaka sasa, taasisi "
-                "inasimamia mradi wa maji wa miji 28 wenye thamani ya Shilingi bilioni 11 katika mji wa Chemba na vijiji vya "
-                "Paranga, Chemba, Chambalo, Kambi ya Nyasa na Gwandi.\n\n"
-                "• TARURA: Taasisi hii ina jukumu la kusimamia ujenzi, ukarabati na matengenezo ya mtandao wa barabara za Wilaya.\n\n"
-                "• NIDA: Mamlaka ya Vitambulisho vya Taifa ina majukumu yafuatayo miongoni mwa mengine:\n"
-                "  - Kutoa Namba ya Utambulisho wa Taifa (NIN) kwa wakazi halali wa Tanzania.\n"
-                "  - Kusimamia mfumo wa utambulisho wa taifa na kuhakikisha unafanya kazi ipasavyo na kuhifadhi taarifa sahihi za wananchi.\n"
-                "  - Kutoa kadi ya NIDA kama nyaraka ya kisheria inayotumika kama kitambulisho cha msingi kwa wakazi halali wa Tanzania.\n\n"
-                "• RITA: Taasisi hii inasimamia na kutoa vyeti mbalimbali kama cheti cha kuzaliwa ndani ya siku tano (5) baada ya "
-                "kukamilisha taratibu za maombi; vyeti vya kifo ndani ya siku 5 za kazi baada ya kukamilisha taratibu za maombi; "
-                "pamoja na vyeti vya kuasili ndani ya siku 3 baada ya kukamilisha taratibu husika.\n\n"
-                "• TFS: Wakala wa Huduma za Misitu Tanzania (TFS) ni taasisi ya serikali iliyopewa jukumu la kusimamia kwa "
-                "uendelevu na kuhifadhi rasilimali za misitu na nyuki nchini Tanzania. TFS ilianzishwa mwaka 2010 kwa lengo la "
-                "kulinda mifumo hii muhimu ya ikolojia kwa manufaa ya vizazi vya sasa na vijavyo."
-            )
-            if "\n\n" in base:
-                header, body = base.split("\n\n", 1)
-            else:
-                header, body = base, ""
-            reply = rewrite_info_answer(header, body, lang=lang)
-            footer = _footer(lang)
-            if not reply.strip().endswith(footer):
-                reply = reply.rstrip() + "\n\n" + footer
-            next_state = MAIN_MENU
-        elif msg == "3":
-            # Halmashauri ya Wilaya – open sub-menu to avoid long single message
-            ctx["council_mode"] = "menu"
-            next_state = COUNCIL_MENU
-            reply = (
-                "3️⃣ Halmashauri ya Wilaya ya Chemba\n\n"
-                "Halmashauri ina idara na vitengo 20 vinavyotekeleza majukumu mbalimbali.\n\n"
-                "Chagua idara au kitengo unachotaka kujua zaidi:\n"
-                "1️⃣ Afya, Ustawi wa Jamii na Lishe\n"
-                "2️⃣ Elimu ya Awali na Msingi\n"
-                "3️⃣ Elimu ya Sekondari\n"
-                "4️⃣ Mipango na Uratibu\n"
-                "5️⃣ Viwanda, Biashara na Uwekezaji\n"
-                "6️⃣ Maendeleo ya Jamii\n"
-                "7️⃣ Kilimo, Mifugo na Uvuvi\n"
-                "8️⃣ Miundombinu, Maendeleo ya Vijijini na Mjini\n"
-                "9️⃣ Utawala na Rasilimali Watu\n"
-                "🔟 Vitengo vingine (Taka, Mazingira, Michezo, Uchaguzi, Uhasibu, Sheria, Ukaguzi, Ununuzi, Tehama, Mawasiliano, Ufuatiliaji na Tathmini)\n\n"
-                "👉 Jibu kwa namba ya idara (1–10), au jibu 0 kurudi kwenye menyu kuu."
-            )
-        elif msg == "4":
-            # Fursa zilizopo katika Wilaya – content from taarifa.md (plus brief explanation), rewritten via AI
-            base = (
-                "4️⃣ Fursa zilizopo katika Wilaya ya Chemba\n\n"
-                "• Uwepo wa maeneo yaliyotengwa kwa ajili ya uwekezaji katika Mji wa Chemba, Paranga na Kambi ya Nyasa.\n\n"
-                "Maeneo haya yana miundombinu wezeshi kama umeme, barabara na mawasiliano yanayorahisisha uwekezaji na shughuli za kiuchumi."
-            )
-            if "\n\n" in base:
-                header, body = base.split("\n\n", 1)
-            else:
-                header, body = base, ""
-            reply = rewrite_info_answer(header, body, lang=lang)
-            footer = _footer(lang)
-            if not reply.strip().endswith(footer):
-                reply = reply.rstrip() + "\n\n" + footer
-            next_state = MAIN_MENU
-        elif msg == "5":
-            # Maswali ya Haraka – Maswali Yanayoulizwa Mara kwa Mara (FAQ) – STATIC, no AI
-            reply = (
-                "5️⃣ Maswali ya Haraka – Maswali Yanayoulizwa Mara kwa Mara (FAQ)\n\n"
-                "1. Wilaya ya Chemba ipo katika eneo gani na inapakana na wilaya zipi?\n"
-                "Wilaya ya Chemba ipo Mkoa wa Dodoma. Inapakana na Wilaya ya Kondoa (Kaskazini), Kiteto (Mashariki), Bahi (Kusini), Chamwino (Kusini Mashariki), Manyoni na Singida (Magharibi), na Hanang (Kaskazini Magharibi).\n\n"
-                "2. Muundo wa utawala wa Wilaya ya Chemba ukoje?\n"
-                "Wilaya ya Chemba ina Tarafa 4, Kata 26 na Vijiji 114 vinavyosimamiwa chini ya Halmashauri ya Wilaya ya Chemba.\n\n"
-                "3. Idadi ya watu wa Wilaya ya Chemba ni kiasi gani?\n"
-                "Wilaya ya Chemba ina wakazi wapatao 339,333, kati yao wanaume ni 170,837 na wanawake ni 168,496.\n\n"
-                "4. Je, Wilaya ya Chemba ina majimbo na halmashauri ngapi?\n"
-                "Wilaya ya Chemba ina Jimbo 1 la Uchaguzi na Halmashauri 1 ya Wilaya.\n\n"
-                "5. Dira na dhima ya Halmashauri ya Wilaya ya Chemba ni ipi?\n"
-                "Dira ni kuwa Halmashauri yenye utawala bora inayotoa huduma bora na kuchochea maendeleo endelevu ya kiuchumi na kijamii. Dhima ni kutoa utawala bora wa Serikali za Mitaa, kusimamia rasilimali kwa ufanisi na kuboresha utoaji wa huduma kwa wananchi.\n\n"
-                "6. Ni taasisi zipi za Serikali zinazopatikana ndani ya Wilaya ya Chemba?\n"
-                "Baadhi ya taasisi zilizopo ni TRA, TANESCO, VETA, RUWASA, TARURA, TFS, NIDA na RITA.\n\n"
-                "7. Huduma za afya zinapatikana vipi katika Wilaya ya Chemba?\n"
-                "Wilaya ina jumla ya vituo vya kutolea huduma za afya 54, ikijumuisha Hospitali 1, Vituo vya Afya 6 na Zahanati 47. Huduma kwa wazee wasiojiweza, mama wajawazito na watoto chini ya miaka 5 hutolewa bure.\n\n"
-                "8. Sekta ya elimu ikoje katika Wilaya ya Chemba?\n"
-                "Wilaya ina shule za msingi 118 na shule za sekondari 31. Ufaulu wa Darasa la Saba mwaka 2025 ulikuwa 88.6%, huku ufaulu wa Kidato cha Sita ukiwa 100%.\n\n"
-                "9. Je, kuna mikopo kwa wanawake, vijana na watu wenye ulemavu?\n"
-                "Ndiyo. Halmashauri hutoa mikopo isiyo na riba kupitia 10% ya mapato ya ndani. Mwaka wa fedha 2025/26 jumla ya Tsh 408,125,000 zilitolewa kwa vikundi vya wanawake, vijana na watu wenye ulemavu.\n\n"
-                "10. Ni masharti gani ya kuomba mikopo ya 10%?\n"
-                "Kikundi kiwe na wanachama 5 au zaidi, kiwe kimesajiliwa, kiwe na katiba, mradi halali, akaunti ya benki ya kikundi, na wanachama wasiwe na ajira rasmi. Vijana wawe na umri wa miaka 18–45.\n\n"
-                "11. Fursa za uwekezaji zinapatikana wapi katika Wilaya ya Chemba?\n"
-                "Fursa za uwekezaji zipo katika maeneo yaliyotengwa Mji wa Chemba, Paranga na Kambi ya Nyasa, yenye miundombinu ya umeme, barabara na mawasiliano.\n\n"
-                "12. Sekta ya kilimo na mifugo ina mchango gani kwa Wilaya?\n"
-                "Takribani 85% ya wananchi wanajihusisha na kilimo cha mazao ya chakula na biashara. Huduma za ugani, mifugo na chanjo zinatolewa ili kuongeza uzalishaji na kipato cha wananchi.\n\n"
-                "Kama una swali jingine, karibu nikuhudumie au jibu # kama unahitaji kuanza upya 🙏🏽"
-            )
-        elif msg == "9":
-            # Change language: go to LANGUAGE_CHOICE state
-            next_state = LANGUAGE_CHOICE
-            lang = session_language or "sw"
-            reply = _t(
-                lang,
-                "Please choose language:\n1️⃣ Kiswahili\n2️⃣ English",
-                "Chagua lugha:\n1️⃣ Kiswahili\n2️⃣ English",
-            )
-        elif msg == "6":
-            # Angalia Hali ya Maombi (re-use existing check status flow)
-            next_state = CHECK_DEPT
-            reply = _t(
-                lang,
-                "Choose the department whose application status you want to check:\n"
-                "1️⃣ Land\n"
-                "2️⃣ Electricity\n"
-                "3️⃣ Health\n"
-                "4️⃣ Water\n"
-                "5️⃣ Business & Market\n"
-                "6️⃣ Other",
-                "Chagua idara unayotaka kuangalia hali ya maombi:\n"
-                "1️⃣ Ardhi (Ardhi)\n"
-                "2️⃣ Umeme\n"
-                "3️⃣ Afya\n"
-                "4️⃣ Maji\n"
-                "5️⃣ Biashara na Soko\n"
-                "6️⃣ Nyingine",
-            )
-        elif msg == "7":
-            # Wasilisha Malalamiko (re-use existing submit complaint flow)
-            next_state = SUBMIT_DEPT
-            reply = _t(
-                lang,
-                "Choose the department related to your complaint:\n"
-                "1️⃣ Land\n"
-                "2️⃣ Electricity\n"
-                "3️⃣ Health\n"
-                "4️⃣ Water\n"
-                "5️⃣ Business & Market",
-                "Chagua idara inayohusika na malalamiko yako:\n"
-                "1️⃣ Ardhi\n"
-                "2️⃣ Umeme\n"
-                "3️⃣ Afya\n"
-                "4️⃣ Maji\n"
-                "5️⃣ Biashara na Soko",
-            )
-        elif msg == "Wasilisha swali":
-            # Button from FAQ (option 5): go to submit-question flow
-            next_state = SUBMIT_QUESTION
-            reply = _t(
-                session_language or "sw",
-                "Please type your question below. You will receive an answer within 24 hours.",
-                "Andika swali lako hapa chini. Utapokea majibu ndani ya masaa 24.",
-            )
-        elif msg == "8":
-            # Fuatilia Malalamiko/Maswali Yangu – show choice (view sends 2 buttons)
-            next_state = TRACK_CHOICE
-            reply = _t(
-                session_language or "sw",
-                "What would you like to track?",
-                "Unataka Fuatilia?",
-            )
-        else:
-            reply = _invalid_option("sw")
-        return next_state, ctx, reply
-
-    # ----- Halmashauri sub-menu (option 3) -----
-    if state == COUNCIL_MENU:
-        lang = session_language or "sw"
-        mode = ctx.get("council_mode", "menu")
-
-        # 0 = back to main menu
-        if msg == "0":
-            next_state = MAIN_MENU
-            reply = get_main_menu(lang, name=name)
-            return next_state, ctx, reply
-
-        # In detail mode, 3 = back to Halmashauri sub-menu list
-        if mode == "detail" and msg == "3":
-            ctx["council_mode"] = "menu"
-            next_state = COUNCIL_MENU
-            reply = _t(
-                lang,
-                "3️⃣ Chemba District Council\n\n"
-                "The Council has 20 departments and units performing various functions.\n\n"
-                "Choose the department or unit you want to know more about:\n"
-                "1️⃣ Health, Social Welfare and Nutrition\n"
-                "2️⃣ Early Childhood and Primary Education\n"
-                "3️⃣ Secondary Education\n"
-                "4️⃣ Planning and Coordination\n"
-                "5️⃣ Industry, Trade and Investment\n"
-                "6️⃣ Community Development\n"
-                "7️⃣ Agriculture, Livestock and Fisheries\n"
-                "8️⃣ Infrastructure, Rural and Urban Development\n"
-                "9️⃣ Administration and Human Resources\n"
-                "🔟 Other units (Waste, Environment, Sports, Elections, Accounts, Legal, Internal Audit, Procurement, ICT, Government Communications, Monitoring & Evaluation)\n\n"
-                "👉 Reply with the department number (1–10), or reply 0 to go back to the main menu.",
-                "3️⃣ Halmashauri ya Wilaya ya Chemba\n\n"
-                "Halmashauri ina idara na vitengo 20 vinavyotekeleza majukumu mbalimbali.\n\n"
-                "Chagua idara au kitengo unachotaka kujua zaidi:\n"
-                "1️⃣ Afya, Ustawi wa Jamii na Lishe\n"
-                "2️⃣ Elimu ya Awali na Msingi\n"
-                "3️⃣ Elimu ya Sekondari\n"
-                "4️⃣ Mipango na Uratibu\n"
-                "5️⃣ Viwanda, Biashara na Uwekezaji\n"
-                "6️⃣ Maendeleo ya Jamii\n"
-                "7️⃣ Kilimo, Mifugo na Uvuvi\n"
-                "8️⃣ Miundombinu, Maendeleo ya Vijijini na Mjini\n"
-                "9️⃣ Utawala na Rasilimali Watu\n"
-                "🔟 Vitengo vingine (Taka, Mazingira, Michezo, Uchaguzi, Uhasibu, Sheria, Ukaguzi, Ununuzi, Tehama, Mawasiliano, Ufuatiliaji na Tathmini)\n\n"
-                "👉 Jibu kwa namba ya idara (1–10), au jibu 0 kurudi kwenye menyu kuu.",
-            )
-            return next_state, ctx, reply
-
-        # For all other numeric options, stay within COUNCIL_MENU
-        next_state = COUNCIL_MENU
-        back_hint = _t(
-            lang,
-            "\n\n👉 Reply 3 to go back to the Council list, or reply # to return to the main menu.",
-            "\n\n👉 Jibu 3 kurudi kwenye orodha ya Halmashauri, au jibu # kurudi kwenye menyu kuu.",
-        )
+        reply = _menu_reply(lang, turn.name)
+        return next_state, turn.ctx, reply
 
-        if msg == "1":
-            # Afya, Ustawi wa Jamii na Lishe
-            reply = (
-                "i. Idara ya Huduma za Afya, Ustawi wa Jamii na Lishe\n\n"
-                "• Hospitali, vituo vya afya na zahanati: jumla ya vituo 54 (Hospitali 1, Vituo vya Afya 6 na Zahanati 47).\n"
-                "• Upatikanaji wa dawa: 52%.\n"
-                "• Huduma kwa wazee na watoto: Huduma kwa wazee wasiojiweza, mama wajawazito na watoto chini ya miaka 5 zinatolewa bure.\n"
-                "• Rasilimali watu katika sekta ya afya: 282.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "2":
-            # Elimu ya Awali na Msingi
-            reply = (
-                "ii. Idara ya Elimu ya Awali na Msingi\n\n"
-                "• Shule za Msingi: 118.\n"
-                "• Uandikishaji Darasa la Awali na la Kwanza: Awali 7,548 (61%) na Darasa la Kwanza 9,172 (76%).\n"
-                "• Walimu na mazingira ya kujifunzia: walimu 878.\n"
-                "• Ufaulu wa Darasa la Saba: Mwaka 2025 ni 88.6%.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "3":
-            # Elimu ya Sekondari
-            reply = (
-                "iii. Idara ya Elimu ya Sekondari\n\n"
-                "• Shule za Sekondari: 31.\n"
-                "• Udahili Kidato cha Kwanza: 4,495.\n"
-                "• Walimu wa Sekondari: 391.\n"
-                "• Ufaulu wa mitihani ya Taifa: Kidato cha Pili 79.4%, Kidato cha Nne 94%, Kidato cha Sita 100%.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "4":
-            # Mipango na Uratibu
-            reply = (
-                "iv. Idara ya Mipango na Uratibu\n\n"
-                "Idara hii inajihusisha na usimamizi wa miradi ya maendeleo.\n"
-                "Kwa mwaka wa fedha 2025/26, jumla ya Tsh 3,582,222,007 zimepokelewa kutoka Serikali Kuu na wahisani kwa ajili ya "
-                "kutekeleza miradi mbalimbali ya maendeleo.\n\n"
-                "Baadhi ya miradi mikubwa iliyopokea fedha ni:\n"
-                "• Ujenzi wa shule 3 mpya za Msingi:\n"
-                "  - Chemba: Tsh 397,200,000\n"
-                "  - Kidoka: Tsh 302,200,000\n"
-                "  - Soya: Tsh 302,200,000\n"
-                "• Ujenzi wa Stendi ya mabasi katika mji wa Chemba: Tsh 650,000,000\n"
-                "• Ujenzi wa nyumba 2 za watumishi wa Afya (Hospitali ya Wilaya, nyumba 3-in-1): Tsh 300,000,000\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "5":
-            # Viwanda, Biashara na Uwekezaji
-            reply = (
-                "v. Idara ya Viwanda, Biashara na Uwekezaji\n\n"
-                "• Leseni za biashara (TAUSI): 721 sawa na takribani 30% ya walengwa.\n"
-                "• Viwanda vidogo na vya kati: viwanda vya kati 3 na vidogo 543.\n"
-                "• Fursa za uwekezaji: uwepo wa maeneo yaliyotengwa kwa ajili ya viwanda katika mji wa Chemba, Paranga na Kambi ya Nyasa.\n"
-                "• Miundombinu wezeshi: miundombinu ya umeme, barabara na mawasiliano ipo na maeneo yanafikika kwa urahisi.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "6":
-            # Maendeleo ya Jamii
-            reply = (
-                "vi. Idara ya Maendeleo ya Jamii\n\n"
-                "• Mikopo isiyo na riba (10% ya mapato ya ndani): Fedha zilizokopeshwa kwa mwaka wa fedha 2025/26 ni Tsh 408,125,000.\n"
-                "• Wanufaika: wanawake, vijana na watu wenye ulemavu.\n"
-                "• Masharti na hatua za kuomba mikopo:\n"
-                "  - Kikundi kiwe na idadi ya watu 5 au zaidi.\n"
-                "  - Wanakikundi wawe na umri wa kuanzia miaka 18 na kuendelea kwa vikundi vya wanawake na wenye ulemavu, "
-                "na miaka 18–45 kwa vikundi vya vijana.\n"
-                "  - Kikundi kiwe kimesajiliwa na kupata cheti na kiwe na katiba.\n"
-                "  - Kikundi kiwe na shughuli (mradi) halali.\n"
-                "  - Kikundi kiwe na akaunti ya benki iliyofunguliwa kwa jina la kikundi.\n"
-                "  - Wanakikundi wasiwe na ajira rasmi.\n"
-                "  - Kwa vikundi vya watu wenye ulemavu, kuanzia mshiriki 1 na kuendelea.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "7":
-            # Kilimo, Mifugo na Uvuvi
-            reply = (
-                "vii. Idara ya Kilimo, Mifugo na Uvuvi\n\n"
-                "• Mazao ya biashara na chakula: takribani 85% ya wananchi wanajihusisha na kilimo cha mazao ya chakula na biashara.\n"
-                "• Huduma za ugani kwa wakulima: 65%.\n"
-                "• Huduma za mifugo (chanjo, tiba, usimamizi wa malisho): 68%.\n"
-                "• Ufugaji wa kisasa na uzalishaji wa mifugo: ufugaji wa kisasa unakadiriwa kufikia 24%.\n"
-                "• Uvuvi na ufugaji wa samaki pamoja na fursa za mikopo na vikundi vya wakulima/wafugaji vinaendelezwa na Halmashauri.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "8":
-            # Miundombinu, Maendeleo ya Vijijini na Mjini
-            reply = (
-                "viii. Idara ya Miundombinu, Maendeleo ya Vijijini na Mjini\n\n"
-                "Idara hii ina jukumu la kusimamia miradi mbalimbali ya maendeleo, kuandaa makadirio ya gharama za ujenzi, kufanya "
-                "ukaguzi na kutoa vibali vya ujenzi wa majengo ya Serikali, taasisi na watu binafsi.\n"
-                "Mpaka sasa, idara inasimamia miradi 47 iliyopata fedha kutoka Serikali Kuu na kutoka kwa wahisani.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "9":
-            # Utawala na Rasilimali Watu
-            reply = (
-                "ix. Idara ya Utawala na Usimamizi wa Rasilimali Watu\n\n"
-                "Idara hii ina jukumu la kusimamia masuala ya kiutawala na rasilimali watu ndani ya Halmashauri.\n"
-                "Inahakikisha nidhamu ya watumishi mahali pa kazi, kupanga na kusimamia mahitaji ya watumishi kulingana na majukumu "
-                "ya ofisi.\n"
-                "Mpaka sasa, Halmashauri ina jumla ya watumishi 1,921 kwa kada mbalimbali.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        elif msg == "10":
-            # Vitengo vingine (grouped)
-            reply = (
-                "x–xx. Vitengo vingine vya Halmashauri ya Wilaya ya Chemba\n\n"
-                "x. Kitengo cha Udhibiti wa Taka Ngumu na Usafi wa Mazingira:\n"
-                "• Kudhibiti taka ngumu na kuuweka mji katika hali ya usafi.\n"
-                "• Kusimamia uoteshaji wa vitalu vya miti na upandaji miti katika taasisi za Serikali, shule za msingi na sekondari.\n"
-                "  Mpaka sasa jumla ya miche 260,000 imepandwa kati ya lengo la miti 500,000 kwa mwaka.\n\n"
-                "xi. Kitengo cha Mali Asili na Hifadhi ya Mazingira:\n"
-                "• Kusimamia shughuli za mali asili ikijumuisha misitu, nyuki, wanyamapori na mazingira.\n"
-                "• Kutoa elimu kwa jamii juu ya uhifadhi endelevu wa rasilimali za misitu.\n"
-                "  Halmashauri ina misitu ya vijiji 16 iliyohifadhiwa pamoja na pori 1 la akiba Swagaswaga, na hifadhi za nyuki 4 "
-                "katika vijiji vya Jogolo, Baaba, Sanzawa na Mialo.\n\n"
-                "xii. Kitengo cha Michezo, Utamaduni na Sanaa:\n"
-                "• Kusimamia michezo, utamaduni na sanaa.\n"
-                "• Kuibua na kulea vipaji kutoka kwenye jamii na kutoa elimu juu ya umuhimu wa michezo na utunzaji wa utamaduni.\n\n"
-                "xiii. Kitengo cha Uchaguzi:\n"
-                "• Kuratibu shughuli zote zihusuzo uchaguzi (Serikali za Mitaa, Uchaguzi Mkuu na chaguzi ndogo).\n"
-                "• Kuratibu mazoezi ya uboreshaji wa daftari la kudumu la wapiga kura na orodha za wapiga kura.\n"
-                "• Kumshauri Mkurugenzi juu ya masuala yote yahusuyo uchaguzi ndani ya Halmashauri.\n\n"
-                "xiv. Kitengo cha Uhasibu:\n"
-                "• Kusimamia mapato ya ndani ya Halmashauri.\n"
-                "• Kwa miaka 2 mfululizo, Halmashauri imevuka lengo la kukusanya mapato ya ndani: 2023/2024 - 110%, 2024/2025 - 117%.\n"
-                "  Mpaka sasa imekusanya 63% ya lengo la mwaka 2025/26.\n\n"
-                "xv. Kitengo cha Sheria:\n"
-                "• Kusimamia masuala mbalimbali ya kisheria yanayohusu Halmashauri.\n"
-                "• Kwa sasa, jumla ya kesi 6 zinasimamiwa na kitengo hiki.\n\n"
-                "xvi. Kitengo cha Ukaguzi wa Ndani:\n"
-                "• Kutathmini michakato ya kifedha, uendeshaji na usimamizi wa Halmashauri.\n"
-                "• Kupima udhibiti wa ndani na kutoa taarifa za ukaguzi kwa uongozi na kamati ya ukaguzi.\n"
-                "• Kupendekeza maboresho ya mifumo na utendaji kazi.\n\n"
-                "xvii. Kitengo cha Usimamizi wa Ununuzi:\n"
-                "• Kusimamia sheria, kanuni na taratibu za ununuzi.\n"
-                "• Kusimamia mikataba yote ya utekelezaji wa miradi kati ya wazabuni na mafundi wa Halmashauri, pamoja na ngazi za chini.\n"
-                "  Mpaka sasa kitengo kinasimamia mikataba 47 ya miradi ya maendeleo ya mwaka 2025/26.\n\n"
-                "xviii. Kitengo cha Tehama:\n"
-                "• Kusimamia mifumo yote ya TEHAMA ndani ya Halmashauri, ikiwemo TAUSI, GOTHOMIS, IFTMIS, SIS na e-UTENDAJI (PEPMIS na PlanRep).\n\n"
-                "xix. Kitengo cha Mawasiliano Serikalini:\n"
-                "• Kutoa taarifa kwa umma kuhusu shughuli mbalimbali zinazotekelezwa na Halmashauri na Serikali kwa ujumla.\n\n"
-                "xx. Kitengo cha Ufuatiliaji na Tathmini:\n"
-                "• Kufuatilia na kufanya tathmini ya miradi ya maendeleo inayotekelezwa katika Halmashauri ili kuhakikisha miradi "
-                "inakamilika kwa wakati na kwa ubora uliokusudiwa. Kwa sasa miradi 47 inaendelea kusimamiwa.\n"
-            ) + back_hint
-            ctx["council_mode"] = "detail"
-        else:
-            reply = _invalid_option(lang)
-
-        return next_state, ctx, reply
-
-    # ----- Check status: department -> ID type -> ID value -----
-    if state == CHECK_DEPT:
-        lang = session_language or "sw"
-        dept = _get_dept_by_number(msg, with_other=True)
-        if dept:
-            ctx["check_dept"] = dept
-            dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
-            next_state = CHECK_ID_TYPE
-            how_check = _t(lang,
-                f"You selected {dept_label} 🏡\n\nHow would you like to check your status?\n1️⃣ Application Reference Number\n2️⃣ National ID (NIDA)\n3️⃣ Phone Number",
-                f"Umechagua {dept_label} 🏡\n\nUngependa kuangalia hali yako kwa njia gani?\n1️⃣ Nambari ya Kumbukumbu ya Maombi\n2️⃣ Kitambulisho cha Taifa (NIDA)\n3️⃣ Nambari ya Simu")
-            reply = how_check
-        else:
-            reply = _invalid_option(lang)
-        return next_state, ctx, reply
-
-    if state == CHECK_ID_TYPE:
-        lang = session_language or "sw"
-        enter_ref = _t(lang, "Please enter your Application Reference Number:", "Tafadhali ingiza Nambari yako ya Kumbukumbu ya Maombi:")
-        enter_nida = _t(lang, "Please enter your National ID (NIDA):", "Tafadhali ingiza Kitambulisho chako cha Taifa (NIDA):")
-        enter_phone = _t(lang, "Please enter your Phone Number:", "Tafadhali ingiza Nambari yako ya Simu:")
-        if msg in ("1", "2", "3"):
-            ctx["check_id_type"] = msg
-            next_state = CHECK_ID_VALUE
-            if msg == "1":
-                reply = enter_ref
-            elif msg == "2":
-                reply = enter_nida
-            else:
-                reply = enter_phone
-        else:
-            reply = _invalid_option(lang)
-        return next_state, ctx, reply
-
-    if state == CHECK_ID_VALUE:
-        lang = session_language or "sw"
-        id_type = ctx.get("check_id_type", "1")
-        valid = False
-        if id_type == "1":
-            valid = _validate_ref_number(msg)
-        elif id_type == "2":
-            valid = _validate_nida(msg)
+    # In detail mode, 3 = back to Halmashauri sub-menu list
+    if mode == "detail" and turn.msg == "3":
+        turn.ctx["council_mode"] = "menu"
+        next_state = COUNCIL_MENU
+        reply = _council_menu(lang)
+        return next_state, turn.ctx, reply
+
+    # For all other numeric options, stay within COUNCIL_MENU: detail of department 1–10
+    # (pre-rendered with the back hint in the content catalog)
+    next_state = COUNCIL_MENU
+    reply = content.catalog.get(f"council.reply.{turn.msg}", _lang_key(lang))
+    if reply is not None:
+        turn.ctx["council_mode"] = "detail"
+    else:
+        reply = _invalid_option(lang)
+
+    return next_state, turn.ctx, reply
+
+
+# ----- Check status: department -> ID type -> ID value -----
+def _handle_check_dept(turn):
+    next_state = turn.state
+    lang = turn.lang
+    dept = _get_dept_by_number(turn.msg, with_other=True)
+    if dept:
+        turn.ctx["check_dept"] = dept
+        dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
+        next_state = CHECK_ID_TYPE
+        how_check = _t(lang,
+            f"You selected {dept_label} 🏡\n\nHow would you like to check your status?\n1️⃣ Application Reference Number\n2️⃣ National ID (NIDA)\n3️⃣ Phone Number",
+            f"Umechagua {dept_label} 🏡\n\nUngependa kuangalia hali yako kwa njia gani?\n1️⃣ Nambari ya Kumbukumbu ya Maombi\n2️⃣ Kitambulisho cha Taifa (NIDA)\n3️⃣ Nambari ya Simu")
+        reply = how_check
+    else:
+        reply = _invalid_option(lang)
+    return next_state, turn.ctx, reply
+
+
+def _handle_check_id_type(turn):
+    next_state = turn.state
+    lang = turn.lang
+    enter_ref = _t(lang, "Please enter your Application Reference Number:", "Tafadhali ingiza Nambari yako ya Kumbukumbu ya Maombi:")
+    enter_nida = _t(lang, "Please enter your National ID (NIDA):", "Tafadhali ingiza Kitambulisho chako cha Taifa (NIDA):")
+    enter_phone = _t(lang, "Please enter your Phone Number:", "Tafadhali ingiza Nambari yako ya Simu:")
+    if turn.msg in ("1", "2", "3"):
+        turn.ctx["check_id_type"] = turn.msg
+        next_state = CHECK_ID_VALUE
+        if turn.msg == "1":
+            reply = enter_ref
+        elif turn.msg == "2":
+            reply = enter_nida
         else:
-            valid = _validate_phone(msg)
+            reply = enter_phone
+    else:
+        reply = _invalid_option(lang)
+    return next_state, turn.ctx, reply
+
+
+def _handle_check_id_value(turn):
+    next_state = turn.state
+    lang = turn.lang
+    id_type = turn.ctx.get("check_id_type", "1")
+    valid = False
+    if id_type == "1":
+        valid = _validate_ref_number(turn.msg)
+    elif id_type == "2":
+        valid = _validate_nida(turn.msg)
+    else:
+        valid = _validate_phone(turn.msg)
+
+    if not valid:
+        reply = _invalid_option(lang)
+        return next_state, turn.ctx, reply
+
+    # No real DB (session only): static demo success for REF-12345, otherwise "No record found".
+    next_state = CHECK_RESULT_OPTIONS
+    turn.ctx["last_check_identifier"] = turn.msg
+    dept = turn.ctx.get("check_dept", "ardhi")
+    dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
+    if turn.msg.strip().upper() in ("REF-12345", "DEMO"):
+        reply = _t(lang,
+            f"{dept_label} – Application Status\n\nApplication Status: IN REVIEW\nStage: Survey Verification\nLast Update: 12 Jan 2026\n\n1️⃣ Check another application\n2️⃣ Contact officer\n3️⃣ Main menu",
+            f"{dept_label} – Hali ya Maombi\n\nHali: Inakaguliwa\nHatua: Uthibitishaji wa Uchunguzi\nSasisho la Mwisho: 12 Jan 2026\n\n1️⃣ Angalia maombi mengine\n2️⃣ Wasiliana na afisa\n3️⃣ Menyu kuu")
+    else:
+        reply = _no_record_found(lang)
+    return next_state, turn.ctx, reply
+
+
+def _handle_check_result_options(turn):
+    next_state = turn.state
+    lang = turn.lang
+    select_dept = _t(lang,
+        "Please select the department:\n1️⃣ Ardhi (Land)\n2️⃣ Electricity\n3️⃣ Health\n4️⃣ Maji (Water)\n5️⃣ Business & Trade\n6️⃣ Other",
+        "Chagua idara:\n1️⃣ Ardhi (Ardhi)\n2️⃣ Umeme\n3️⃣ Afya\n4️⃣ Maji\n5️⃣ Biashara na Soko\n6️⃣ Nyingine")
+    contact_support = _t(lang,
+        "You can contact support at the district office.\n\n",
+        "Unaweza wasiliana na msaada ofisi ya wilaya.\n\n")
+    try_again = _t(lang, "1️⃣ Try again\n2️⃣ Contact support", "1️⃣ Jaribu tena\n2️⃣ Wasiliana na msaada")
+    if turn.msg == "1":
+        turn.ctx.pop("check_dept", None)
+        turn.ctx.pop("check_id_type", None)
+        turn.ctx.pop("last_check_identifier", None)
+        next_state = CHECK_DEPT
+        reply = select_dept
+    elif turn.msg == "2":
+        next_state = MAIN_MENU
+        turn.ctx.pop("check_dept", None)
+        turn.ctx.pop("check_id_type", None)
+        turn.ctx.pop("last_check_identifier", None)
+        reply = contact_support + get_main_menu(lang, name=turn.name)
+    elif turn.msg == "3":
+        next_state = MAIN_MENU
+        turn.ctx.pop("check_dept", None)
+        turn.ctx.pop("check_id_type", None)
+        turn.ctx.pop("last_check_identifier", None)
+        reply = _menu_reply(lang, turn.name)
+    else:
+        reply = try_again
+    return next_state, turn.ctx, reply
+
+
+# ----- Submit question/complaint -----
+def _handle_submit_dept(turn):
+    next_state = turn.state
+    lang = turn.lang
+    dept = _get_dept_by_number(turn.msg, with_other=False)
+    if dept:
+        turn.ctx["submit_dept"] = dept
+        next_state = SUBMIT_MESSAGE
+        reply = _t(lang, "Please type your question or complaint below.", "Tafadhali andika swali au malalamiko yako hapa chini.")
+    else:
+        reply = _invalid_option(lang)
+    return next_state, turn.ctx, reply
+
+
+def _handle_submit_message(turn):
+    next_state = turn.state
+    lang = turn.lang
+    if not turn.msg or len(turn.msg) < 3:
+        reply = _t(lang, "Please type your question or complaint (at least a few words).", "Tafadhali andika swali au malalamiko (angalau maneno machache).")
+        return next_state, turn.ctx, reply
+    # ctx["ticket_id"] and the TICKET_ID in the reply are filled by the sender when it stores the ticket
+    turn.ctx["ticket_message"] = turn.msg
+    turn.ctx["ticket_timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M")
+    turn.ctx["ticket_dept"] = turn.ctx.get("submit_dept", "other")
+    next_state = SUBMIT_CONFIRMED_OPTIONS
+    received = _t(
+        lang,
+        "Your message has been received. We will get back to you within 24 hours.\n\n",
+        "Ujumbe wako umepokelewa. Utapokea majibu ndani ya masaa 24.\n\n",
+    )
+    reply = (
+        received
+        + _t(lang, f"Tracking ID: {TICKET_ID}\nMessage: {turn.msg}\n\n", f"Kitambulisho: {TICKET_ID}\nUjumbe: {turn.msg}\n\n")
+    )
+    reply += _t(lang, "Tap a button below.", "Bonyeza button hapa chini.")
+    reply = Reply(
+        reply,
+        replies.BUTTONS,
+        buttons=_TICKET_BUTTONS[_lang_key(lang)],
+        prompt=_t(lang, "Choose:", "Chagua:"),
+        merge_prompt=False,  # the text already ends with "tap a button below"
+        actions=(CreateTicket("complaint", turn.msg, turn.ctx["ticket_dept"]),),
+    )
+    return next_state, turn.ctx, reply
 
-        if not valid:
-            reply = _invalid_option(lang)
-            return next_state, ctx, reply
 
-        # No real DB (session only): static demo success for REF-12345, otherwise "No record found".
-        next_state = CHECK_RESULT_OPTIONS
-        ctx["last_check_identifier"] = msg
-        dept = ctx.get("check_dept", "ardhi")
-        dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
-        if msg.strip().upper() in ("REF-12345", "DEMO"):
-            reply = _t(lang,
-                f"{dept_label} – Application Status\n\nApplication Status: IN REVIEW\nStage: Survey Verification\nLast Update: 12 Jan 2026\n\n1️⃣ Check another application\n2️⃣ Contact officer\n3️⃣ Main menu",
-                f"{dept_label} – Hali ya Maombi\n\nHali: Inakaguliwa\nHatua: Uthibitishaji wa Uchunguzi\nSasisho la Mwisho: 12 Jan 2026\n\n1️⃣ Angalia maombi mengine\n2️⃣ Wasiliana na afisa\n3️⃣ Menyu kuu")
-        else:
-            reply = _no_record_found(lang)
-        return next_state, ctx, reply
-
-    if state == CHECK_RESULT_OPTIONS:
-        lang = session_language or "sw"
-        select_dept = _t(lang,
-            "Please select the department:\n1️⃣ Ardhi (Land)\n2️⃣ Electricity\n3️⃣ Health\n4️⃣ Maji (Water)\n5️⃣ Business & Trade\n6️⃣ Other",
-            "Chagua idara:\n1️⃣ Ardhi (Ardhi)\n2️⃣ Umeme\n3️⃣ Afya\n4️⃣ Maji\n5️⃣ Biashara na Soko\n6️⃣ Nyingine")
-        contact_support = _t(lang,
-            "You can contact support at the district office.\n\n",
-            "Unaweza wasiliana na msaada ofisi ya wilaya.\n\n")
-        try_again = _t(lang, "1️⃣ Try again\n2️⃣ Contact support", "1️⃣ Jaribu tena\n2️⃣ Wasiliana na msaada")
-        if msg == "1":
-            ctx.pop("check_dept", None)
-            ctx.pop("check_id_type", None)
-            ctx.pop("last_check_identifier", None)
-            next_state = CHECK_DEPT
-            reply = select_dept
-        elif msg == "2":
-            next_state = MAIN_MENU
-            ctx.pop("check_dept", None)
-            ctx.pop("check_id_type", None)
-            ctx.pop("last_check_identifier", None)
-            reply = contact_support + get_main_menu(lang, name=name)
-        elif msg == "3":
-            next_state = MAIN_MENU
-            ctx.pop("check_dept", None)
-            ctx.pop("check_id_type", None)
-            ctx.pop("last_check_identifier", None)
-            reply = get_main_menu(lang, name=name)
-        else:
-            reply = try_again
-        return next_state, ctx, reply
-
-    # ----- Submit question/complaint -----
-    if state == SUBMIT_DEPT:
-        lang = session_language or "sw"
-        dept = _get_dept_by_number(msg, with_other=False)
-        if dept:
-            ctx["submit_dept"] = dept
-            next_state = SUBMIT_MESSAGE
-            reply = _t(lang, "Please type your question or complaint below.", "Tafadhali andika swali au malalamiko yako hapa chini.")
-        else:
-            reply = _invalid_option(lang)
-        return next_state, ctx, reply
-
-    if state == SUBMIT_MESSAGE:
-        lang = session_language or "sw"
-        if not msg or len(msg) < 3:
-            reply = _t(lang, "Please type your question or complaint (at least a few words).", "Tafadhali andika swali au malalamiko (angalau maneno machache).")
-            return next_state, ctx, reply
-        ticket_id = _generate_ticket_id()
-        ctx["ticket_id"] = ticket_id
-        ctx["ticket_message"] = msg
-        ctx["ticket_timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M")
-        ctx["ticket_dept"] = ctx.get("submit_dept", "other")
-        next_state = SUBMIT_CONFIRMED_OPTIONS
-        received = _t(
-            lang,
-            "Your message has been received. We will get back to you within 24 hours.\n\n",
-            "Ujumbe wako umepokelewa. Utapokea majibu ndani ya masaa 24.\n\n",
-        )
-        reply = (
-            received
-            + _t(lang, f"Tracking ID: {ticket_id}\nMessage: {msg}\n\n", f"Kitambulisho: {ticket_id}\nUjumbe: {msg}\n\n")
-        )
-        reply += _t(lang, "Tap a button below.", "Bonyeza button hapa chini.")
-        return next_state, ctx, reply
-
-    if state == SUBMIT_CONFIRMED_OPTIONS:
-        lang = session_language or "sw"
-        main_menu_only = _t(lang, "Tap: Menyu kuu or Fuatilia tiketi yangu", "Bonyeza: Menyu kuu au Fuatilia tiketi yangu")
-        if msg in ("1", "Menyu kuu"):
-            next_state = MAIN_MENU
-            reply = get_main_menu(lang, name=name)
-        elif msg in ("2", "Fuatilia tiketi yangu", "Fuatilia tiketi"):
-            next_state = TRACK_TICKET
-            status_text = _ticket_status_message(ctx, lang)
-            reply = status_text
-        else:
-            reply = main_menu_only
-        return next_state, ctx, reply
-
-    if state == TRACK_TICKET:
-        lang = session_language or "sw"
-        main_menu_opt = _t(lang, "Tap Menyu kuu to return.", "Bonyeza Menyu kuu kurudi.")
-        if msg in ("1", "Menyu kuu"):
-            next_state = MAIN_MENU
-            reply = get_main_menu(lang, name=name)
-        else:
-            reply = main_menu_opt
-        return next_state, ctx, reply
-
-    # ----- After showing track list: only "1" or "Menyu kuu" goes to main menu -----
-    if state == TRACK_LIST_SHOWN:
-        lang = session_language or "sw"
-        if msg in ("1", "Menyu kuu"):
-            next_state = MAIN_MENU
-            reply = get_main_menu(lang, name=name)
-        else:
-            reply = _t(lang, "Tap Menyu kuu to return to main menu.", "Bonyeza Menyu kuu kurudi kwenye menyu kuu.")
-        return next_state, ctx, reply
-
-    # ----- Submit swali (after FAQ "Wasilisha swali" button) -----
-    if state == SUBMIT_QUESTION:
-        lang = session_language or "sw"
-        if not msg or len(msg.strip()) < 2:
-            reply = _t(
-                lang,
-                "Please type your question (at least a few characters).",
-                "Tafadhali andika swali lako (angalau herufi chache).",
-            )
-            return next_state, ctx, reply
-        ticket_id = _generate_ticket_id()
-        ctx["ticket_id"] = ticket_id
-        ctx["ticket_message"] = msg.strip()
-        ctx["ticket_type"] = "question"
-        ctx["ticket_timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M")
-        # After submitting a question, treat \"1\" / \"Menyu kuu\" like TRACK_TICKET:
-        # pressing 1 should show the full main menu, not option 1.
+def _handle_submit_confirmed_options(turn):
+    next_state = turn.state
+    lang = turn.lang
+    main_menu_only = _t(lang, "Tap: Menyu kuu or Fuatilia tiketi yangu", "Bonyeza: Menyu kuu au Fuatilia tiketi yangu")
+    if turn.msg in ("1", "Menyu kuu", "Main menu"):
+        next_state = MAIN_MENU
+        reply = _menu_reply(lang, turn.name)
+    elif turn.msg in ("2", "Fuatilia tiketi yangu", "Fuatilia tiketi", "Track my ticket"):
         next_state = TRACK_TICKET
+        status_text = _ticket_status_message(turn.ctx, lang)
+        reply = status_text
+    else:
+        reply = main_menu_only
+    return next_state, turn.ctx, reply
+
+
+def _handle_track_ticket(turn):
+    next_state = turn.state
+    lang = turn.lang
+    main_menu_opt = _t(lang, "Tap Menyu kuu to return.", "Bonyeza Menyu kuu kurudi.")
+    if turn.msg in ("1", "Menyu kuu", "Main menu"):
+        next_state = MAIN_MENU
+        reply = _menu_reply(lang, turn.name)
+    else:
+        reply = main_menu_opt
+    return next_state, turn.ctx, reply
+
+
+# ----- After showing track list: only "1" or "Menyu kuu" goes to main menu -----
+def _handle_track_list_shown(turn):
+    next_state = turn.state
+    lang = turn.lang
+    if turn.msg in ("1", "Menyu kuu", "Main menu"):
+        next_state = MAIN_MENU
+        reply = _menu_reply(lang, turn.name)
+    else:
+        reply = _t(lang, "Tap Menyu kuu to return to main menu.", "Bonyeza Menyu kuu kurudi kwenye menyu kuu.")
+    return next_state, turn.ctx, reply
+
+
+# ----- Submit swali (after FAQ "Wasilisha swali" button) -----
+def _handle_submit_question(turn):
+    next_state = turn.state
+    lang = turn.lang
+    if not turn.msg or len(turn.msg.strip()) < 2:
         reply = _t(
             lang,
-            f"Your question has been received. Tracking ID: {ticket_id}\nYou will get an answer within 24 hours.\n\n1️⃣ Main menu",
-            f"Umewasilisha swali lako.\nKitambulisho chako: {ticket_id}\nUtapokea majibu ndani ya masaa 24. Unaweza kufuatilia kwa chaguo 8 (Fuatilia Malalamiko/Maswali Yangu).\n\n1️⃣ Menyu kuu",
+            "Please type your question (at least a few characters).",
+            "Tafadhali andika swali lako (angalau herufi chache).",
         )
-        return next_state, ctx, reply
-
-    # ----- Fuatilia: Malalamiko or Maswali (view sends list from DB) -----
-    if state == TRACK_CHOICE:
-        lang = session_language or "sw"
-        msg_norm = (msg or "").strip()
-        msg_lower = msg_norm.lower()
-        if msg_lower == "malalamiko":
-            ctx["track_list_type"] = "complaint"
-            next_state = TRACK_LIST_SHOWN
-            reply = ""  # view will build list from DB
-            return next_state, ctx, reply
-        if msg_lower in ("maswali", "swali"):
-            ctx["track_list_type"] = "question"
-            next_state = TRACK_LIST_SHOWN
-            reply = ""  # view will build list from DB
-            return next_state, ctx, reply
-        # invalid: re-ask with same prompt
-        reply = "Unataka Fuatilia?"
-        return next_state, ctx, reply
-
-    # ----- Department info -----
-    if state == DEPT_INFO_CHOICE:
-        lang = session_language or "sw"
-        dept = _get_dept_by_number(msg, with_other=False)
-        if dept:
-            ctx["dept_info_shown"] = dept
-            next_state = DEPT_INFO_SHOWN
-            if lang == "sw":
-                info = DEPT_INFO_SW.get(dept, DEPT_INFO_SW["other"])
-            else:
-                info = DEPT_INFO.get(dept, DEPT_INFO["other"])
-            dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
-            main_menu_opt = _t(lang, "1️⃣ Main menu", "1️⃣ Menyu kuu")
-            reply = f"{dept_label}\n\n{info}\n\n{main_menu_opt}"
-        else:
-            reply = _invalid_option(lang)
-        return next_state, ctx, reply
-
-    if state == DEPT_INFO_SHOWN:
-        lang = session_language or "sw"
+        return next_state, turn.ctx, reply
+    turn.ctx["ticket_message"] = turn.msg.strip()
+    turn.ctx["ticket_type"] = "question"
+    turn.ctx["ticket_timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M")
+    # After submitting a question, treat \"1\" / \"Menyu kuu\" like TRACK_TICKET:
+    # pressing 1 should show the full main menu, not option 1.
+    next_state = TRACK_TICKET
+    reply = _t(
+        lang,
+        f"Your question has been received. Tracking ID: {TICKET_ID}\nYou will get an answer within 24 hours.\n\n1️⃣ Main menu",
+        f"Umewasilisha swali lako.\nKitambulisho chako: {TICKET_ID}\nUtapokea majibu ndani ya masaa 24. Unaweza kufuatilia kwa chaguo 8 (Fuatilia Malalamiko/Maswali Yangu).\n\n1️⃣ Menyu kuu",
+    )
+    reply = Reply(reply, actions=(CreateTicket("question", turn.ctx["ticket_message"]),))
+    return next_state, turn.ctx, reply
+
+
+# ----- Fuatilia: Malalamiko or Maswali (sender builds the list from the DB) -----
+def _handle_track_choice(turn):
+    next_state = turn.state
+    lang = turn.lang
+    msg_norm = (turn.msg or "").strip()
+    msg_lower = msg_norm.lower()
+    if msg_lower in ("malalamiko", "complaints"):
+        next_state = TRACK_LIST_SHOWN
+        reply = _TRACK_LIST_REPLIES[_lang_key(lang), "complaint"]  # text built from the DB by the sender
+        return next_state, turn.ctx, reply
+    if msg_lower in ("maswali", "swali", "questions"):
+        next_state = TRACK_LIST_SHOWN
+        reply = _TRACK_LIST_REPLIES[_lang_key(lang), "question"]  # text built from the DB by the sender
+        return next_state, turn.ctx, reply
+    # invalid: re-ask with same prompt
+    reply = _TRACK_CHOICE_REPLIES[_lang_key(lang)]
+    return next_state, turn.ctx, reply
+
+
+# ----- Department info -----
+def _handle_dept_info_choice(turn):
+    next_state = turn.state
+    lang = turn.lang
+    dept = _get_dept_by_number(turn.msg, with_other=False)
+    if dept:
+        turn.ctx["dept_info_shown"] = dept
+        next_state = DEPT_INFO_SHOWN
+        info = content.catalog.get(f"dept_info.{dept}", _lang_key(lang)) or content.catalog.text(
+            "dept_info.other", _lang_key(lang)
+        )
+        dept_label = next((d[1] for d in DEPARTMENTS if d[0] == dept), dept)
         main_menu_opt = _t(lang, "1️⃣ Main menu", "1️⃣ Menyu kuu")
-        if msg == "1":
-            next_state = MAIN_MENU
-            reply = get_main_menu(lang, name=name)
-        else:
-            reply = main_menu_opt
-        return next_state, ctx, reply
+        reply = f"{dept_label}\n\n{info}\n\n{main_menu_opt}"
+    else:
+        reply = _invalid_option(lang)
+    return next_state, turn.ctx, reply
 
-    # Fallback: reset to main menu
-    next_state = MAIN_MENU
-    reply = get_main_menu(session_language or "sw", name=name)
+
+def _handle_dept_info_shown(turn):
+    next_state = turn.state
+    lang = turn.lang
+    main_menu_opt = _t(lang, "1️⃣ Main menu", "1️⃣ Menyu kuu")
+    if turn.msg == "1":
+        next_state = MAIN_MENU
+        reply = _menu_reply(lang, turn.name)
+    else:
+        reply = main_menu_opt
+    return next_state, turn.ctx, reply
+
+
+# Fallback for a state no handler knows (e.g. a session saved by an older version): reset to main menu
+def _handle_unknown_state(turn):
+    return MAIN_MENU, turn.ctx, _menu_reply(turn.lang, turn.name)
+
+
+STATE_HANDLERS = {
+    WELCOME: _handle_welcome,
+    LANGUAGE_CHOICE: _handle_language_choice,
+    MAIN_MENU: _handle_main_menu,
+    COUNCIL_MENU: _handle_council_menu,
+    CHECK_DEPT: _handle_check_dept,
+    CHECK_ID_TYPE: _handle_check_id_type,
+    CHECK_ID_VALUE: _handle_check_id_value,
+    CHECK_RESULT_OPTIONS: _handle_check_result_options,
+    SUBMIT_DEPT: _handle_submit_dept,
+    SUBMIT_MESSAGE: _handle_submit_message,
+    SUBMIT_CONFIRMED_OPTIONS: _handle_submit_confirmed_options,
+    TRACK_TICKET: _handle_track_ticket,
+    TRACK_LIST_SHOWN: _handle_track_list_shown,
+    SUBMIT_QUESTION: _handle_submit_question,
+    TRACK_CHOICE: _handle_track_choice,
+    DEPT_INFO_CHOICE: _handle_dept_info_choice,
+    DEPT_INFO_SHOWN: _handle_dept_info_shown,
+}
+
+
+def process_message(session_state, session_context, session_language, user_message, profile_name=None, deadline=None):
+    """
+    Process one user message. No DB for applications/complaints; session only.
+    profile_name: optional WhatsApp display name for personalised welcome/menu.
+    deadline: time budget for AI calls (default TURN_DEADLINE_SECONDS from now).
+    Runs the global-intent PRE_HANDLERS in order, then the STATE_HANDLERS entry for the state.
+    Handlers may return plain text for an ordinary text reply.
+    Returns: (next_state, context_update_dict, replies.Reply)
+    """
+    if deadline is None:
+        deadline = Deadline(TURN_DEADLINE_SECONDS)
+    msg = (user_message or "").strip()
+    # Global intents (greeting / complaint / question keyword / menu phrase), matched once
+    # on the normalized message so "Habari!" or "hi 👋" count as greetings
+    intent = _match_intent_cached(msg)
+    turn = Turn(
+        session_state or WELCOME,
+        dict(session_context or {}),
+        session_language,
+        msg,
+        (profile_name or "").strip() or None,
+        deadline,
+        intent,
+    )
+    for pre_handler in _PRE_CHAINS[intent]:
+        result = pre_handler(turn)
+        if result is not None:
+            break
+    else:
+        result = STATE_HANDLERS.get(turn.state, _handle_unknown_state)(turn)
+    next_state, ctx, reply = result
+    if isinstance(reply, str):
+        reply = Reply(reply)
     return next_state, ctx, reply
@@ -0,0 +1,39 @@
+# chatbot/http_client.py – shared keep-alive HTTP sessions (one pool per worker process)
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(name, pool_size=10):
+    """
+    Return the process-wide requests.Session registered under `name`.
+
+    The session keeps TCP/TLS connections alive between calls and pools up to
+    `pool_size` connections per host. Sessions are created lazily and keyed by
+    PID, so gunicorn workers forked from a preloaded master never share sockets.
+    """
+    key = (name, os.getpid())
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(pool_size)), max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[key] = session
+    return session
+
+
+def close_sessions():
+    """Close every pooled session of this process (tests / shutdown)."""
+    with _lock:
+        for key in [k for k in _sessions if k[1] == os.getpid()]:
+            _sessions.pop(key).close()
@@ -0,0 +1,451 @@
+# chatbot/inbound.py – processing of inbound WhatsApp webhook payloads
+import concurrent.futures
+import re
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .caching import LRUCache
+from .utils import send_message, send_logo_with_caption, send_interactive_buttons, send_text_with_buttons
+from .models import Ticket, InboundEvent, ProcessedMessage
+from .sessions import SessionConflict, session_store
+from .deadline import Deadline
+from .flow import (
+    TURN_DEADLINE_SECONDS,
+    process_message,
+    get_welcome_message,
+    _t,
+)
+from .replies import CHOICE, LOGO, MENU, CreateTicket, ListTickets, Reply
+from .tickets import next_ticket_id
+
+# Turns re-run when another worker saved the same session meanwhile, before giving up
+SESSION_SAVE_ATTEMPTS = getattr(settings, "CHAT_SESSION_SAVE_ATTEMPTS", 3)
+
+# Rows stuck in "processing" longer than this are assumed to belong to a dead worker
+STALE_LOCK_SECONDS = 300
+
+# A failed event is retried with backoff (~5s, 10s, 20s ... up to 5 minutes) before it is marked failed
+INBOUND_MAX_ATTEMPTS = getattr(settings, "INBOUND_MAX_ATTEMPTS", 5)
+INBOUND_RETRY_BASE_SECONDS = 5.0
+INBOUND_RETRY_MAX_SECONDS = 300.0
+
+# Meta keeps redelivering an un-acked webhook for up to 7 days
+DEDUPE_TTL_SECONDS = getattr(settings, "INBOUND_DEDUPE_TTL_SECONDS", 7 * 24 * 3600)
+_seen_message_ids = LRUCache(maxsize=getattr(settings, "INBOUND_DEDUPE_MAX_ENTRIES", 10000), ttl=DEDUPE_TTL_SECONDS)
+_last_purge = 0.0
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+def is_valid_payload(data):
+    """Minimal shape check for a WhatsApp Cloud API webhook body."""
+    return isinstance(data, dict) and isinstance(data.get("entry", []), list)
+
+
+def log_statuses(data):
+    """
+    Log delivery status (sent/delivered/read/failed) so we can see why messages don't reach the phone.
+    Returns True if the payload also carries at least one inbound message.
+    """
+    has_messages = False
+    for entry in data.get("entry", []):
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+            for status in value.get("statuses", []):
+                sid = status.get("id", "")
+                recipient = status.get("recipient_id", "")
+                s = status.get("status", "")
+                err = status.get("errors", [])
+                print(f"📬 Status: to={recipient} status={s} id={sid} errors={err}")
+            if value.get("messages"):
+                has_messages = True
+    return has_messages
+
+
+def purge_processed_messages():
+    """Delete dedupe rows older than the redelivery window. Returns the number deleted."""
+    cutoff = timezone.now() - timedelta(seconds=DEDUPE_TTL_SECONDS)
+    deleted, _ = ProcessedMessage.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def is_processed(wamid):
+    """
+    True if a WhatsApp message id was already handled (a redelivery). Checks this process's
+    memory first, then ProcessedMessage, so retries landing on another worker are dropped too.
+    """
+    if not wamid:
+        return False
+    if wamid in _seen_message_ids:
+        return True
+    if ProcessedMessage.objects.filter(wamid=wamid).exists():
+        _seen_message_ids.add(wamid)
+        return True
+    return False
+
+
+def record_message_id(wamid):
+    """
+    Record a WhatsApp message id as handled. Called inside the transaction that saves the turn,
+    so the id only sticks if the turn does: a turn that raises (or a worker that dies) leaves
+    the message to be processed by the redelivery. Returns False if another worker recorded it
+    first, i.e. it already handled a concurrent redelivery of the same message.
+    """
+    if not wamid:
+        return True
+    try:
+        with transaction.atomic():
+            ProcessedMessage.objects.create(wamid=wamid)
+    except IntegrityError:
+        return False
+    return True
+
+
+def _remember_message_id(wamid):
+    """After the turn committed: remember the id in this process and purge old rows now and then."""
+    global _last_purge
+    if wamid:
+        _seen_message_ids.add(wamid)
+    now = time.monotonic()
+    if now - _last_purge > _PURGE_INTERVAL_SECONDS:
+        _last_purge = now
+        try:
+            purge_processed_messages()
+        except Exception as e:
+            print("⚠️ Failed to purge processed message ids |", e)
+
+
+def iter_messages(data):
+    """Yield (value, message) pairs for every inbound message in a webhook payload."""
+    for entry in data.get("entry", []):
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+            for message in value.get("messages", []) or []:
+                yield value, message
+
+
+def process_payload(data):
+    """Run the conversation flow for every message in one webhook payload (statuses are only logged)."""
+    log_statuses(data)
+    for value, message in iter_messages(data):
+        handle_message(value, message)
+
+
+def handle_message(value, message):
+    """Run one inbound message through the flow, persist the session/tickets and send the reply."""
+    phone = (message.get("from") or "").strip()
+    if not phone:
+        return
+    # Drop Meta redeliveries before any session or AI work
+    wamid = message.get("id")
+    if is_processed(wamid):
+        print("🔁 Duplicate message", wamid, "from", phone, "- skipped.")
+        return
+    # WhatsApp Cloud API: value.contacts can contain { wa_id, profile: { name } }
+    profile_name = ""
+    for c in value.get("contacts") or []:
+        if str(c.get("wa_id", "")) == str(phone):
+            profile_name = (c.get("profile") or {}).get("name", "") or ""
+            break
+    if not profile_name and (value.get("contacts") or []):
+        profile_name = (value["contacts"][0].get("profile") or {}).get("name", "") or ""
+
+    msg_type = message.get("type", "text")
+    if msg_type == "interactive":
+        interactive = message.get("interactive") or {}
+        if interactive.get("type") == "button_reply":
+            br = interactive.get("button_reply") or {}
+            body = (br.get("title") or br.get("id") or "").strip()
+        else:
+            body = "[Interactive message]"
+    elif msg_type != "text":
+        body = "[Non-text message received]"
+    else:
+        body = (message.get("text", {}) or {}).get("body", "")
+
+    # Read the session, run the turn, then save only if no other worker saved the session in
+    # between (version check); on a conflict redo the turn on the fresh session. The session,
+    # the turn's tickets and the message id are committed in one transaction, after the turn
+    # succeeded, and replies are sent only after that, so a redone or failed turn never
+    # duplicates them and a failed one is processed again when Meta (or the queue) retries.
+    deadline = Deadline(TURN_DEADLINE_SECONDS)
+    for attempt in range(SESSION_SAVE_ATTEMPTS):
+        # One lookup; a new or idle (>10 min) session comes back at WELCOME
+        session = session_store.get(phone, fresh=attempt > 0)
+        next_state, context_update, reply = process_message(
+            session.state,
+            session.context,
+            session.language,
+            body,
+            profile_name=profile_name or None,
+            deadline=deadline,
+        )
+        session.state = next_state
+        session.context = context_update
+        if "language" in context_update:
+            session.language = context_update["language"]
+        with transaction.atomic():
+            if not record_message_id(wamid):
+                print("🔁 Duplicate message", wamid, "from", phone, "- handled by another worker meanwhile, skipped.")
+                return
+            # Before the save: a new ticket's id goes into the session saved with it
+            reply = run_reply_actions(reply, session)
+            if session_store.save(session):
+                break
+            # Not handled after all: drop the message id with the rest of the attempt
+            transaction.set_rollback(True)
+        print("🔀 Session of", phone, "changed by another worker - re-running the turn (attempt", attempt + 1, ")")
+    else:
+        raise SessionConflict(f"session of {phone} still conflicting after {SESSION_SAVE_ATTEMPTS} attempts")
+    _remember_message_id(wamid)
+
+    lang = session.language or "sw"
+
+    # Guarantee a response (fallback welcome if reply ever empty)
+    if not (reply.text or "").strip():
+        reply = Reply(get_welcome_message(lang, name=profile_name or None), MENU, media=LOGO)
+    send_reply(phone, reply, next_state)
+
+
+def _track_list_text(phone, list_type, lang):
+    """The sender's last 20 complaints or questions, newest first."""
+    phone_digits = re.sub(r"\D", "", str(phone))
+    tickets = list(Ticket.objects.track_list(phone_digits, list_type))
+    if list_type == "complaint":
+        header = _t(lang, "Your complaints:\n\n", "Malalamiko yako:\n\n")
+    else:
+        header = _t(lang, "Your questions:\n\n", "Maswali yako:\n\n")
+    if not tickets:
+        return header + (
+            _t(lang, "No complaints submitted yet.", "Hakuna malalamiko yaliyowasilishwa.")
+            if list_type == "complaint"
+            else _t(lang, "No questions submitted yet.", "Hakuna maswali yaliyowasilishwa.")
+        )
+    lines = []
+    for t in tickets:
+        status_label = {
+            "received": _t(lang, "Received", "Imepokelewa"),
+            "in_progress": _t(lang, "In review", "Inakaguliwa"),
+            "answered": _t(lang, "Answered", "Imegibiwa"),
+        }.get(t.status, t.status)
+        line = (
+            f"• {_t(lang, 'ID', 'Kitambulisho')}: {t.ticket_id}\n"
+            f"  {_t(lang, 'Message', 'Ujumbe')}: {t.message}\n"
+            f"  {_t(lang, 'Status', 'Hali')}: {status_label} | {t.created_at.strftime('%Y-%m-%d %H:%M')}"
+        )
+        if t.status == Ticket.STATUS_ANSWERED and (t.feedback or "").strip():
+            line += f"\n  {_t(lang, 'Answer', 'Jibu')}: {(t.feedback or '').strip()}"
+        lines.append(line)
+    return header + "\n".join(lines)
+
+
+def run_reply_actions(reply, session):
+    """
+    Run the DB side effects a reply asks for, in the transaction that saves the session; returns
+    the reply, with its text filled in if needed. A new ticket's id is also stored in the session.
+    """
+    phone_digits = re.sub(r"\D", "", str(session.phone_number))
+    lang = session.language or "sw"
+    for action in reply.actions:
+        if isinstance(action, CreateTicket):
+            # Taken here so a turn that rolls back (conflict or error) also gives its number back.
+            # Ids are unique in the DB: a clash raises instead of answering with someone else's ticket
+            ticket_id = next_ticket_id()
+            Ticket.objects.create(
+                ticket_id=ticket_id,
+                phone_number=phone_digits,
+                ticket_type=action.ticket_type,
+                message=action.message,
+                status=Ticket.STATUS_RECEIVED,
+                department=action.department,
+            )
+            session.context["ticket_id"] = ticket_id
+            reply = reply.with_ticket_id(ticket_id)
+        elif isinstance(action, ListTickets):
+            reply = reply.with_text(_track_list_text(session.phone_number, action.ticket_type, lang))
+    return reply
+
+
+def send_reply(phone, reply, state=""):
+    """Deliver a Reply in the fewest WhatsApp messages its kind allows."""
+    if reply.kind == MENU and reply.media == LOGO:
+        # Welcome / main menu: logo + full text as ONE message (image caption), plain text if that fails
+        if getattr(settings, "LOGO_URL", None):
+            print("🖼️ Sending welcome: logo + full welcome text as single image message to", phone)
+            result = send_logo_with_caption(phone, reply.text)
+            if not result.get("error"):
+                print("✅ Welcome delivered in single image+caption message (state=" + state + ")")
+                return
+            print("⚠️ Welcome logo failed for", phone, "|", result.get("error"))
+        else:
+            print("⚠️ LOGO_URL not set; skipping welcome image for", phone)
+        send_message(phone, reply.text)
+        print("✅ Welcome SMS sent to", phone, "(state=" + state + ")")
+        return
+    buttons = [{"id": b.id, "title": b.title} for b in reply.buttons]
+    if reply.kind == CHOICE:
+        # Only one interactive message: the prompt and its buttons, no separate text
+        send_interactive_buttons(phone, reply.text, buttons)
+    elif buttons:
+        send_text_with_buttons(phone, reply.text, buttons, reply.prompt, reply.merge_prompt)
+        print("✅ Reply + buttons sent to", phone, "(state=" + state + ")")
+    else:
+        send_message(phone, reply.text)
+        print("✅ Reply sent to", phone, "(state=" + state + ")")
+
+
+# ---- Inbound queue (WEBHOOK_MODE = "queue") ----
+
+def enqueue_payload(data):
+    """Durably store a webhook payload for the worker. Returns the InboundEvent."""
+    return InboundEvent.objects.create(payload=data)
+
+
+def requeue_stale(max_age_seconds=STALE_LOCK_SECONDS):
+    """
+    Put events left in 'processing' by a crashed worker back to 'pending' (their claim counted
+    as an attempt); events that used up INBOUND_MAX_ATTEMPTS this way are marked failed.
+    Returns the number put back.
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+    stale = InboundEvent.objects.filter(status=InboundEvent.STATUS_PROCESSING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=INBOUND_MAX_ATTEMPTS).update(
+        status=InboundEvent.STATUS_FAILED, locked_at=None, processed_at=timezone.now(),
+        error="worker stopped while processing the event",
+    )
+    if failed:
+        print("🚨", failed, "inbound event(s) failed permanently: the worker stopped while processing them")
+    return stale.update(status=InboundEvent.STATUS_PENDING, locked_at=None)
+
+
+def claim_events(batch_size=20):
+    """
+    Claim up to batch_size due pending events (oldest first).
+    Each row is claimed with a conditional UPDATE so several workers can drain the same table.
+    """
+    claimed = []
+    candidates = InboundEvent.objects.filter(
+        status=InboundEvent.STATUS_PENDING, next_attempt_at__lte=timezone.now()
+    ).order_by("id")[:batch_size]
+    for event in candidates:
+        now = timezone.now()
+        won = InboundEvent.objects.filter(pk=event.pk, status=InboundEvent.STATUS_PENDING).update(
+            status=InboundEvent.STATUS_PROCESSING, locked_at=now, attempts=event.attempts + 1
+        )
+        if won:
+            event.status = InboundEvent.STATUS_PROCESSING
+            event.locked_at = now
+            event.attempts += 1
+            claimed.append(event)
+    return claimed
+
+
+def retry_delay(attempts):
+    """Seconds before the next attempt of an event that failed `attempts` times."""
+    return min(INBOUND_RETRY_MAX_SECONDS, INBOUND_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+def finish_event(event, error=None):
+    """
+    Mark a claimed event as done. On an error it goes back to pending for another attempt after
+    a backoff, or is marked failed once it has had INBOUND_MAX_ATTEMPTS (messages it already
+    handled are skipped on the retry, see record_message_id).
+    """
+    event.error = str(error or "")[:2000]
+    event.locked_at = None
+    if error is None:
+        event.status = InboundEvent.STATUS_DONE
+        event.processed_at = timezone.now()
+    elif event.attempts < INBOUND_MAX_ATTEMPTS:
+        delay = retry_delay(event.attempts)
+        event.status = InboundEvent.STATUS_PENDING
+        event.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        print(
+            "⏳ Inbound event", event.pk, f"failed (attempt {event.attempts}/{INBOUND_MAX_ATTEMPTS}),",
+            f"retrying in {delay:.0f}s |", error,
+        )
+    else:
+        event.status = InboundEvent.STATUS_FAILED
+        event.processed_at = timezone.now()
+        print("🚨 Inbound event", event.pk, "failed permanently after", event.attempts, "attempts |", error)
+    event.save(update_fields=["status", "error", "locked_at", "next_attempt_at", "processed_at"])
+
+
+def process_event(event):
+    """Run a claimed event's messages inline and record the outcome. Returns True if it succeeded."""
+    try:
+        process_payload(event.payload)
+    except Exception as e:
+        finish_event(event, error=e)
+        return False
+    finish_event(event)
+    return True
+
+
+def drain_queue(batch_size=20):
+    """Claim one batch of queued payloads and process it inline, in order. Returns the number of events handled."""
+    events = claim_events(batch_size)
+    for event in events:
+        process_event(event)
+    return len(events)
+
+
+class QueueDispatcher:
+    """
+    Feeds queued events to a LanePool without waiting for whole batches: new events are
+    claimed whenever fewer than `max_in_flight` are running, and each event is finished
+    once all of its messages have run. Messages are submitted under their phone number in
+    queue order, so a citizen's messages keep their order (across claims too, with a single
+    process_inbound), while a slow turn holds back only that citizen's later messages.
+    """
+
+    def __init__(self, pool, max_in_flight=20):
+        self.pool = pool
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._in_flight = []  # (event, futures) in claim order
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    def poll(self):
+        """Finish completed events, then claim and submit new ones. Returns the number finished + claimed."""
+        finished = self.finish_completed()
+        room = self.max_in_flight - len(self._in_flight)
+        events = claim_events(room) if room > 0 else []
+        for event in events:
+            self._submit(event)
+        return finished + len(events)
+
+    def _submit(self, event):
+        try:
+            log_statuses(event.payload)
+            futures = [
+                self.pool.submit((message.get("from") or "").strip(), handle_message, value, message)
+                for value, message in iter_messages(event.payload)
+            ]
+        except Exception as e:
+            finish_event(event, error=e)
+            return
+        self._in_flight.append((event, futures))
+
+    def finish_completed(self):
+        """Record the outcome of every event whose messages have all run. Returns how many."""
+        running = []
+        finished = 0
+        for event, futures in self._in_flight:
+            if not all(f.done() for f in futures):
+                running.append((event, futures))
+                continue
+            error = next((e for e in (f.exception() for f in futures) if e is not None), None)
+            finish_event(event, error=error)
+            finished += 1
+        self._in_flight = running
+        return finished
+
+    def wait(self, timeout=None):
+        """Block until a running message completes, or `timeout` seconds pass."""
+        futures = [f for _event, fs in self._in_flight for f in fs if not f.done()]
+        if futures:
+            concurrent.futures.wait(futures, timeout, return_when=concurrent.futures.FIRST_COMPLETED)
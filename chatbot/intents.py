@@ -0,0 +1,132 @@
+# chatbot/intents.py – global intents (greeting, complaint, question, menu phrase) matched in one pass
+import re
+import string
+import unicodedata
+
+INTENT_GREETING = "greeting"
+INTENT_COMPLAINT = "complaint"
+INTENT_QUESTION = "question"
+INTENT_MENU = "menu"
+
+# Greetings: if user sends any of these (exact match, case-insensitive), clear session and send welcome
+GREETING_WORDS = frozenset({
+    "hi", "hello", "hellow", "helo", "hey", "boss", "hei",
+    "habari", "mambo", "niaje", "vipi", "vp", "kwema", "salama", "oi", "bablai",
+    "za sahizi", "za asubuhi",
+})
+
+# Complaint: if user message contains any of these (substring), go to option 7 (Wasilisha Malalamiko)
+COMPLAINT_PHRASES = (
+    "malalamiko", "kero", "changamoto",
+    "nina malalamiko", "nataka kukalamika", "naomba kukalamika", "kuna malalamiko",
+)
+
+# Question keywords: exact match only – go to submit-question flow (e.g. "swali", "maswali")
+# NOTE: We *skip* this when in TRACK_CHOICE so "swali"/"maswali" is used for tracking.
+QUESTION_KEYWORDS = frozenset({
+    "swali", "maswali",
+})
+
+# Messages that look like menu choices (incl. our button titles) – do not run free-form Q&A on these
+MENU_LIKE_PHRASES = frozenset({
+    "menyu kuu", "wasilisha swali", "malalamiko", "maswali",
+    "fuatilia tiketi", "fuatilia tiketi yangu",
+    "main menu", "submit a question", "track my ticket",
+})
+
+_ASCII_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation})
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_REPEAT_RE = re.compile(r"([^\W\d_])\1{2,}")
+_TRIPLE_RE = re.compile(r"(.)\1\1")  # cheap pre-check: most messages have no run to squeeze
+
+
+def _clean(text):
+    """Lower case, accents, punctuation and emoji removed, whitespace collapsed."""
+    text = (text or "").lower()
+    if text.isascii():
+        text = text.translate(_ASCII_PUNCTUATION)
+    else:
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        text = _NON_WORD_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def squeeze_repeats(text):
+    """Letters repeated 3+ times become one: "helloooo" -> "hello", "asanteee" -> "asante"."""
+    return _REPEAT_RE.sub(r"\1", text) if _TRIPLE_RE.search(text) else text
+
+
+def normalize(text):
+    """
+    Canonical form for keyword matching: lower case, accents, punctuation and emoji removed,
+    letters repeated 3+ times squeezed to one ("Habariii!!" -> "habari", "hi 👋" -> "hi"),
+    whitespace collapsed.
+    """
+    return squeeze_repeats(_clean(text))
+
+
+class IntentMatcher:
+    """
+    All keyword tables compiled into one matcher. Each rule is (intent, phrases, mode) with
+    mode "exact" (whole message, one dict lookup) or "contains" (substring, all such phrases
+    in one compiled alternation); rules are listed in priority order and the best match wins.
+    """
+
+    def __init__(self, rules):
+        self.intents = []
+        self._exact = {}
+        self._exact_max_len = 0
+        alternatives = []
+        for priority, (intent, phrases, mode) in enumerate(rules):
+            self.intents.append(intent)
+            if mode == "exact":
+                for phrase in phrases:
+                    key = normalize(phrase)
+                    self._exact.setdefault(key, priority)
+                    self._exact_max_len = max(self._exact_max_len, len(key))
+            elif mode == "contains":
+                # Longest first, so a phrase never shadows a longer one it prefixes
+                words = "|".join(re.escape(normalize(p)) for p in sorted(phrases, key=len, reverse=True))
+                alternatives.append(f"(?P<r{priority}>{words})")
+            else:
+                raise ValueError(f"unknown match mode {mode!r}")
+        self._contains = re.compile("|".join(alternatives)) if alternatives else None
+
+    def match_cleaned(self, cleaned):
+        best = None
+        # Repeated letters only matter for short messages that could be an exact phrase
+        if len(cleaned) <= 3 * self._exact_max_len:
+            best = self._exact.get(squeeze_repeats(cleaned), self._exact.get(cleaned))
+        if self._contains is not None and (best is None or best > 0):
+            m = self._contains.search(cleaned)
+            if m is not None:
+                priority = int(m.lastgroup[1:])
+                if best is None or priority < best:
+                    best = priority
+        return None if best is None else self.intents[best]
+
+    def match(self, text):
+        """Intent of the message (one of the INTENT_* constants) or None."""
+        return self.match_cleaned(_clean(text))
+
+
+# Priority: greeting > complaint > question keyword > menu-like phrase
+INTENT_MATCHER = IntentMatcher([
+    (INTENT_GREETING, GREETING_WORDS, "exact"),
+    (INTENT_COMPLAINT, COMPLAINT_PHRASES, "contains"),
+    (INTENT_QUESTION, QUESTION_KEYWORDS, "exact"),
+    (INTENT_MENU, MENU_LIKE_PHRASES, "exact"),
+])
+
+
+def match_intent(text):
+    return INTENT_MATCHER.match(text)
+
+
+_MENU_LIKE_KEYS = frozenset(normalize(p) for p in MENU_LIKE_PHRASES)
+
+
+def is_menu_like(text):
+    """True if the message is one of MENU_LIKE_PHRASES, even when a higher-priority intent matched it."""
+    return normalize(text) in _MENU_LIKE_KEYS
@@ -0,0 +1,101 @@
+# chatbot/jsonfile.py – JSON files written by a management command and hot-reloaded by every worker
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def read_json(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def write_json(path, data, **dump_options):
+    """
+    Atomically replace `path` with `data` as JSON: readers see the old file or the new one,
+    never a half-written one, and the content is on disk before the rename.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, **dump_options)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JsonFile:
+    """
+    In-memory copy of a JSON file, re-loaded when the file changes (checked at most every
+    `check_interval` seconds). Subclasses turn the parsed JSON into their data in parse(),
+    raising ValueError for content they cannot use.
+
+    A missing or unusable file gives `empty`, unless keep_on_error is set: then the last
+    good data stays in use.
+    """
+
+    empty = None
+    keep_on_error = False
+
+    def __init__(self, path, check_interval=10.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._data = self.empty
+        self._stamp = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def parse(self, data):
+        return data
+
+    def _file_stamp(self):
+        """(mtime_ns, size, inode) of the file; raises OSError if it is missing."""
+        stat = self.path.stat()
+        # The inode changes with every write_json (rename), so a rewrite is seen even when
+        # the filesystem's mtime resolution would hide it
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                stamp = self._file_stamp()
+            except OSError:
+                if not self.keep_on_error:
+                    self._data, self._stamp = self.empty, None
+                return
+            if stamp == self._stamp:
+                return
+            # Remembered even when unusable, so a broken file is not re-read until it changes
+            self._stamp = stamp
+            try:
+                self._data = self.parse(read_json(self.path))
+            except (OSError, ValueError) as e:
+                logger.warning("ChembaBot: could not load %s: %s", self.path, e)
+                if not self.keep_on_error:
+                    self._data = self.empty
+
+    @property
+    def data(self):
+        self._refresh()
+        return self._data
+
+    def reload(self):
+        """Check the file now instead of after check_interval."""
+        self._checked = None
+        self._refresh()
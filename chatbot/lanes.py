@@ -0,0 +1,88 @@
+# chatbot/lanes.py – per-phone ordered, cross-phone parallel worker pool
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connection
+
+_STOP = object()
+
+
+class LanePool:
+    """
+    Fixed set of worker threads ("lanes") running work submitted under a key (the phone number).
+
+    Work for one key runs one item at a time, in submission order, so all messages from one
+    citizen are handled one after another. Different keys run concurrently on whichever
+    lane is free: a slow turn only holds back its own citizen's later messages, never
+    another phone's.
+    """
+
+    def __init__(self, lanes=4, name="lane"):
+        self.size = max(1, int(lanes))
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> deque of queued work; present while the key has work queued or running
+        self._ready = queue.Queue()  # keys with work that no lane has picked up yet
+        self._threads = []
+        for i in range(self.size):
+            t = threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) behind earlier work for `key`. Returns a concurrent.futures.Future."""
+        future = Future()
+        with self._lock:
+            items = self._pending.get(key)
+            if items is None:
+                items = self._pending[key] = deque()
+                self._ready.put(key)
+            items.append((future, fn, args, kwargs))
+        return future
+
+    def busy(self, key):
+        """True while work for `key` is queued or running."""
+        with self._lock:
+            return key in self._pending
+
+    def shutdown(self, wait=True):
+        """Stop all lanes after the work already queued has run."""
+        for _ in self._threads:
+            self._ready.put(_STOP)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _next_item(self, key):
+        with self._lock:
+            items = self._pending[key]
+            if not items:
+                del self._pending[key]
+                return None
+            return items.popleft()
+
+    def _run(self):
+        try:
+            while True:
+                key = self._ready.get()
+                if key is _STOP:
+                    break
+                # This lane owns the key until its queue is empty; work submitted meanwhile joins it
+                while True:
+                    item = self._next_item(key)
+                    if item is None:
+                        break
+                    future, fn, args, kwargs = item
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    close_old_connections()
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+        finally:
+            # Each lane thread owns its own DB connection
+            connection.close()
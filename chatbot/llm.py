@@ -0,0 +1,247 @@
+# chatbot/llm.py – pooled OpenAI chat client with retries, a circuit breaker and call counters
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+from django.conf import settings
+
+from .http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = getattr(settings, "OPENAI_HTTP_POOL_SIZE", 10)
+TIMEOUT = (
+    getattr(settings, "OPENAI_CONNECT_TIMEOUT", 3.05),
+    getattr(settings, "OPENAI_READ_TIMEOUT", 20),
+)
+MAX_RETRIES = getattr(settings, "OPENAI_MAX_RETRIES", 2)
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 4.0
+# How often each process logs its call counters (0 disables)
+STATS_LOG_SECONDS = getattr(settings, "OPENAI_STATS_LOG_SECONDS", 300)
+
+# Statuses worth another attempt: rate limited or temporarily unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive failures. Once `cooldown` seconds have
+    passed one trial call is let through (half-open): success closes the circuit, failure
+    opens it for another cool-down.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End a call without a verdict on availability (a half-open trial may be retried)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning("ChembaBot: OpenAI circuit opened after %s failures", self.failures)
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class CallStats:
+    """Per-process counters of OpenAI calls: outcomes by status and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.attempts = 0
+        self.statuses = Counter()  # "200", "429", "timeout", "connection_error", "circuit_open", ...
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, status, elapsed_ms, attempts):
+        with self._lock:
+            self.calls += 1
+            self.attempts += attempts
+            self.statuses[str(status)] += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.last_ms = elapsed_ms
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "statuses": dict(self.statuses),
+                "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+                "max_ms": self.max_ms,
+                "last_ms": self.last_ms,
+            }
+
+
+breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, "OPENAI_BREAKER_THRESHOLD", 5),
+    cooldown=getattr(settings, "OPENAI_BREAKER_COOLDOWN_SECONDS", 30),
+)
+stats = CallStats()
+_last_stats_log = time.monotonic()
+_stats_log_lock = threading.Lock()
+
+
+def log_stats_if_due():
+    """Log this process's call counters and breaker state at most every STATS_LOG_SECONDS."""
+    global _last_stats_log
+    now = time.monotonic()
+    with _stats_log_lock:
+        if not STATS_LOG_SECONDS or now - _last_stats_log < STATS_LOG_SECONDS:
+            return False
+        _last_stats_log = now
+    snap = stats.snapshot()
+    logger.info(
+        "ChembaBot: OpenAI stats calls=%s attempts=%s statuses=%s mean=%.0fms max=%.0fms breaker=%s",
+        snap["calls"],
+        snap["attempts"],
+        snap["statuses"],
+        snap["mean_ms"],
+        snap["max_ms"],
+        breaker.state,
+    )
+    return True
+
+
+def retry_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number `attempt` (1-based): Retry-After if given, else jittered backoff."""
+    if retry_after:
+        try:
+            return min(RETRY_MAX_SECONDS, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (attempt - 1))))
+
+
+def chat_completion(messages, *, api_key, model, api_base, temperature=0.4, max_tokens=700, timeout=None, deadline=None):
+    """
+    POST a chat completion and return the assistant message text, or None on failure.
+
+    429/5xx responses and connection failures (including connect timeouts) are retried up to
+    MAX_RETRIES times with jittered backoff; read timeouts are not (the user already waited once).
+    While the circuit breaker is open no request is made at all. With a `deadline`
+    (deadline.Deadline) every attempt only gets the time left, and no retry starts after it;
+    a timeout cut short that way is recorded as "deadline" and never counts against the breaker.
+    """
+    if deadline is not None and deadline.expired():
+        stats.record("deadline", 0.0, 0)
+        logger.warning("ChembaBot: turn deadline reached, skipping OpenAI call")
+        log_stats_if_due()
+        return None
+    if not breaker.allow():
+        stats.record("circuit_open", 0.0, 0)
+        logger.warning("ChembaBot: OpenAI circuit open, skipping call")
+        log_stats_if_due()
+        return None
+
+    session = get_session("openai", POOL_SIZE)
+    url = f"{api_base.rstrip('/')}/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+    start = time.perf_counter()
+    attempts = 0
+    status = None
+    content = None
+    connect_timeout, read_timeout = timeout or TIMEOUT
+    while True:
+        attempts += 1
+        retry_after = None
+        attempt_timeout = (connect_timeout, read_timeout)
+        if deadline is not None:
+            attempt_timeout = (deadline.timeout(connect_timeout), deadline.timeout(read_timeout))
+        try:
+            r = session.post(url, headers=headers, json=payload, timeout=attempt_timeout)
+            status = r.status_code
+            retry_after = r.headers.get("Retry-After")
+            if status == 200:
+                choice = (r.json().get("choices") or [{}])[0]
+                message = (choice.get("message") or {}).get("content")
+                content = str(message).strip() if message else None
+                break
+            retryable = status in RETRY_STATUSES
+            logger.warning("ChembaBot: OpenAI returned %s: %s", status, r.text[:200])
+        except requests.ConnectTimeout:
+            if attempt_timeout[0] < connect_timeout:
+                # Cut short by the turn deadline: says nothing about the API's health, no time to retry
+                status, retryable = "deadline", False
+            else:
+                status, retryable = "connect_timeout", True
+            logger.warning("ChembaBot: OpenAI connect timed out (%s)", status)
+        except requests.Timeout:
+            # A timeout shortened by the turn deadline says nothing about the API's health
+            status = "deadline" if attempt_timeout[1] < read_timeout else "timeout"
+            retryable = False
+            logger.warning("ChembaBot: OpenAI request timed out (%s)", status)
+        except requests.ConnectionError as e:
+            status, retryable = "connection_error", True
+            logger.warning("ChembaBot: OpenAI connection error: %s", e)
+        except ValueError as e:
+            status, retryable = "bad_response", False
+            logger.warning("ChembaBot: OpenAI returned invalid JSON: %s", e)
+        if not retryable or attempts > MAX_RETRIES:
+            break
+        delay = retry_delay(attempts, retry_after)
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None and remaining < delay + 1.0:
+            logger.warning("ChembaBot: no time left in the turn for another OpenAI attempt")
+            break
+        time.sleep(delay)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats.record(status, elapsed_ms, attempts)
+    if status == 200:
+        breaker.record_success()
+    elif status in RETRY_STATUSES or status in ("timeout", "connect_timeout", "connection_error"):
+        breaker.record_failure()
+    elif status == "deadline":
+        breaker.release()
+    else:
+        # Client errors (400/401/...) say nothing about availability
+        breaker.release()
+    logger.info("ChembaBot: OpenAI call status=%s attempts=%s latency=%.0fms", status, attempts, elapsed_ms)
+    log_stats_if_due()
+    return content
@@ -0,0 +1,79 @@
+# chatbot/management/commands/bench_flow.py
+import json
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot import flow
+
+CORPUS_PATH = Path(flow.__file__).parent / "testdata" / "golden_conversations.json"
+
+
+def _stub_web_search(question, lang="sw", deadline=None):
+    if "chemba" in question.lower():
+        return "Jibu la majaribio.", True
+    return "", False
+
+
+def _stub_rewrite(header, body, lang="sw", deadline=None):
+    return header
+
+
+def _stub_ticket_id():
+    return "DCT-260112-0001"
+
+
+def load_turns():
+    """(state, context, language, message, profile_name) of every recorded turn, in order."""
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    turns = []
+    for conversation in corpus["conversations"]:
+        state = conversation.get("state")
+        ctx = conversation.get("context") or {}
+        lang = conversation.get("language", "sw")
+        for turn in conversation["turns"]:
+            turns.append((state, ctx, lang, turn["message"], conversation.get("profile_name") or None))
+            state, ctx = turn["state"], dict(turn["context"])
+            lang = ctx.get("language", lang)
+            ctx.pop("track_list_type", None)
+    return turns
+
+
+class Command(BaseCommand):
+    help = "Throughput of process_message over the recorded conversations, with the AI calls and ticket ids stubbed out."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=500)
+        parser.add_argument(
+            "--max-us", type=float, default=None,
+            help="Fail if the mean time per message exceeds this many microseconds (regression guard).",
+        )
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+        turns = load_turns()
+        per_state = defaultdict(float)
+        counts = Counter(state or flow.WELCOME for state, *_ in turns)
+        with mock.patch.object(flow, "answer_from_web_search", _stub_web_search), \
+                mock.patch.object(flow, "rewrite_info_answer", _stub_rewrite), \
+                mock.patch.object(flow, "next_ticket_id", _stub_ticket_id):
+            deadline = flow.Deadline()
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for state, ctx, lang, message, name in turns:
+                    t0 = time.perf_counter()
+                    flow.process_message(state, ctx, lang, message, profile_name=name, deadline=deadline)
+                    per_state[state or flow.WELCOME] += time.perf_counter() - t0
+            elapsed = time.perf_counter() - start
+
+        messages = rounds * len(turns)
+        mean_us = elapsed * 1e6 / messages
+        self.stdout.write(f"corpus={len(turns)} turns x {rounds} rounds")
+        self.stdout.write(f"process_message: {mean_us:8.1f} us/message, {messages / elapsed:10.0f} messages/s")
+        for state, total in sorted(per_state.items(), key=lambda kv: -kv[1] / counts[kv[0]]):
+            self.stdout.write(f"  {state:26s} {total * 1e6 / (rounds * counts[state]):8.1f} us")
+        if options["max_us"] is not None and mean_us > options["max_us"]:
+            raise CommandError(f"process_message regression: {mean_us:.1f} us/message > {options['max_us']:.1f}")
@@ -0,0 +1,88 @@
+# chatbot/management/commands/bench_graph_send.py
+import contextlib
+import io
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from chatbot import utils
+
+
+class _StubGraphHandler(BaseHTTPRequestHandler):
+    """Answers every POST like the Graph API messages endpoint; supports keep-alive."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    handshake_seconds = 0.0
+
+    def setup(self):
+        super().setup()
+        # Runs once per TCP connection: stands in for the DNS + TCP + TLS cost of a new connection
+        if self.handshake_seconds:
+            time.sleep(self.handshake_seconds)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = json.dumps({"messaging_product": "whatsapp", "messages": [{"id": "wamid.bench"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"mean={statistics.mean(samples):.2f}ms p50={statistics.median(samples):.2f}ms p95={p95:.2f}ms"
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-send latency against a local stub Graph API: fresh requests.post vs pooled session."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sends", type=int, default=200)
+        parser.add_argument(
+            "--handshake-ms",
+            type=float,
+            default=0.0,
+            help="Delay the stub adds per new connection, to emulate TLS/RTT to graph.facebook.com.",
+        )
+
+    def handle(self, *args, **options):
+        _StubGraphHandler.handshake_seconds = options["handshake_ms"] / 1000.0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGraphHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/v21.0"
+        sends = options["sends"]
+        payload = {"messaging_product": "whatsapp", "to": "255700000000", "type": "text", "text": {"body": "Habari"}}
+
+        fresh = []
+        for _ in range(sends):
+            start = time.perf_counter()
+            requests.post(f"{base}/{utils.PHONE_ID}/messages", json=payload, timeout=15).json()
+            fresh.append((time.perf_counter() - start) * 1000)
+
+        original = utils.GRAPH_API_URL
+        utils.GRAPH_API_URL = base
+        pooled = []
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(sends):
+                    start = time.perf_counter()
+                    utils.send_message("255700000000", "Habari")
+                    pooled.append((time.perf_counter() - start) * 1000)
+        finally:
+            utils.GRAPH_API_URL = original
+            server.shutdown()
+
+        self.stdout.write(f"sends={sends} handshake={options['handshake_ms']}ms")
+        self.stdout.write(f"before (requests.post per send): {_summary(fresh)}")
+        self.stdout.write(f"after  (pooled keep-alive):      {_summary(pooled)}")
@@ -0,0 +1,72 @@
+# chatbot/management/commands/bench_intents.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from chatbot.intents import (
+    COMPLAINT_PHRASES,
+    GREETING_WORDS,
+    INTENT_COMPLAINT,
+    INTENT_GREETING,
+    INTENT_MENU,
+    INTENT_QUESTION,
+    MENU_LIKE_PHRASES,
+    QUESTION_KEYWORDS,
+    match_intent,
+)
+
+# Shaped like real traffic: menu digits and short replies dominate, then greetings and questions
+CORPUS = [
+    "1", "2", "3", "4", "5", "7", "8", "9", "#", "1", "2", "ndio", "hapana", "sawa", "asante",
+    "Habari", "habari!", "Hi", "hi 👋", "Hellooo", "mambo vipi", "Za asubuhi", "niaje boss",
+    "Nina malalamiko kuhusu maji kijijini kwetu", "kero ya umeme imekuwa kubwa sana",
+    "Changamoto ya barabara ya Kwamtoro", "malalamiko",
+    "swali", "Maswali", "maswali?", "wasilisha swali", "Menyu kuu", "fuatilia tiketi yangu",
+    "Je, idadi ya watu wa Chemba ni ngapi?", "Ofisi ya mkurugenzi iko wapi?",
+    "What is the population of Chemba district?", "Naomba kujua fursa za uwekezaji zilizopo",
+    "Hospitali ya wilaya inapatikana wapi na ina huduma gani?", "DCT-48213", "REF-2024/118",
+    "19900101123450000123", "255712345678", "Asante sana kwa msaada wenu 🙏🏽",
+    "Nimeshalipa ada ya leseni ya biashara lakini sijapata cheti bado, nifanyeje?",
+]
+
+
+def legacy_intent(message):
+    """The checks process_message used to run one after another, for comparison."""
+    msg_lower = (message or "").strip().lower()
+    if msg_lower in GREETING_WORDS:
+        return INTENT_GREETING
+    if any(phrase in msg_lower for phrase in COMPLAINT_PHRASES):
+        return INTENT_COMPLAINT
+    if msg_lower in QUESTION_KEYWORDS:
+        return INTENT_QUESTION
+    if msg_lower in MENU_LIKE_PHRASES:
+        return INTENT_MENU
+    return None
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark of global intent matching over a realistic message corpus (legacy checks vs compiled matcher)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=2000)
+
+    def _time(self, fn, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in CORPUS:
+                fn(message)
+        return (time.perf_counter() - start) * 1e9 / (rounds * len(CORPUS))
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+        legacy_ns = self._time(legacy_intent, rounds)
+        compiled_ns = self._time(match_intent, rounds)
+        legacy_hits = sum(1 for m in CORPUS if legacy_intent(m))
+        compiled_hits = sum(1 for m in CORPUS if match_intent(m))
+        self.stdout.write(f"corpus={len(CORPUS)} messages x {rounds} rounds")
+        self.stdout.write(f"legacy checks:    {legacy_ns:8.0f} ns/message, {legacy_hits} intents recognised")
+        self.stdout.write(f"compiled matcher: {compiled_ns:8.0f} ns/message, {compiled_hits} intents recognised")
+        for message in CORPUS:
+            before, after = legacy_intent(message), match_intent(message)
+            if before != after:
+                self.stdout.write(f"  {message!r}: {before} -> {after}")
@@ -0,0 +1,98 @@
+# chatbot/management/commands/bench_retrieval.py
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from chatbot import ai_utils
+from chatbot.retrieval import estimate_tokens
+
+QUESTIONS = [
+    ("Je, idadi ya watu wa Chemba ni ngapi?", "sw"),
+    ("Wilaya ina kata ngapi na vijiji vingapi?", "sw"),
+    ("Kuna benki Chemba?", "sw"),
+    ("Dira ya Halmashauri ni ipi?", "sw"),
+    ("What is the population of Chemba district?", "en"),
+    ("How many villages have electricity?", "en"),
+    ("Which districts border Chemba?", "en"),
+    ("What crops are grown in Chemba?", "en"),
+]
+
+
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat endpoint whose latency grows with prompt size (like real prefill)."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    base_seconds = 0.05
+    seconds_per_1k_tokens = 0.05
+    prompt_tokens = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        tokens = sum(estimate_tokens(m.get("content", "")) for m in body.get("messages", []))
+        self.prompt_tokens.append(tokens)
+        time.sleep(self.base_seconds + self.seconds_per_1k_tokens * tokens / 1000.0)
+        out = json.dumps({"choices": [{"message": {"role": "assistant", "content": "Jibu la majaribio."}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Compare prompt size and latency of taarifa answers: whole knowledge text vs retrieved excerpts (stub LLM)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--base-ms", type=float, default=50.0, help="Fixed stub latency per call.")
+        parser.add_argument("--ms-per-1k-tokens", type=float, default=50.0, help="Stub latency per 1k prompt tokens.")
+
+    def _run(self, budget, rounds):
+        ai_utils.AI_CONTEXT_TOKEN_BUDGET = budget
+        _StubLLMHandler.prompt_tokens = []
+        latencies = []
+        for _ in range(rounds):
+            for question, lang in QUESTIONS:
+                start = time.perf_counter()
+                ai_utils.answer_freeform_question(question, lang)
+                latencies.append((time.perf_counter() - start) * 1000)
+        return _StubLLMHandler.prompt_tokens, latencies
+
+    def handle(self, *args, **options):
+        _StubLLMHandler.base_seconds = options["base_ms"] / 1000.0
+        _StubLLMHandler.seconds_per_1k_tokens = options["ms_per_1k_tokens"] / 1000.0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        saved = (ai_utils.OPENAI_API_BASE, ai_utils.OPENAI_API_KEY, ai_utils.AI_CONTEXT_TOKEN_BUDGET)
+        ai_utils.OPENAI_API_BASE = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        ai_utils.OPENAI_API_KEY = ai_utils.OPENAI_API_KEY or "bench"
+        try:
+            full = self._run(0, options["rounds"])
+            retrieved = self._run(saved[2] or 1500, options["rounds"])
+        finally:
+            ai_utils.OPENAI_API_BASE, ai_utils.OPENAI_API_KEY, ai_utils.AI_CONTEXT_TOKEN_BUDGET = saved
+            server.shutdown()
+
+        index = ai_utils.knowledge_index()
+        start = time.perf_counter()
+        for question, _lang in QUESTIONS:
+            index.select(question, token_budget=saved[2] or 1500)
+        select_ms = (time.perf_counter() - start) * 1000 / len(QUESTIONS)
+
+        self.stdout.write(
+            f"index: {len(index.chunks)} chunks, ~{index.total_tokens} tokens; "
+            f"select() {select_ms:.3f}ms/question"
+        )
+        for label, (tokens, latencies) in (("whole text", full), ("retrieved ", retrieved)):
+            self.stdout.write(
+                f"{label}: prompt mean={statistics.mean(tokens):.0f} tokens | "
+                f"latency mean={statistics.mean(latencies):.1f}ms p50={statistics.median(latencies):.1f}ms"
+            )
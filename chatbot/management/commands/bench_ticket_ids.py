@@ -0,0 +1,69 @@
+# chatbot/management/commands/bench_ticket_ids.py
+import os
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from chatbot.models import TicketSequence
+from chatbot.tickets import TicketIdGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Ticket id throughput under contention: --workers threads, each with its own DB connection and "
+        "generator (like separate processes), draw ids from one sequence. Uses a throwaway prefix."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--ids", type=int, default=200, help="Ids per worker.")
+        parser.add_argument("--block-sizes", default="1,10,100", help="Comma-separated TICKET_ID_BLOCK_SIZE values.")
+
+    def _run(self, prefix, block_size, workers, per_worker):
+        results = [None] * workers
+        errors = []
+        start_gate = threading.Barrier(workers + 1)
+
+        def work(i):
+            generate = TicketIdGenerator(prefix, block_size)
+            try:
+                start_gate.wait()
+                results[i] = [generate() for _ in range(per_worker)]
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+        for t in threads:
+            t.start()
+        start_gate.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise CommandError(f"block size {block_size}: {errors[0]}")
+        return results, elapsed
+
+    def handle(self, *args, **options):
+        workers, per_worker = options["workers"], options["ids"]
+        total = workers * per_worker
+        self.stdout.write(f"{workers} workers x {per_worker} ids ({connection.vendor})")
+        for block_size in (int(b) for b in options["block_sizes"].split(",")):
+            prefix = f"BENCH{os.getpid()}B{block_size}"
+            try:
+                results, elapsed = self._run(prefix, block_size, workers, per_worker)
+            finally:
+                TicketSequence.objects.filter(prefix__startswith=prefix).delete()
+            ids = [ticket_id for worker_ids in results for ticket_id in worker_ids]
+            if len(set(ids)) != total:
+                raise CommandError(f"block size {block_size}: {total - len(set(ids))} duplicate id(s)")
+            if any(worker_ids != sorted(worker_ids) for worker_ids in results):
+                raise CommandError(f"block size {block_size}: ids not increasing within a worker")
+            self.stdout.write(
+                f"  block={block_size:<4d} {total / elapsed:9.0f} ids/s  {elapsed * 1e6 / total:8.1f} us/id  "
+                f"unique, e.g. {ids[0]}"
+            )
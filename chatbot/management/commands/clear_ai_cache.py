@@ -0,0 +1,12 @@
+# chatbot/management/commands/clear_ai_cache.py
+from django.core.management.base import BaseCommand
+
+from chatbot.ai_utils import invalidate_ai_caches
+
+
+class Command(BaseCommand):
+    help = "Invalidate cached AI answers (menu rewrites and free-form answers) in every worker."
+
+    def handle(self, *args, **options):
+        invalidate_ai_caches()
+        self.stdout.write("AI answer caches invalidated.")
@@ -0,0 +1,28 @@
+# chatbot/management/commands/compile_content.py
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot.content import CONTENT_CATALOG_PATH, SOURCE_DIR, compile_sources, load_sources, write_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate the content sources (chatbot/texts/<lang>.json) and write the compiled catalog "
+        "the workers load. Run it on deploy; running workers pick up the new file within seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source-dir", default=str(SOURCE_DIR))
+        parser.add_argument("--output", default=str(CONTENT_CATALOG_PATH))
+        parser.add_argument("--check", action="store_true", help="Only validate the sources; write nothing.")
+
+    def handle(self, *args, **options):
+        try:
+            compiled = compile_sources(load_sources(options["source_dir"]))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Invalid content: {e}")
+        languages = ", ".join(f"{lang} ({len(texts)} texts)" for lang, texts in compiled["languages"].items())
+        if options["check"]:
+            self.stdout.write(f"Content OK (version {compiled['version']}): {languages}")
+            return
+        write_catalog(options["output"], compiled)
+        self.stdout.write(f"Wrote content version {compiled['version']} to {options['output']}: {languages}")
@@ -0,0 +1,36 @@
+# chatbot/management/commands/crawl_chembadc.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot import ai_utils
+from chatbot.crawler import CRAWL_MAX_PAGES, CRAWL_WORKERS, crawl, load_snapshot, snapshot_text, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Crawl chembadc.go.tz (concurrently, with conditional requests) and write the text snapshot "
+        "that answer_from_web_search reads. Schedule it, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default=ai_utils.CHEMBADC_URL)
+        parser.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES)
+        parser.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+        parser.add_argument("--output", default=str(ai_utils.CHEMBADC_SNAPSHOT_PATH))
+        parser.add_argument("--full", action="store_true", help="Ignore the previous snapshot (no conditional requests).")
+
+    def handle(self, *args, **options):
+        previous = None if options["full"] else load_snapshot(options["output"])
+        if previous and previous.get("url") != options["url"]:
+            previous = None
+        start = time.perf_counter()
+        snapshot, stats = crawl(options["url"], previous, max_pages=options["max_pages"], workers=options["workers"])
+        elapsed = time.perf_counter() - start
+        if not snapshot_text(snapshot):
+            raise CommandError(f"No text extracted from {options['url']}; keeping the previous snapshot.")
+        write_snapshot(options["output"], snapshot)
+        self.stdout.write(
+            f"Crawled {len(snapshot['order'])} page(s) in {elapsed:.1f}s: {stats['fetched']} fetched, "
+            f"{stats['not_modified']} not modified, {stats['failed']} failed -> {options['output']}"
+        )
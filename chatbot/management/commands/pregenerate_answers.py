@@ -0,0 +1,46 @@
+# chatbot/management/commands/pregenerate_answers.py
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot import ai_utils
+from chatbot.flow import AI_INFO_BLOCKS, LANGUAGES, info_block, split_info_block
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the AI-rewritten answer of every static content block (flow.AI_INFO_BLOCKS, from the content catalog) "
+        "in every language and write them to the pre-generated answer store."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reuse",
+            action="store_true",
+            help="Keep answers already present in a store of the current version instead of regenerating them.",
+        )
+
+    def handle(self, *args, **options):
+        if not ai_utils.OPENAI_API_KEY:
+            raise CommandError("OPENAI_API_KEY is not set.")
+        store = ai_utils.pregenerated_answers
+        version = ai_utils.answer_store_version()
+        answers = {}
+        failed = []
+        for block_key in AI_INFO_BLOCKS:
+            header, body = split_info_block(info_block(block_key))
+            for lang in LANGUAGES:
+                cache_key = ai_utils.rewrite_cache_key(header, body, lang)
+                text = store.get(cache_key, version) if options["reuse"] else None
+                if not text:
+                    text = ai_utils.generate_rewrite(header, body, lang)
+                if text:
+                    answers[cache_key] = text
+                    self.stdout.write(f"  ok   {block_key} [{lang}] ({len(text)} chars)")
+                else:
+                    failed.append(f"{block_key} [{lang}]")
+                    self.stdout.write(f"  FAIL {block_key} [{lang}]")
+        store.write(version, answers)
+        self.stdout.write(f"Wrote {len(answers)} answer(s) to {store.path} (version {version}).")
+        if failed:
+            raise CommandError(
+                "Generation failed for: " + ", ".join(failed) + ". These fall back to live OpenAI calls."
+            )
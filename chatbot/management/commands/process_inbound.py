@@ -0,0 +1,68 @@
+# chatbot/management/commands/process_inbound.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from chatbot.inbound import QueueDispatcher, drain_queue, requeue_stale
+from chatbot.lanes import LanePool
+from chatbot.models import InboundEvent
+from chatbot.sessions import session_store
+
+
+class Command(BaseCommand):
+    help = "Drain the inbound webhook queue (WEBHOOK_MODE=queue) and run the conversation flow."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=20, help="Events claimed per poll (with lanes: events in flight)."
+        )
+        parser.add_argument("--sleep", type=float, default=0.5, help="Seconds to wait when the queue is empty.")
+        parser.add_argument(
+            "--lanes",
+            type=int,
+            default=getattr(settings, "INBOUND_LANES", 4),
+            help="Parallel lanes; messages from one phone run one at a time, in order (0 = process inline).",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain what is queued now, then exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        sleep = options["sleep"]
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale event(s).")
+        failed = InboundEvent.objects.filter(status=InboundEvent.STATUS_FAILED).count()
+        if failed:
+            self.stderr.write(
+                f"{failed} inbound event(s) failed permanently; see Inbound events (status failed) in the admin, "
+                "where \"Retry selected events now\" queues them again."
+            )
+        pool = LanePool(options["lanes"], name="inbound") if options["lanes"] > 0 else None
+        dispatcher = QueueDispatcher(pool, max_in_flight=batch_size) if pool else None
+        self.stdout.write(
+            f"Processing inbound queue with {pool.size if pool else 0} lane(s)... (Ctrl+C to stop)"
+        )
+        try:
+            while True:
+                close_old_connections()
+                handled = dispatcher.poll() if dispatcher else drain_queue(batch_size)
+                if handled:
+                    continue
+                if dispatcher and dispatcher.in_flight:
+                    # Wake up as soon as a message finishes (or after `sleep` to look for new events)
+                    dispatcher.wait(sleep)
+                    continue
+                if options["once"]:
+                    break
+                requeue_stale()
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool:
+                pool.shutdown()
+                dispatcher.finish_completed()
+            session_store.flush()
+        self.stdout.write("Inbound worker stopped.")
@@ -0,0 +1,36 @@
+# chatbot/management/commands/send_outbox.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from chatbot.outbox import RateLimiter, requeue_stale, send_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued WhatsApp messages (WHATSAPP_OUTBOX=True) with rate limiting and retries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Messages attempted per pass.")
+        parser.add_argument("--sleep", type=float, default=0.2, help="Seconds to wait when nothing was sent.")
+        parser.add_argument("--once", action="store_true", help="Send what is due now, then exit.")
+
+    def handle(self, *args, **options):
+        limiter = RateLimiter()
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale message(s).")
+        self.stdout.write("Sending outbox... (Ctrl+C to stop)")
+        try:
+            while True:
+                close_old_connections()
+                attempted = send_batch(limiter, options["batch_size"])
+                if attempted:
+                    continue
+                if options["once"]:
+                    break
+                requeue_stale()
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("Outbox sender stopped.")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:44
+
+from django.db import migrations, models
+
+
+def drop_duplicate_sessions(apps, schema_editor):
+    """Keep only the most recently updated session per phone number, so it can become unique."""
+    ChatSession = apps.get_model("chatbot", "ChatSession")
+    duplicated = (
+        ChatSession.objects.values("phone_number")
+        .annotate(n=models.Count("id"))
+        .filter(n__gt=1)
+        .values_list("phone_number", flat=True)
+    )
+    for phone in list(duplicated):
+        rows = ChatSession.objects.filter(phone_number=phone).order_by("-updated_at", "-id")
+        keep = rows.values_list("id", flat=True).first()
+        rows.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0007_outbound_message'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_sessions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='chatsession',
+            name='phone_number',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0008_chat_session_unique_phone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:47
+
+from django.db import migrations, models
+
+
+def rename_duplicate_ticket_ids(apps, schema_editor):
+    """Random ids collided in the past: keep the oldest ticket's id, suffix the others -2, -3, ..."""
+    Ticket = apps.get_model("chatbot", "Ticket")
+    duplicated = (
+        Ticket.objects.values("ticket_id")
+        .annotate(n=models.Count("id"))
+        .filter(n__gt=1)
+        .values_list("ticket_id", flat=True)
+    )
+    taken = set(Ticket.objects.values_list("ticket_id", flat=True))
+    for ticket_id in list(duplicated):
+        for ticket in Ticket.objects.filter(ticket_id=ticket_id).order_by("id")[1:]:
+            n = 2
+            while f"{ticket_id}-{n}" in taken:
+                n += 1
+            ticket.ticket_id = f"{ticket_id}-{n}"
+            taken.add(ticket.ticket_id)
+            ticket.save(update_fields=["ticket_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0009_chat_session_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=32, unique=True)),
+                ('last', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(rename_duplicate_ticket_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ticket',
+            name='ticket_id',
+            field=models.CharField(max_length=32, unique=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0010_ticket_id_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='phone_number',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['phone_number', 'ticket_type', '-created_at'], name='ticket_phone_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['ticket_type', '-created_at'], name='ticket_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-created_at'], name='ticket_created_idx'),
+        ),
+    ]
@@ -1,12 +1,15 @@
 from django.db import models
+from django.utils import timezone
 
 
 class ChatSession(models.Model):
     """Single table: stores session state only (no applications, no complaints DB)."""
-    phone_number = models.CharField(max_length=20, db_index=True)
+    phone_number = models.CharField(max_length=20, unique=True)  # one session per citizen (upsert target)
     state = models.CharField(max_length=64, default="welcome")
     language = models.CharField(max_length=10, default="sw")  # sw = Kiswahili (default), en = English
     context = models.JSONField(default=dict, blank=True)  # selected_dept, ticket_id, last_message, etc.
+    # Bumped by every save; saves are UPDATE ... WHERE version = <version read> (see sessions.py)
+    version = models.PositiveIntegerField(default=1)
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -17,6 +20,23 @@ class ChatSession(models.Model):
         return f"{self.phone_number} ({self.state})"
 
 
+class TicketQuerySet(models.QuerySet):
+    """The hot Ticket queries, each served by an index in Ticket.Meta.indexes (see TicketQueryPlanTests)."""
+
+    def track_list(self, phone_number, ticket_type, limit=20):
+        """A citizen's latest tickets of one type (WhatsApp "Fuatilia")."""
+        return self.filter(phone_number=phone_number, ticket_type=ticket_type).order_by("-created_at")[:limit]
+
+    def dashboard_tab(self, ticket_type=None):
+        """Dashboard list, newest first; all types or one."""
+        qs = self.order_by("-created_at")
+        return qs.filter(ticket_type=ticket_type) if ticket_type else qs
+
+    def lookup(self, ticket_id, ticket_type):
+        """API lookup of a ticket by its id (unique) and type."""
+        return self.filter(ticket_id=ticket_id, ticket_type=ticket_type)
+
+
 class Ticket(models.Model):
     """Complaints (malalamiko) and questions (maswali) for tracking and listing."""
     TYPE_COMPLAINT = "complaint"
@@ -32,9 +52,9 @@ class Ticket(models.Model):
         (STATUS_ANSWERED, "Imegibiwa"),
     ]
 
-    phone_number = models.CharField(max_length=20, db_index=True)
+    phone_number = models.CharField(max_length=20)  # indexed with ticket_type (Meta.indexes)
     ticket_type = models.CharField(max_length=16, choices=TYPE_CHOICES)
-    ticket_id = models.CharField(max_length=32, db_index=True)  # e.g. DCT-12345
+    ticket_id = models.CharField(max_length=32, unique=True)  # e.g. DCT-260112-0042 (see tickets.py)
     message = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RECEIVED)
     department = models.CharField(max_length=32, blank=True)  # for complaints only
@@ -42,8 +62,96 @@ class Ticket(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TicketQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # track_list: equality on both columns, rows already newest first
+            models.Index(fields=["phone_number", "ticket_type", "-created_at"], name="ticket_phone_type_created_idx"),
+            # dashboard_tab for one type
+            models.Index(fields=["ticket_type", "-created_at"], name="ticket_type_created_idx"),
+            # dashboard_tab for all types (and the default ordering)
+            models.Index(fields=["-created_at"], name="ticket_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.ticket_id} ({self.ticket_type})"
+
+
+class TicketSequence(models.Model):
+    """Last ticket number handed out per id prefix; one row per day, e.g. "DCT-260112" (see tickets.py)."""
+    prefix = models.CharField(max_length=32, unique=True)
+    last = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.prefix} ({self.last})"
+
+
+class InboundEvent(models.Model):
+    """Raw webhook payloads queued by the webhook (WEBHOOK_MODE="queue"), drained by `manage.py process_inbound`."""
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # pushed back after a failed attempt
+    error = models.TextField(blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)  # set when a worker claims the row
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"InboundEvent {self.pk} ({self.status})"
+
+
+class ProcessedMessage(models.Model):
+    """WhatsApp message ids (wamid) already handled; drops Meta's webhook redeliveries."""
+    wamid = models.CharField(max_length=128, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.wamid
+
+
+class OutboundMessage(models.Model):
+    """WhatsApp messages waiting to be sent by `manage.py send_outbox` (WHATSAPP_OUTBOX=True)."""
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    to = models.CharField(max_length=20, db_index=True)
+    payload = models.JSONField()  # full Graph API /messages body
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    wamid = models.CharField(max_length=128, blank=True)  # id returned by the Graph API
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"OutboundMessage {self.pk} to {self.to} ({self.status})"
@@ -0,0 +1,197 @@
+# chatbot/outbox.py – sender for the outbound message outbox (WHATSAPP_OUTBOX=True)
+import random
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from .caching import LRUCache
+from .models import OutboundMessage
+from .utils import PHONE_ID, _graph_post, _messages_url, is_media_id_error, media_source, replacement_media_id
+
+MAX_ATTEMPTS = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8)
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 600.0
+STALE_LOCK_SECONDS = 300
+
+# Graph API error codes worth retrying (rate limits, temporary outages)
+TRANSIENT_ERROR_CODES = {1, 2, 4, 80007, 130429, 131000, 131016, 131056}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        with self._lock:
+            self._refill()
+            return self.tokens >= 1
+
+    def take(self):
+        """Take one token if available. Returns True on success."""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RateLimiter:
+    """Token buckets per sending phone number id (WHATSAPP_PHONE_ID) and per recipient."""
+
+    def __init__(self):
+        self.phone_rate = getattr(settings, "OUTBOX_RATE_PER_SECOND", 20)
+        self.phone_burst = getattr(settings, "OUTBOX_BURST", 40)
+        self.recipient_rate = getattr(settings, "OUTBOX_RECIPIENT_RATE_PER_SECOND", 1)
+        self.recipient_burst = getattr(settings, "OUTBOX_RECIPIENT_BURST", 5)
+        self._phone_buckets = {}
+        self._recipient_buckets = LRUCache(maxsize=10000)
+
+    def _phone_bucket(self, phone_id):
+        bucket = self._phone_buckets.get(phone_id)
+        if bucket is None:
+            bucket = self._phone_buckets[phone_id] = TokenBucket(self.phone_rate, self.phone_burst)
+        return bucket
+
+    def _recipient_bucket(self, to):
+        bucket = self._recipient_buckets.get(to)
+        if bucket is None:
+            bucket = TokenBucket(self.recipient_rate, self.recipient_burst)
+            self._recipient_buckets.set(to, bucket)
+        return bucket
+
+    def phone_available(self, phone_id=PHONE_ID):
+        return self._phone_bucket(phone_id).available()
+
+    def allow(self, to, phone_id=PHONE_ID):
+        """Take a token from both buckets, or from neither if either is empty."""
+        phone_bucket = self._phone_bucket(phone_id)
+        recipient_bucket = self._recipient_bucket(to)
+        if not (phone_bucket.available() and recipient_bucket.available()):
+            return False
+        return phone_bucket.take() and recipient_bucket.take()
+
+
+def backoff_seconds(attempts):
+    """Exponential backoff with jitter: ~2s, 4s, 8s ... capped at 10 minutes."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def requeue_stale(max_age_seconds=STALE_LOCK_SECONDS):
+    """Put messages left in 'sending' by a crashed sender back to 'pending'. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+    return OutboundMessage.objects.filter(
+        status=OutboundMessage.STATUS_SENDING, locked_at__lt=cutoff
+    ).update(status=OutboundMessage.STATUS_PENDING, locked_at=None)
+
+
+def _replace_media_id(msg):
+    """
+    Point an image message whose media id Meta rejected (expired after 30 days, ...) at a
+    re-uploaded copy of the same image. Returns True if the payload was changed.
+    """
+    image = msg.payload.get("image") or {}
+    source = media_source(image.get("id"))
+    media_id = replacement_media_id(source, image["id"]) if source else None
+    if not media_id:
+        return False
+    msg.payload = {**msg.payload, "image": {**image, "id": media_id}}
+    print("🔁 Outbox", msg.pk, "media id rejected; retrying with re-uploaded media", media_id)
+    return True
+
+
+def deliver(msg):
+    """Send one claimed outbox row and record the outcome (sent / retry later / failed)."""
+    msg.attempts += 1
+    transient = False
+    retry_now = False
+    error = ""
+    try:
+        r = _graph_post(_messages_url(), msg.payload)
+        data = r.json() if r.text else {}
+    except (requests.RequestException, ValueError) as e:
+        transient, error, r, data = True, str(e), None, {}
+    if r is not None:
+        if r.status_code == 200 and data.get("messages"):
+            msg.status = OutboundMessage.STATUS_SENT
+            msg.wamid = (data["messages"][0] or {}).get("id", "")
+            msg.sent_at = timezone.now()
+            msg.last_error = ""
+            msg.save(update_fields=["status", "wamid", "sent_at", "last_error", "attempts"])
+            print("📤 Outbox sent", msg.pk, "to=" + msg.to, "| message_id:", msg.wamid)
+            return True
+        err = data.get("error") or {}
+        error = f"{r.status_code} {err.get('code', '')} {err.get('message', '') or r.text[:200]}".strip()
+        transient = r.status_code == 429 or r.status_code >= 500 or err.get("code") in TRANSIENT_ERROR_CODES
+        if is_media_id_error(data) and _replace_media_id(msg):
+            transient = retry_now = True
+
+    msg.last_error = error[:2000]
+    if transient and msg.attempts < MAX_ATTEMPTS:
+        delay = 0.0 if retry_now else backoff_seconds(msg.attempts)
+        msg.status = OutboundMessage.STATUS_PENDING
+        msg.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        print("⏳ Outbox retry", msg.pk, "to=" + msg.to, f"in {delay:.0f}s |", error)
+    else:
+        msg.status = OutboundMessage.STATUS_FAILED
+        print("❌ Outbox failed", msg.pk, "to=" + msg.to, "|", error)
+    msg.save(update_fields=["status", "next_attempt_at", "last_error", "attempts", "payload"])
+    return False
+
+
+def send_batch(limiter, batch_size=50):
+    """
+    Send up to batch_size due messages, oldest first. Returns the number attempted.
+
+    Messages to one recipient keep their order: once a recipient's message is waiting
+    (backoff or rate limit), their later messages wait too. Waiting recipients are left out
+    in the query itself, so any number of them never hides sendable messages behind them.
+    """
+    now = timezone.now()
+    pending = OutboundMessage.objects.filter(status=OutboundMessage.STATUS_PENDING)
+    backing_off = pending.filter(next_attempt_at__gt=now).values("to")
+    blocked = set()  # recipients out of tokens, or whose message just failed, in this pass
+    attempted = 0
+    while attempted < batch_size and limiter.phone_available():
+        rows = list(
+            pending.filter(next_attempt_at__lte=now)
+            .exclude(to__in=backing_off)
+            .exclude(to__in=blocked)
+            .order_by("id")[: batch_size - attempted]
+        )
+        if not rows:
+            break
+        for msg in rows:
+            if attempted >= batch_size or not limiter.phone_available():
+                break
+            if msg.to in blocked:
+                continue
+            if not limiter.allow(msg.to):
+                blocked.add(msg.to)
+                continue
+            claimed = OutboundMessage.objects.filter(pk=msg.pk, status=OutboundMessage.STATUS_PENDING).update(
+                status=OutboundMessage.STATUS_SENDING, locked_at=timezone.now()
+            )
+            if not claimed:
+                blocked.add(msg.to)
+                continue
+            attempted += 1
+            if not deliver(msg):
+                blocked.add(msg.to)
+    return attempted
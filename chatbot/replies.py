@@ -0,0 +1,62 @@
+# chatbot/replies.py – structured replies returned by flow.process_message
+from dataclasses import dataclass, replace
+
+# Reply kinds: how the sender should deliver the reply
+TEXT = "text"  # plain text message
+MENU = "menu"  # welcome / main menu: logo with the text as caption when LOGO_URL is set
+BUTTONS = "buttons"  # text followed by reply buttons (one interactive message when it fits)
+CHOICE = "choice"  # only an interactive prompt with buttons, no separate text
+
+LOGO = "logo"
+
+# Stands in the reply text for the id a CreateTicket gets when the sender stores it
+TICKET_ID = "{ticket_id}"
+
+
+@dataclass(frozen=True, slots=True)
+class Button:
+    id: str
+    title: str
+
+
+@dataclass(frozen=True, slots=True)
+class CreateTicket:
+    """
+    Persist a complaint or question submitted in this turn. Its id is assigned in the
+    transaction that commits the turn, then fills TICKET_ID in the reply text.
+    """
+
+    ticket_type: str  # Ticket.TYPE_COMPLAINT / Ticket.TYPE_QUESTION
+    message: str
+    department: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class ListTickets:
+    """Replace the reply text with the sender's tickets of this type (built from the DB)."""
+
+    ticket_type: str
+
+
+@dataclass(frozen=True, slots=True)
+class Reply:
+    """
+    One reply of the bot. `prompt` heads the buttons (merged into the text body when
+    merge_prompt is True and it fits); `actions` are DB side effects to run before sending.
+    Replies are immutable, so static ones are built once per language and shared.
+    """
+
+    text: str = ""
+    kind: str = TEXT
+    buttons: tuple = ()
+    prompt: str = ""
+    merge_prompt: bool = True
+    media: str | None = None
+    actions: tuple = ()
+
+    def with_text(self, text):
+        return replace(self, text=text)
+
+    def with_ticket_id(self, ticket_id):
+        # First occurrence only: the citizen's message quoted after it may contain the placeholder
+        return replace(self, text=self.text.replace(TICKET_ID, ticket_id, 1))
@@ -0,0 +1,197 @@
+# chatbot/retrieval.py – lexical (BM25) retrieval over the embedded taarifa knowledge text
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+# Function words of both languages that carry no retrieval signal
+STOPWORDS = frozenset(
+    """
+    je ni ya wa la za cha vya kwa na katika kwenye hii huu hiyo hizi hilo hayo ili au pia kama lakini
+    tafadhali naomba nataka kujua nini gani vipi ngapi wapi lini nani kuna
+    the a an is are was were be of in on at for to and or by with from as that this these those it its
+    please tell me about what which how many much where when who do does can you i want know
+    """.split()
+)
+
+# Query words mapped to their counterparts in the other language (the knowledge text mixes both)
+QUERY_SYNONYMS = {
+    "population": "idadi watu wakazi",
+    "people": "watu wakazi",
+    "wards": "kata",
+    "ward": "kata",
+    "villages": "vijiji",
+    "village": "vijiji",
+    "divisions": "tarafa",
+    "division": "tarafa",
+    "constituency": "jimbo",
+    "council": "halmashauri",
+    "vision": "dira",
+    "mission": "dhima",
+    "boundaries": "mipaka imepakana",
+    "border": "mipaka imepakana",
+    "electricity": "umeme energy power grid",
+    "health": "afya hospitali zahanati",
+    "hospital": "hospitali",
+    "schools": "shule",
+    "school": "shule",
+    "education": "elimu shule",
+    "water": "maji",
+    "roads": "barabara",
+    "agriculture": "kilimo mazao",
+    "livestock": "mifugo",
+    "opportunities": "fursa uwekezaji",
+    "investment": "uwekezaji fursa",
+    "leaders": "viongozi",
+    "departments": "idara",
+    "bank": "benki",
+    "banks": "benki",
+    "benki": "bank banking",
+    "afya": "health",
+    "elimu": "education",
+    "maji": "water",
+    "umeme": "energy power electricity",
+    "nishati": "energy",
+    "kilimo": "agriculture",
+    "mifugo": "livestock",
+    "barabara": "roads",
+}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_HEADING_RE = re.compile(r"^\s*(?:#+\s|\d+(?:\.\d+)*\.?\s+[A-Z]|[A-Z][A-Z &/–-]{3,}$)")
+
+# Rough chars-per-token ratio for budget checks (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def tokenize(text):
+    """Lower-case, accent-free word tokens without stopwords; works for Swahili and English."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return [w for w in _WORD_RE.findall(text.replace("_", " ")) if w not in STOPWORDS and (len(w) > 1 or w.isdigit())]
+
+
+def expand_query(text):
+    tokens = tokenize(text)
+    extra = []
+    for token in tokens:
+        extra.extend(tokenize(QUERY_SYNONYMS.get(token, "")))
+    return tokens + extra
+
+
+def chunk_text(text, max_chars=900):
+    """
+    Split the knowledge text into chunks of at most ~max_chars, breaking at blank lines
+    and headings first and at line ends for long paragraphs.
+    """
+    paragraphs = []
+    current = []
+    for line in (text or "").splitlines():
+        if not line.strip() or (_HEADING_RE.match(line) and current):
+            if current:
+                paragraphs.append("\n".join(current))
+            current = [line] if line.strip() else []
+            continue
+        current.append(line)
+    if current:
+        paragraphs.append("\n".join(current))
+
+    chunks = []
+    buf = ""
+    for para in paragraphs:
+        pieces = [para] if len(para) <= max_chars else para.splitlines()
+        for piece in pieces:
+            piece = piece.strip()
+            if not piece:
+                continue
+            while len(piece) > max_chars:
+                cut = piece.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if buf:
+                    chunks.append(buf)
+                    buf = ""
+                chunks.append(piece[:cut].strip())
+                piece = piece[cut:].strip()
+            if buf and len(buf) + len(piece) + 1 > max_chars:
+                chunks.append(buf)
+                buf = ""
+            buf = f"{buf}\n{piece}" if buf else piece
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+@dataclass(frozen=True)
+class Chunk:
+    position: int
+    text: str
+    tokens: int
+
+
+class KnowledgeIndex:
+    """
+    Okapi BM25 index over chunks of the knowledge text. Built once (import time);
+    search() returns the best chunks and select() packs them into a token budget.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks = [Chunk(i, text, estimate_tokens(text)) for i, text in enumerate(chunks)]
+        self._term_freqs = [Counter(tokenize(c.text)) for c in self.chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        doc_freq = Counter()
+        for tf in self._term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(self.chunks)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+        self.total_tokens = sum(c.tokens for c in self.chunks)
+
+    @classmethod
+    def from_text(cls, text, max_chars=900):
+        return cls(chunk_text(text, max_chars=max_chars))
+
+    def _known_form(self, term):
+        """Fall back to the singular of an English plural the index does not contain ("borders" -> "border")."""
+        if term not in self._idf and term.endswith("s") and term[:-1] in self._idf:
+            return term[:-1]
+        return term
+
+    def search(self, query, k=6):
+        """Top-k (score, Chunk) pairs for the query, best first; chunks scoring 0 are left out."""
+        terms = Counter(self._known_form(t) for t in expand_query(query))
+        if not terms or not self.chunks:
+            return []
+        scores = []
+        for i, tf in enumerate(self._term_freqs):
+            length_norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / (self._avg_length or 1))
+            score = 0.0
+            for term, qf in terms.items():
+                f = tf.get(term)
+                if f:
+                    score += qf * self._idf[term] * f * (self.k1 + 1) / (f + length_norm)
+            if score > 0:
+                scores.append((score, self.chunks[i]))
+        scores.sort(key=lambda item: (-item[0], item[1].position))
+        return scores[:k]
+
+    def select(self, query, token_budget=1500, k=6):
+        """
+        Text of the best chunks that fit in token_budget, in document order (so lists and
+        tables read naturally). Returns "" when nothing in the index matches the query.
+        """
+        picked = []
+        used = 0
+        for _score, chunk in self.search(query, k=k):
+            if used + chunk.tokens > token_budget:
+                continue
+            picked.append(chunk)
+            used += chunk.tokens
+        picked.sort(key=lambda c: c.position)
+        return "\n\n---\n\n".join(c.text for c in picked)
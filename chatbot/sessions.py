@@ -0,0 +1,281 @@
+# chatbot/sessions.py – chat session repository: lookup with idle reset, compare-and-swap saves, write-behind
+import atexit
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .caching import LRUCache
+from .flow import WELCOME
+from .models import ChatSession
+
+# "db": every lookup/save hits ChatSession (any number of workers and hosts).
+# "cache": lookups served from the shared Django cache; saves are compare-and-swaps on ChatSession.
+# "lru": sessions live in this process only – use it when one process handles all messages
+# (e.g. WEBHOOK_MODE=queue with a single process_inbound), never with several web workers.
+CHAT_SESSION_BACKEND = getattr(settings, "CHAT_SESSION_BACKEND", "db")
+CHAT_SESSION_IDLE_SECONDS = getattr(settings, "CHAT_SESSION_IDLE_SECONDS", 600)
+CHAT_SESSION_LRU_SIZE = getattr(settings, "CHAT_SESSION_LRU_SIZE", 10000)
+CHAT_SESSION_CACHE_ALIAS = getattr(settings, "CHAT_SESSION_CACHE_ALIAS", "default")
+CHAT_SESSION_CACHE_TTL_SECONDS = getattr(settings, "CHAT_SESSION_CACHE_TTL_SECONDS", 24 * 3600)
+# Saves of the "lru" backend are written to the DB at most this often (latest state per phone)
+CHAT_SESSION_WRITE_BEHIND_SECONDS = getattr(settings, "CHAT_SESSION_WRITE_BEHIND_SECONDS", 1.0)
+
+
+@dataclass(slots=True)
+class Session:
+    """A citizen's place in the conversation; a new number starts at WELCOME."""
+
+    phone_number: str
+    state: str = WELCOME
+    context: dict = field(default_factory=dict)
+    language: str = "sw"
+    updated_at: object = None  # aware datetime of the last save, None if never saved
+    version: int = 0  # ChatSession.version this was read at; 0 = not stored yet
+
+    def copy(self):
+        return replace(self, context=dict(self.context))
+
+
+class SessionConflict(Exception):
+    """The session kept changing under us (another worker saved it) on every attempt."""
+
+
+class DatabaseBackend:
+    """
+    ChatSession rows: one SELECT per lookup; a save is one conditional
+    UPDATE ... WHERE version = n (or an INSERT for a new number) that fails if
+    another worker saved the session since it was read.
+    """
+
+    def load(self, phone, fresh=False):
+        row = (
+            ChatSession.objects.filter(phone_number=phone)
+            .values_list("state", "context", "language", "updated_at", "version")
+            .first()
+        )
+        if row is None:
+            return None
+        state, context, language, updated_at, version = row
+        return Session(phone, state, context or {}, language or "sw", updated_at, version)
+
+    def save(self, session):
+        """Compare-and-swap; on success bumps session.version and returns True, on conflict returns False."""
+        if session.version == 0:
+            try:
+                with transaction.atomic():
+                    ChatSession.objects.create(
+                        phone_number=session.phone_number,
+                        state=session.state,
+                        context=session.context,
+                        language=session.language,
+                        version=1,
+                    )
+            except IntegrityError:
+                return False
+        else:
+            updated = ChatSession.objects.filter(phone_number=session.phone_number, version=session.version).update(
+                state=session.state,
+                context=session.context,
+                language=session.language,
+                updated_at=session.updated_at,
+                version=session.version + 1,
+            )
+            if not updated:
+                return False
+        session.version += 1
+        return True
+
+    def save_many(self, sessions):
+        """Unconditional upsert (INSERT ... ON CONFLICT) of sessions already versioned by their owner."""
+        ChatSession.objects.bulk_create(
+            [
+                ChatSession(
+                    phone_number=s.phone_number, state=s.state, context=s.context, language=s.language,
+                    version=s.version,
+                )
+                for s in sessions
+            ],
+            update_conflicts=True,
+            unique_fields=["phone_number"],
+            update_fields=["state", "context", "language", "updated_at", "version"],
+        )
+
+
+class WriteBehind:
+    """
+    Pending saves, one per phone (a burst of messages becomes one write of the latest state),
+    flushed to `backend.save_many` by a background thread every `interval` seconds and at exit.
+    The thread starts on the first save, so it runs in the worker, not in a preloading master.
+    """
+
+    def __init__(self, backend, interval):
+        self.backend = backend
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self, phone):
+        with self._lock:
+            session = self._pending.get(phone)
+        return session.copy() if session is not None else None
+
+    def put(self, session):
+        with self._lock:
+            self._pending[session.phone_number] = session.copy()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Write all pending sessions in one upsert. Returns the number written."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            self.backend.save_many(list(batch.values()))
+        except Exception as e:
+            print("⚠️ Failed to persist", len(batch), "chat session(s); retrying |", e)
+            with self._lock:
+                # Keep newer saves that arrived meanwhile
+                self._pending = {**batch, **self._pending}
+            return 0
+        return len(batch)
+
+
+class LocalBackend:
+    """
+    Sessions in an in-process LRU; misses read the DB, saves reach it through the write-behind.
+    This process owns the sessions, so the version check happens here, under a lock.
+    """
+
+    def __init__(self, persistent, maxsize=CHAT_SESSION_LRU_SIZE, write_behind_seconds=CHAT_SESSION_WRITE_BEHIND_SECONDS):
+        self.persistent = persistent
+        self.write_behind = WriteBehind(persistent, write_behind_seconds)
+        self._sessions = LRUCache(maxsize=maxsize)
+        self._save_lock = threading.Lock()
+
+    def _current(self, phone):
+        session = self._sessions.get(phone)
+        if session is None:
+            # Evicted before it was flushed, or not seen by this process yet
+            session = self.write_behind.get(phone) or self.persistent.load(phone)
+            if session is not None:
+                self._sessions.set(phone, session)
+        return session
+
+    def load(self, phone, fresh=False):
+        session = self._current(phone)
+        return session.copy() if session is not None else None
+
+    def save(self, session):
+        with self._save_lock:
+            current = self._current(session.phone_number)
+            if (current.version if current is not None else 0) != session.version:
+                return False
+            session.version += 1
+        # Published when the caller's transaction commits: a turn that rolls back (e.g. its
+        # ticket could not be stored) leaves the session as it was for the redelivery.
+        # A citizen's messages run one at a time (lanes), so no save is checked in between.
+        saved = session.copy()
+        transaction.on_commit(lambda: self._publish(saved))
+        return True
+
+    def _publish(self, session):
+        with self._save_lock:
+            self._sessions.set(session.phone_number, session)
+        self.write_behind.put(session)
+
+    def flush(self):
+        return self.write_behind.flush()
+
+
+class CacheBackend:
+    """
+    Sessions read from the shared Django cache, DB on a miss. Saves are the DB compare-and-swap
+    (the cache has no CAS), so a stale cached copy can only cause a conflict, never a lost update.
+    """
+
+    def __init__(self, persistent, alias=CHAT_SESSION_CACHE_ALIAS, ttl=CHAT_SESSION_CACHE_TTL_SECONDS):
+        self.persistent = persistent
+        self.alias = alias
+        self.ttl = ttl
+
+    def _key(self, phone):
+        return f"chatbot:session:{phone}"
+
+    def load(self, phone, fresh=False):
+        """fresh=True skips the cache (used after a conflict)."""
+        session = None if fresh else caches[self.alias].get(self._key(phone))
+        if session is None:
+            session = self.persistent.load(phone)
+            if session is not None:
+                caches[self.alias].set(self._key(phone), session, self.ttl)
+        return session
+
+    def save(self, session):
+        if not self.persistent.save(session):
+            caches[self.alias].delete(self._key(session.phone_number))
+            return False
+        caches[self.alias].set(self._key(session.phone_number), session, self.ttl)
+        return True
+
+
+class SessionStore:
+    """Repository the webhook uses: get() applies the idle reset, save() stamps and persists."""
+
+    def __init__(self, backend, idle_seconds=CHAT_SESSION_IDLE_SECONDS):
+        self.backend = backend
+        self.idle_seconds = idle_seconds
+
+    def get(self, phone, fresh=False):
+        """
+        The phone's session; a new one at WELCOME, or reset to WELCOME (language kept) after idling.
+        fresh=True bypasses shared-cache copies, to re-read after a conflicting save.
+        """
+        session = self.backend.load(phone, fresh=fresh)
+        if session is None:
+            return Session(phone)
+        if session.updated_at and (timezone.now() - session.updated_at).total_seconds() > self.idle_seconds:
+            print("⌛ Session idle >", self.idle_seconds, "s for", phone, "- resetting to welcome.")
+            session.state = WELCOME
+            session.context = {}
+        return session
+
+    def save(self, session):
+        """
+        Store the session if nobody else saved it since it was read (its version still matches).
+        Returns False on a conflict; the caller re-reads with get(fresh=True) and redoes the turn.
+        """
+        session.updated_at = timezone.now()
+        return self.backend.save(session)
+
+    def flush(self):
+        """Persist pending write-behind saves now (no-op except for the "lru" backend)."""
+        flush = getattr(self.backend, "flush", None)
+        return flush() if flush else 0
+
+
+def make_backend(name):
+    if name == "db":
+        return DatabaseBackend()
+    if name == "lru":
+        return LocalBackend(DatabaseBackend())
+    if name == "cache":
+        return CacheBackend(DatabaseBackend())
+    raise ValueError(f"unknown CHAT_SESSION_BACKEND {name!r} (expected db, cache or lru)")
+
+
+session_store = SessionStore(make_backend(CHAT_SESSION_BACKEND))
@@ -1,3 +1,1485 @@
-from django.test import TestCase
+import dataclasses
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from chatbot import (
+    ai_utils, caching, content, crawler, flow, http_client, inbound, intents, jsonfile, llm, outbox, replies, retrieval,
+    sessions, tickets, utils,
+)
+from chatbot.answer_store import AnswerStore
+from chatbot.deadline import Deadline
+from chatbot.lanes import LanePool
+from chatbot.models import InboundEvent, OutboundMessage, ProcessedMessage, Ticket
+
+GOLDEN_PATH = Path(__file__).parent / "testdata" / "golden_conversations.json"
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Local stand-in for chembadc.go.tz: fixed pages with ETags, answering 304 when unchanged."""
+
+    protocol_version = "HTTP/1.1"
+    pages = {}
+    requests_seen = []
+
+    def do_GET(self):
+        page = self.pages.get(self.path)
+        if page is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{hash(page) & 0xffffffff:x}"'
+        self.requests_seen.append((self.path, bool(self.headers.get("If-None-Match"))))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CrawlerTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _SiteHandler.pages = {
+            "/": '<html><body><h1>Karibu Chemba</h1><a href="/huduma">Huduma</a> <a href="/habari#top">Habari</a>'
+            '<a href="https://example.com/x">nje</a><script>var x = 1;</script></body></html>',
+            "/huduma": "<p>Huduma za afya na elimu</p>",
+            "/habari": "<p>Habari mpya za Halmashauri</p>",
+        }
+        _SiteHandler.requests_seen = []
+        self.start_url = self.base + "/"
+
+    def test_crawl_extracts_same_site_pages(self):
+        snapshot, stats = crawler.crawl(self.start_url, max_pages=8, workers=2)
+        self.assertEqual(stats, {"fetched": 3, "not_modified": 0, "failed": 0})
+        self.assertEqual(snapshot["order"], [self.start_url, self.base + "/huduma", self.base + "/habari"])
+        text = crawler.snapshot_text(snapshot)
+        self.assertIn("Karibu Chemba", text)
+        self.assertIn("Huduma za afya na elimu", text)
+        self.assertNotIn("var x", text)
+
+    def test_recrawl_uses_conditional_requests_and_refetches_changed_pages(self):
+        first, _ = crawler.crawl(self.start_url, max_pages=8, workers=2)
+        _SiteHandler.pages["/habari"] = "<p>Habari zilizobadilika</p>"
+        _SiteHandler.requests_seen = []
+
+        second, stats = crawler.crawl(self.start_url, first, max_pages=8, workers=2)
+
+        self.assertEqual(stats, {"fetched": 1, "not_modified": 2, "failed": 0})
+        self.assertTrue(all(conditional for _path, conditional in _SiteHandler.requests_seen))
+        self.assertEqual(second["pages"][self.base + "/huduma"]["blocks"], ["Huduma za afya na elimu"])
+        self.assertIn("Habari zilizobadilika", crawler.snapshot_text(second))
+
+    def test_failed_page_keeps_previous_text(self):
+        first, _ = crawler.crawl(self.start_url, max_pages=8, workers=2)
+        del _SiteHandler.pages["/huduma"]
+
+        second, stats = crawler.crawl(self.start_url, first, max_pages=8, workers=2)
+
+        self.assertEqual(stats["failed"], 1)
+        self.assertIn("Huduma za afya na elimu", crawler.snapshot_text(second))
+
+    def test_snapshot_round_trip_and_reload(self):
+        snapshot, _ = crawler.crawl(self.start_url, max_pages=1, workers=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "snapshot.json"
+            reader = crawler.SiteSnapshot(path, check_interval=0)
+            self.assertEqual(reader.text(), "")
+            crawler.write_snapshot(path, snapshot)
+            reader.reload()
+            self.assertEqual(reader.text(), "Karibu Chemba\nHuduma Habarinje")
+            self.assertEqual(reader.text(max_chars=6), "Karibu")
+
+
+class JsonFileTests(SimpleTestCase):
+    def test_rewrite_is_seen_even_with_an_unchanged_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            reader = jsonfile.JsonFile(path, check_interval=0)
+            self.assertIsNone(reader.data)  # no file yet
+            jsonfile.write_json(path, {"n": 1})
+            self.assertEqual(reader.data, {"n": 1})
+            stat = path.stat()
+            jsonfile.write_json(path, {"n": 2})  # same size
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # coarse mtime resolution
+            self.assertEqual(reader.data, {"n": 2})
+
+    def test_failed_write_keeps_the_old_file_and_leaves_no_temp_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            jsonfile.write_json(path, {"n": 1})
+            with self.assertRaises(TypeError):
+                jsonfile.write_json(path, {"n": object()})
+            self.assertEqual(jsonfile.read_json(path), {"n": 1})
+            self.assertEqual(os.listdir(tmp), ["data.json"])
+
+    def test_broken_file_gives_empty_or_keeps_the_last_good_data(self):
+        class Sticky(jsonfile.JsonFile):
+            keep_on_error = True
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            jsonfile.write_json(path, {"n": 1})
+            plain, sticky = jsonfile.JsonFile(path, check_interval=0), Sticky(path, check_interval=0)
+            self.assertEqual((plain.data, sticky.data), ({"n": 1}, {"n": 1}))
+            path.write_text("{half a file", encoding="utf-8")
+            self.assertEqual((plain.data, sticky.data), (None, {"n": 1}))
+            path.unlink()
+            self.assertEqual((plain.data, sticky.data), (None, {"n": 1}))
+
+
+class PageExtractionTests(SimpleTestCase):
+    def test_extractor_splits_blocks_and_finds_links_in_one_pass(self):
+        html = (
+            "<html><head><title>Chemba</title><style>p {color: red}</style></head><body>"
+            "<nav><a href='/'>Mwanzo</a> <a href='/huduma?x=1#top'>Huduma</a></nav>"
+            "<h1>Karibu</h1><p>Idadi ya watu &amp; kata<br>26</p>"
+            "<script>var hidden = 1;</script><a href='mailto:info@chembadc.go.tz'>barua</a></body></html>"
+        )
+        extractor = crawler.PageExtractor("https://chembadc.go.tz/index")
+        for i in range(0, len(html), 7):  # fed in small chunks, as when streaming
+            extractor.feed(html[i:i + 7])
+        extractor.close()
+        self.assertEqual(extractor.blocks, ["Mwanzo Huduma", "Karibu", "Idadi ya watu & kata", "26", "barua"])
+        self.assertEqual(extractor.links, ["https://chembadc.go.tz/", "https://chembadc.go.tz/huduma"])
+
+    def test_blocks_repeated_across_pages_are_kept_once(self):
+        nav = "Mwanzo Huduma Habari Mawasiliano"
+        footer = "Haki zote zimehifadhiwa Halmashauri ya Wilaya ya Chemba"
+        snapshot = {
+            "order": ["a", "b", "c"],
+            "pages": {
+                "a": {"url": "a", "blocks": [nav, "Karibu Chemba", footer]},
+                "b": {"url": "b", "blocks": [nav, "Huduma za afya", footer]},
+                "c": {"url": "c", "blocks": [nav.upper(), "Habari mpya", footer]},
+            },
+        }
+        self.assertEqual(
+            crawler.page_texts(snapshot),
+            [("a", f"{nav}\nKaribu Chemba\n{footer}"), ("b", "Huduma za afya"), ("c", "Habari mpya")],
+        )
+
+    def test_budget_is_shared_between_pages(self):
+        snapshot = {
+            "order": ["a", "b", "c"],
+            "pages": {
+                "a": {"url": "a", "blocks": ["x" * 5000]},
+                "b": {"url": "b", "blocks": ["short"]},
+                "c": {"url": "c", "blocks": ["y" * 5000]},
+            },
+        }
+        text = crawler.snapshot_text(snapshot, max_chars=1000)
+        self.assertLessEqual(len(text), 1000)
+        self.assertIn("short", text)
+        self.assertGreater(text.count("y"), 450)
+        self.assertGreater(text.count("x"), 450)
+
+
+def _graph_response(status=200, data=None):
+    response = mock.Mock(status_code=status)
+    data = {"messages": [{"id": "wamid.sent"}]} if data is None else data
+    response.json.return_value = data
+    response.text = json.dumps(data)
+    return response
+
+
+@mock.patch.object(utils, "OUTBOX_ENABLED", False)
+class GraphSendTests(SimpleTestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        self.session.post.return_value = _graph_response()
+        patcher = mock.patch.object(utils, "get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sent(self):
+        return [c.kwargs["json"] for c in self.session.post.call_args_list]
+
+    def test_text_and_buttons_fitting_the_body_limit_go_out_as_one_message(self):
+        buttons = [{"id": "menu", "title": "Menyu kuu"}]
+        utils.send_text_with_buttons("+255 700 000 001", "Jibu lako.", buttons, "Chagua:")
+        [payload] = self._sent()
+        self.assertEqual(payload["to"], "255700000001")
+        self.assertEqual(payload["type"], "interactive")
+        self.assertEqual(payload["interactive"]["body"]["text"], "Jibu lako.\n\nChagua:")
+        self.assertEqual(payload["interactive"]["action"]["buttons"], [
+            {"type": "reply", "reply": {"id": "menu", "title": "Menyu kuu"}},
+        ])
+
+    def test_text_over_the_body_limit_is_sent_first_then_the_buttons(self):
+        text = "x" * utils.INTERACTIVE_BODY_MAX_CHARS
+        utils.send_text_with_buttons("255700000001", text, [{"id": "menu", "title": "Menyu kuu"}], "Chagua:")
+        text_payload, buttons_payload = self._sent()
+        self.assertEqual((text_payload["type"], text_payload["text"]["body"]), ("text", text))
+        self.assertEqual(buttons_payload["type"], "interactive")
+        self.assertEqual(buttons_payload["interactive"]["body"]["text"], "Chagua:")
+
+    def test_prompt_is_not_merged_when_the_reply_asks_for_a_separate_one(self):
+        utils.send_text_with_buttons("255700000001", "Jibu.", [{"id": "1", "title": "Ndiyo"}], "Chagua:", merge_prompt=False)
+        [payload] = self._sent()
+        self.assertEqual(payload["interactive"]["body"]["text"], "Jibu.")
+
+
+@mock.patch.object(utils, "OUTBOX_ENABLED", False)
+class PooledSessionTests(SimpleTestCase):
+    def setUp(self):
+        http_client.close_sessions()
+        self.addCleanup(http_client.close_sessions)
+
+    def test_sends_reuse_one_keep_alive_session_with_timeouts_and_no_retries(self):
+        with mock.patch.object(requests.Session, "post", autospec=True, return_value=_graph_response()) as post:
+            utils.send_message("255700000001", "Habari")
+            utils.send_interactive_buttons("255700000002", "Chagua:", [{"id": "menu", "title": "Menyu kuu"}])
+        (first, *_), (second, *_) = (c.args for c in post.call_args_list)
+        self.assertIs(first, second)
+        self.assertIs(first, http_client.get_session("graph"))
+        self.assertEqual([c.kwargs["timeout"] for c in post.call_args_list], [utils.HTTP_TIMEOUT] * 2)
+        self.assertEqual(utils.HTTP_TIMEOUT, (settings.WHATSAPP_CONNECT_TIMEOUT, settings.WHATSAPP_READ_TIMEOUT))
+
+        adapter = first.get_adapter(utils.GRAPH_API_URL)
+        self.assertIsInstance(adapter, HTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, utils.HTTP_POOL_SIZE)
+        self.assertEqual(adapter.max_retries.total, 0)  # a retried POST could send a message twice
+
+    def test_forked_worker_gets_its_own_session(self):
+        parent = http_client.get_session("graph")
+        with mock.patch.object(http_client.os, "getpid", return_value=os.getpid() + 1):
+            child = http_client.get_session("graph")
+            http_client.close_sessions()
+        self.assertIsNot(child, parent)
+        self.assertIs(http_client.get_session("graph"), parent)
+
+
+EXPIRED_MEDIA = {"error": {"code": 131053, "message": "Media upload error"}}
+
+
+@override_settings(
+    LOGO_URL="https://example.org/logo.png",
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+@mock.patch.object(utils, "OUTBOX_ENABLED", False)
+class WelcomeLogoTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = mock.Mock()
+        patcher = mock.patch.object(utils, "get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        uploads = iter(["media.1", "media.2", "media.3"])
+        patcher = mock.patch.object(utils, "upload_media", side_effect=lambda source: next(uploads))
+        self.upload_media = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _images_sent(self):
+        return [c.kwargs["json"]["image"].get("id") or c.kwargs["json"]["image"]["link"] for c in self.session.post.call_args_list]
+
+    def test_rejected_media_id_is_reuploaded_once(self):
+        self.session.post.side_effect = [_graph_response(400, EXPIRED_MEDIA), _graph_response()]
+        self.assertFalse(utils.send_logo_with_caption("255700000001", "Karibu").get("error"))
+        self.assertEqual(self._images_sent(), ["media.1", "media.2"])
+        self.assertEqual(self.upload_media.call_count, 2)
+
+    def test_other_failures_are_not_resent(self):
+        for failure in (
+            requests.ReadTimeout("read timed out"),
+            _graph_response(400, {"error": {"code": 131026, "message": "Message undeliverable"}}),
+        ):
+            with self.subTest(failure=failure):
+                self.session.post.reset_mock()
+                self.session.post.side_effect = [failure]
+                self.assertTrue(utils.send_logo_with_caption("255700000001", "Karibu").get("error"))
+                self.assertEqual(self._images_sent(), ["media.1"])
+        self.assertEqual(self.upload_media.call_count, 1)
+
+    def test_outbox_retries_a_rejected_media_id_with_one_upload(self):
+        media_id = utils.get_media_id(settings.LOGO_URL)
+        payload = {"to": "255700000001", "type": "image", "image": {"id": media_id, "caption": "Karibu"}}
+        messages = [mock.Mock(pk=n, to="255700000001", payload=dict(payload), attempts=0) for n in (1, 2)]
+        with mock.patch.object(outbox, "_graph_post", return_value=_graph_response(400, EXPIRED_MEDIA)):
+            for msg in messages:
+                self.assertFalse(outbox.deliver(msg))
+        for msg in messages:
+            self.assertEqual(msg.payload["image"], {"id": "media.2", "caption": "Karibu"})
+            self.assertEqual(msg.status, OutboundMessage.STATUS_PENDING)
+            self.assertLessEqual(msg.next_attempt_at, timezone.now())
+        self.assertEqual(self.upload_media.call_count, 2)
+
+
+class UploadMediaTests(SimpleTestCase):
+    def setUp(self):
+        http_client.close_sessions()
+        self.addCleanup(http_client.close_sessions)
+
+    def test_download_does_not_share_the_graph_pool(self):
+        download = mock.Mock(status_code=200, content=b"png", headers={"Content-Type": "image/png"})
+        with mock.patch.object(requests.Session, "get", autospec=True, return_value=download) as get, \
+                mock.patch.object(requests.Session, "post", autospec=True,
+                                  return_value=_graph_response(data={"id": "media.1"})) as post:
+            self.assertEqual(utils.upload_media("https://s3.example.com/logo.png"), "media.1")
+        self.assertIs(get.call_args.args[0], http_client.get_session("media"))
+        self.assertIs(post.call_args.args[0], http_client.get_session("graph"))
+        self.assertEqual(post.call_args.kwargs["files"]["file"], ("logo.png", b"png", "image/png"))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_refill_at_the_rate(self):
+        clock = [100.0]
+        with mock.patch.object(outbox.time, "monotonic", lambda: clock[0]):
+            bucket = outbox.TokenBucket(rate=2, capacity=3)
+            self.assertEqual([bucket.take() for _ in range(4)], [True, True, True, False])
+            clock[0] += 0.25  # half a token
+            self.assertFalse(bucket.available())
+            clock[0] += 0.25
+            self.assertTrue(bucket.take())
+            clock[0] += 60  # never more than the capacity
+            self.assertEqual([bucket.take() for _ in range(4)], [True, True, True, False])
+
+
+class OutboxTests(TestCase):
+    def _queue(self, to="255700000001", **fields):
+        return OutboundMessage.objects.create(to=to, payload={"to": to, "type": "text"}, **fields)
+
+    def _deliver(self, response, attempts=0):
+        msg = self._queue(attempts=attempts)
+        post = mock.Mock(side_effect=response) if isinstance(response, Exception) else mock.Mock(return_value=response)
+        with mock.patch.object(outbox, "_graph_post", post):
+            delivered = outbox.deliver(msg)
+        msg.refresh_from_db()
+        return delivered, msg
+
+    def test_delivered_message_is_marked_sent(self):
+        delivered, msg = self._deliver(_graph_response())
+        self.assertTrue(delivered)
+        self.assertEqual((msg.status, msg.wamid, msg.attempts), (OutboundMessage.STATUS_SENT, "wamid.sent", 1))
+
+    def test_transient_errors_are_retried_later(self):
+        for response in (
+            _graph_response(429, {"error": {"code": 130429, "message": "Rate limit hit"}}),
+            _graph_response(503, {}),
+            _graph_response(400, {"error": {"code": 131056, "message": "Pair rate limit"}}),
+            requests.ConnectionError("reset by peer"),
+            requests.ReadTimeout("read timed out"),
+        ):
+            with self.subTest(response=response):
+                delivered, msg = self._deliver(response)
+                self.assertFalse(delivered)
+                self.assertEqual(msg.status, OutboundMessage.STATUS_PENDING)
+                self.assertGreater(msg.next_attempt_at, timezone.now())
+                self.assertTrue(msg.last_error)
+
+    def test_permanent_errors_and_exhausted_retries_fail(self):
+        for response, attempts in (
+            (_graph_response(400, {"error": {"code": 131026, "message": "Message undeliverable"}}), 0),
+            (_graph_response(401, {"error": {"code": 190, "message": "Invalid OAuth access token"}}), 0),
+            (_graph_response(503, {}), outbox.MAX_ATTEMPTS - 1),
+        ):
+            with self.subTest(response=response, attempts=attempts):
+                delivered, msg = self._deliver(response, attempts=attempts)
+                self.assertFalse(delivered)
+                self.assertEqual(msg.status, OutboundMessage.STATUS_FAILED)
+
+    def test_backed_off_and_rate_limited_recipients_do_not_hide_other_messages(self):
+        later = timezone.now() + timedelta(minutes=5)
+        for i in range(12):
+            # Oldest message of this recipient is in backoff, so all of theirs wait
+            self._queue("255700000001", **({"next_attempt_at": later} if i == 0 else {}))
+        for _ in range(12):
+            self._queue("255700000002")  # recipient burst of 2 below
+        ready = self._queue("255700000003")
+        limiter = outbox.RateLimiter()
+        limiter.recipient_rate, limiter.recipient_burst = 0.001, 2
+        with mock.patch.object(outbox, "_graph_post", return_value=_graph_response()):
+            self.assertEqual(outbox.send_batch(limiter, batch_size=5), 3)
+        sent = OutboundMessage.objects.filter(status=OutboundMessage.STATUS_SENT)
+        self.assertEqual(sorted(sent.values_list("to", flat=True)), ["255700000002", "255700000002", "255700000003"])
+        self.assertIn(ready.pk, sent.values_list("pk", flat=True))
+        # Per-recipient order: the two oldest messages of 255700000002 went first
+        first_two = OutboundMessage.objects.filter(to="255700000002").order_by("id")[:2]
+        self.assertEqual({m.status for m in first_two}, {OutboundMessage.STATUS_SENT})
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_keys(self):
+        self.assertEqual(caching.make_key("a", "b", 1), caching.make_key("a", "b", 1))
+        self.assertNotEqual(caching.make_key("a", "b"), caching.make_key("b", "a"))
+        self.assertNotEqual(caching.make_key("ab", "c"), caching.make_key("a", "bc"))  # parts are delimited
+        self.assertEqual(caching.ResponseCache("ai_test")._full_key("k"), "ai_test:0:k")
+
+    def test_local_hit_then_shared_hit_from_another_worker(self):
+        worker, other_worker = caching.ResponseCache("ai_test"), caching.ResponseCache("ai_test")
+        worker.set("k", "jibu")
+        self.assertEqual(cache.get("ai_test:0:k"), "jibu")
+
+        with mock.patch.object(caching.cache, "get", wraps=caching.cache.get) as shared_get:
+            self.assertEqual(worker.get("k"), "jibu")  # in-process LRU, shared cache not consulted
+            shared_get.assert_not_called()
+            self.assertEqual(other_worker.get("k"), "jibu")  # only in the shared cache
+            self.assertEqual(shared_get.call_args.args[0], "ai_test:0:k")
+
+        cache.delete("ai_test:0:k")
+        self.assertEqual(other_worker.get("k"), "jibu")  # now in that worker's LRU too
+        self.assertIsNone(other_worker.get("missing"))
+        self.assertEqual(other_worker.stats(), {"hits": 2, "misses": 1, "hit_rate": 2 / 3})
+
+    def test_invalidate_drops_both_tiers_in_every_worker(self):
+        worker, other_worker = caching.ResponseCache("ai_test"), caching.ResponseCache("ai_test")
+        worker.set("k", "jibu la zamani")
+        self.assertEqual(other_worker.get("k"), "jibu la zamani")  # now in both of its tiers
+
+        worker.invalidate()
+        self.assertIsNone(worker.get("k"))
+        self.assertEqual(cache.get("ai_test:generation"), 1)
+        # The other worker notices the new generation at its next check
+        with mock.patch.object(caching.ResponseCache, "GENERATION_CHECK_SECONDS", 0):
+            self.assertIsNone(other_worker.get("k"))
+            other_worker.set("k", "jibu jipya")
+            self.assertEqual(worker.get("k"), "jibu jipya")
+        self.assertEqual(cache.get("ai_test:1:k"), "jibu jipya")
+
+    def test_invalidate_ai_caches_bumps_both_ai_namespaces(self):
+        for namespace in (ai_utils.rewrite_cache, ai_utils.qa_cache):
+            namespace.set("k", "jibu")
+        ai_utils.invalidate_ai_caches()
+        self.assertEqual([c.get("k") for c in (ai_utils.rewrite_cache, ai_utils.qa_cache)], [None, None])
+
+
+class SingleFlightTests(SimpleTestCase):
+    WAITERS = 5
+
+    def _run_concurrently(self, flight, loader):
+        """Start WAITERS callers of the same key while the leader's loader is blocked; return their outcomes."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        outcomes = []
+
+        def blocked_loader():
+            release.wait(5)
+            return loader()
+
+        def call():
+            try:
+                outcomes.append(("result", flight.do("k", blocked_loader)))
+            except Exception as e:
+                outcomes.append(("error", e))
+
+        threads = [threading.Thread(target=call) for _ in range(self.WAITERS)]
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + 5
+        while flight.stats()["coalesced"] < self.WAITERS - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join(5)
+        return outcomes
+
+    def test_concurrent_misses_share_the_leaders_result(self):
+        flight = caching.SingleFlight("test")
+        loader = mock.Mock(return_value="jibu")
+        outcomes = self._run_concurrently(flight, loader)
+        loader.assert_called_once()
+        self.assertEqual(outcomes, [("result", "jibu")] * self.WAITERS)
+        self.assertEqual(flight.stats()["leaders"], 1)
+        self.assertEqual(flight.stats()["coalesced"], self.WAITERS - 1)
+        self.assertFalse(flight.in_flight("k"))
+
+    def test_concurrent_misses_share_the_leaders_exception(self):
+        flight = caching.SingleFlight("test")
+        error = RuntimeError("OpenAI down")
+        loader = mock.Mock(side_effect=error)
+        outcomes = self._run_concurrently(flight, loader)
+        loader.assert_called_once()
+        self.assertEqual(outcomes, [("error", error)] * self.WAITERS)
+
+    def test_waiter_gives_up_after_its_timeout(self):
+        flight = caching.SingleFlight("test")
+        release = threading.Event()
+        self.addCleanup(release.set)
+        leader = threading.Thread(target=flight.do, args=("k", release.wait, 5))
+        leader.start()
+        while not flight.in_flight("k"):
+            time.sleep(0.01)
+        self.assertEqual(flight.do("k", mock.Mock(), wait_timeout=0.05, default="default"), "default")
+        self.assertEqual(flight.stats()["timeouts"], 1)
+        release.set()
+        leader.join(5)
+
+    def test_stats_are_logged_once_per_interval(self):
+        with mock.patch.object(ai_utils, "STATS_LOG_SECONDS", 300), \
+                mock.patch.object(ai_utils, "_last_stats_log", time.monotonic() - 301):
+            with self.assertLogs("chatbot.ai_utils", "INFO") as logs:
+                self.assertTrue(ai_utils.log_single_flight_stats_if_due())
+                self.assertFalse(ai_utils.log_single_flight_stats_if_due())
+        self.assertEqual(len(logs.output), 1)
+        for name in ("chembadc", "ai_rewrite", "ai_qa"):
+            self.assertIn(name, logs.output[0])
+
+
+class QuestionKeyTests(SimpleTestCase):
+    def test_variants_of_one_question_share_a_key(self):
+        for variants in (
+            [
+                "Je, idadi ya watu wa Chemba ni ngapi?",
+                "idadi ya watu wa chemba ngapi",
+                "  IDADI   ya watu wa Chemba ni ngapi??? ",
+                "Idadi ya watu wa Chembá ni ngapi 🙏",
+                "tafadhali, idadi ya watu wa Chemba ni ngapi.",
+            ],
+            ["What is the population of Chemba?", "what is the POPULATION of chemba", "Please, what is the population of Chemba??"],
+            ["habari", "Habari!", "  HABARI "],  # only stopwords: the words are kept
+        ):
+            with self.subTest(variants=variants):
+                self.assertEqual(len({ai_utils.normalize_question(v) for v in variants}), 1)
+                self.assertEqual(len({ai_utils.qa_cache_key(v) for v in variants}), 1)
+        self.assertEqual(ai_utils.normalize_question("Je, idadi ya watu wa Chemba ni ngapi?"), "idadi watu chemba ngapi")
+        self.assertEqual(ai_utils.normalize_question("Habari!"), "habari")
+
+    def test_different_questions_do_not_collide(self):
+        questions = [
+            "Idadi ya watu wa Chemba ni ngapi?",
+            "Idadi ya kata za Chemba ni ngapi?",
+            "Idadi ya vijiji vya Chemba ni ngapi?",
+            "Chemba ina kata ngapi?",
+            "Mkurugenzi wa Chemba ni nani?",
+            "Can I pay the levy online?",
+            "Do I pay the levy online?",
+            "Could I pay the levy online?",
+            "What can I pay online?",
+            "What do I pay online?",
+            "habari",
+            "",
+        ]
+        self.assertEqual(len({ai_utils.qa_cache_key(q) for q in questions}), len(questions))
+        question = "Idadi ya watu wa Chemba ni ngapi?"
+        self.assertNotEqual(ai_utils.qa_cache_key(question, "sw"), ai_utils.qa_cache_key(question, "en"))
+
+    def test_pregenerated_store_serves_only_its_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = AnswerStore(Path(tmp) / "answers.json", check_interval=0)
+            self.assertIsNone(store.get("k", "v1"))  # no file yet
+            store.write("v1", {"k": "Jibu"})
+            self.assertEqual(store.get("k", "v1"), "Jibu")
+            self.assertIsNone(store.get("other", "v1"))
+            self.assertIsNone(store.get("k", "v2"))  # generated for another model/prompt/content
+            store.write("v2", {"k": "Jibu jipya"})
+            self.assertEqual(AnswerStore(store.path).get("k", "v2"), "Jibu jipya")  # another worker
+
+
+KNOWLEDGE_SAMPLE = """# Idadi ya watu
+Kwa mujibu wa sensa ya mwaka 2022, Wilaya ya Chemba ina wakazi 339,333.
+
+# Utawala
+Wilaya ina tarafa 4, kata 26 na vijiji 114.
+
+# Afya
+Kuna hospitali 1 ya wilaya, vituo vya afya 5 na zahanati 60.
+
+# Elimu
+Shule za msingi ni 120 na shule za sekondari ni 30."""
+
+
+class IntentMatcherTests(SimpleTestCase):
+    def test_normalize(self):
+        cases = [
+            ("Habariii!!", "habari"),
+            ("hi 👋", "hi"),
+            ("  HELLOOOO  ", "hello"),
+            ("Habári, Mambo?", "habari mambo"),
+            ("Menyu_Kuu", "menyu kuu"),
+            ("saa 1000", "saa 1000"),  # digits are never squeezed
+            ("", ""),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(intents.normalize(text), expected)
+
+    def test_match_intent(self):
+        cases = [
+            # exact phrases, any case
+            ("hi", intents.INTENT_GREETING),
+            ("Hello", intents.INTENT_GREETING),
+            ("za asubuhi", intents.INTENT_GREETING),
+            ("swali", intents.INTENT_QUESTION),
+            ("Menyu Kuu", intents.INTENT_MENU),
+            ("Track my ticket", intents.INTENT_MENU),
+            # elongated, punctuated or decorated greetings
+            ("Habariii!!", intents.INTENT_GREETING),
+            ("hi 👋", intents.INTENT_GREETING),
+            ("HELLOOOO", intents.INTENT_GREETING),
+            ("Mambooo?", intents.INTENT_GREETING),
+            ("Habári", intents.INTENT_GREETING),
+            # "contains" phrases anywhere in the message
+            ("Nina malalamiko kuhusu maji", intents.INTENT_COMPLAINT),
+            ("Kuna KERO ya barabara!", intents.INTENT_COMPLAINT),
+            ("changamoto", intents.INTENT_COMPLAINT),
+            # priority: complaint over menu, question over menu
+            ("Malalamiko", intents.INTENT_COMPLAINT),
+            ("maswali", intents.INTENT_QUESTION),
+            # non-matches: exact phrases inside longer messages, unrelated text
+            ("hi there", None),
+            ("habari za leo", None),
+            ("swali langu ni hili", None),
+            ("Je, kuna hospitali ya wilaya?", None),
+            ("hii", None),
+            ("", None),
+            (None, None),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(intents.match_intent(text), expected)
+
+    def test_free_form_answers_skip_only_menu_like_phrases(self):
+        with mock.patch.object(flow, "answer_from_web_search", return_value=("Jibu", True)) as answer:
+            for msg, answered in (
+                ("Swali?", True),  # a question keyword, but not a menu phrase
+                ("Maswali?", False),  # a question keyword and a menu phrase
+                ("Main menu", False),
+                ("Je, kuna hospitali?", True),
+            ):
+                with self.subTest(msg=msg):
+                    answer.reset_mock()
+                    turn = flow.Turn(flow.MAIN_MENU, {}, "sw", msg, None, Deadline(5), intents.match_intent(msg))
+                    flow._pre_free_form_question(turn)
+                    self.assertEqual(answer.called, answered)
+
+    def test_contains_matches_the_longest_phrase_of_a_rule(self):
+        matcher = intents.IntentMatcher([("intent", ["nina", "nina swali"], "contains")])
+        self.assertEqual(matcher._contains.search("habari, nina swali").group(), "nina swali")
+
+    def test_higher_priority_rule_wins(self):
+        matcher = intents.IntentMatcher([
+            ("first", ["nina"], "contains"),
+            ("second", ["nina swali"], "contains"),
+            ("third", ["nina"], "exact"),
+        ])
+        self.assertEqual(matcher.match("habari, nina swali"), "first")
+        self.assertEqual(matcher.match("Nina!"), "first")
+        self.assertIsNone(matcher.match("swali"))
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            intents.IntentMatcher([("x", ["a"], "prefix")])
+
+
+class KnowledgeIndexTests(SimpleTestCase):
+    def test_chunks_break_at_headings_and_stay_within_the_size(self):
+        self.assertEqual(retrieval.chunk_text(KNOWLEDGE_SAMPLE, max_chars=100), [
+            "# Idadi ya watu\nKwa mujibu wa sensa ya mwaka 2022, Wilaya ya Chemba ina wakazi 339,333.",
+            "# Utawala\nWilaya ina tarafa 4, kata 26 na vijiji 114.",
+            "# Afya\nKuna hospitali 1 ya wilaya, vituo vya afya 5 na zahanati 60.",
+            "# Elimu\nShule za msingi ni 120 na shule za sekondari ni 30.",
+        ])
+        long_paragraph = " ".join(f"neno{i}" for i in range(200))
+        chunks = retrieval.chunk_text(long_paragraph, max_chars=100)
+        self.assertTrue(all(len(c) <= 100 for c in chunks))
+        self.assertEqual(" ".join(chunks).split(), long_paragraph.split())  # cut between words, nothing lost
+
+    def test_bm25_ranks_the_chunk_that_answers_first(self):
+        index = retrieval.KnowledgeIndex.from_text(KNOWLEDGE_SAMPLE, max_chars=100)
+        for question, expected in (
+            ("Idadi ya watu wa Chemba ni ngapi?", "# Idadi ya watu"),
+            ("What is the population of Chemba?", "# Idadi ya watu"),  # via the population -> idadi watu synonyms
+            ("Chemba ina kata ngapi?", "# Utawala"),
+            ("Is there a district hospital?", "# Afya"),
+        ):
+            with self.subTest(question=question):
+                results = index.search(question)
+                self.assertTrue(results[0][1].text.startswith(expected))
+                self.assertEqual([score for score, _ in results], sorted((score for score, _ in results), reverse=True))
+
+    def test_select_packs_the_budget_in_document_order(self):
+        index = retrieval.KnowledgeIndex.from_text(KNOWLEDGE_SAMPLE, max_chars=100)
+        context = index.select("shule za sekondari na hospitali", token_budget=200)
+        self.assertEqual([part.split("\n")[0] for part in context.split("\n\n---\n\n")], ["# Afya", "# Elimu"])
+        self.assertEqual(index.select("shule za sekondari na hospitali", token_budget=20).split("\n")[0], "# Elimu")
+
+    def test_nothing_matching_gives_no_context_and_no_document_call(self):
+        index = retrieval.KnowledgeIndex.from_text(KNOWLEDGE_SAMPLE, max_chars=100)
+        self.assertEqual(index.search("xylophone quartz"), [])
+        self.assertEqual(index.select("xylophone quartz"), "")
+        self.assertEqual(ai_utils.knowledge_context("qwxz vbnq plokm"), "")
+        with mock.patch.object(ai_utils, "OPENAI_API_KEY", "test-key"), \
+                mock.patch.object(ai_utils, "_call_openai_chat") as call:
+            self.assertEqual(ai_utils.answer_freeform_question("qwxz vbnq plokm"), (None, False))
+        call.assert_not_called()
+
+
+class NegativeAnswerCacheTests(SimpleTestCase):
+    QUESTION = "Idadi ya watu wa Chemba ni ngapi?"
+    NOT_AVAILABLE = (None, False, True)
+
+    def setUp(self):
+        cache.clear()
+        ai_utils.invalidate_ai_caches()
+        patcher = mock.patch.object(ai_utils, "OPENAI_API_KEY", "test-key")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ask(self, document, website, speculative=False):
+        with mock.patch.object(ai_utils, "AI_SPECULATIVE", speculative), \
+                mock.patch.object(ai_utils, "_answer_from_document", return_value=document), \
+                mock.patch.object(ai_utils, "_answer_from_website", return_value=website):
+            self.assertEqual(ai_utils.answer_from_web_search(self.QUESTION, "sw"), (None, False))
+        return ai_utils.qa_cache.get(ai_utils.qa_cache_key(self.QUESTION, "sw"))
+
+    def test_not_available_is_cached_when_both_stages_found_nothing(self):
+        for speculative in (False, True):
+            with self.subTest(speculative=speculative):
+                ai_utils.invalidate_ai_caches()
+                cached = self._ask(self.NOT_AVAILABLE, self.NOT_AVAILABLE, speculative)
+                self.assertEqual(cached, {"answer": None, "answered": False})
+
+    def test_not_available_is_not_cached_when_the_document_stage_failed(self):
+        for speculative in (False, True):
+            with self.subTest(speculative=speculative):
+                self.assertIsNone(self._ask((None, False, False), self.NOT_AVAILABLE, speculative))
+
+    def test_document_stage_without_an_openai_response_is_not_definitive(self):
+        with mock.patch.object(ai_utils, "_call_openai_chat", return_value=None):
+            self.assertEqual(ai_utils._answer_from_document(self.QUESTION, "sw"), (None, False, False))
+        with mock.patch.object(ai_utils, "_call_openai_chat", return_value="NO_ANSWER"):
+            self.assertEqual(ai_utils._answer_from_document(self.QUESTION, "sw"), (None, False, True))
+
+
+class SpeculativeAnswerTests(SimpleTestCase):
+    def test_busy_executor_does_not_stretch_the_turn_past_its_deadline(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit(release.wait, 5)  # every speculative worker busy
+        website = mock.Mock(return_value=("Jibu", True, True))
+        with mock.patch.object(ai_utils, "_speculative_executor", executor), \
+                mock.patch.object(ai_utils, "_answer_from_website", website), \
+                mock.patch.object(ai_utils, "_answer_from_document", return_value=(None, False, True)):
+            start = time.monotonic()
+            result = ai_utils._answer_speculatively("Swali", "sw", Deadline(0.3))
+            elapsed = time.monotonic() - start
+        self.assertEqual(result, (None, False, False))  # like a failed website call: not cached
+        self.assertLess(elapsed, 1.0)
+        release.set()
+        executor.shutdown(wait=True)
+        website.assert_not_called()  # the queued website call was cancelled
+
+
+class ExpiredDeadlineTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = mock.Mock()
+        for patcher in (
+            mock.patch.object(llm, "get_session", return_value=self.session),
+            mock.patch.object(ai_utils, "crawl", return_value=({"order": [], "pages": {}}, {})),
+            mock.patch.object(ai_utils, "OPENAI_API_KEY", "test-key"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_menu_answer_falls_back_to_the_official_text(self):
+        header, body = "1️⃣ Utangulizi wa Wilaya", "Wilaya ya Chemba ipo Mkoa wa Dodoma."
+        reply = ai_utils.rewrite_info_answer(header, body, "sw", deadline=Deadline(0))
+        self.assertEqual(reply, f"{header}\n\n{body}")
+        self.session.post.assert_not_called()
+        self.assertIsNone(ai_utils.rewrite_cache.get(ai_utils.rewrite_cache_key(header, body, "sw")))
+
+    def test_free_form_question_gets_no_answer_and_is_not_cached(self):
+        question = "Hospitali ya wilaya iko wapi?"
+        self.assertEqual(ai_utils.answer_from_web_search(question, "sw", deadline=Deadline(0)), (None, False))
+        self.session.post.assert_not_called()
+        self.assertIsNone(ai_utils.qa_cache.get(ai_utils.qa_cache_key(question, "sw")))
+
+
+def _completion_response(status=200, content="Jibu", headers=None):
+    response = mock.Mock(status_code=status, headers=headers or {}, text="")
+    response.json.return_value = {"choices": [{"message": {"content": content}}]}
+    return response
+
+
+class ChatCompletionTests(SimpleTestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        self.breaker = llm.CircuitBreaker(failure_threshold=2, cooldown=30)
+        for target, value in (
+            ("get_session", mock.Mock(return_value=self.session)),
+            ("breaker", self.breaker),
+            ("stats", llm.CallStats()),
+            ("retry_delay", mock.Mock(return_value=0.0)),
+        ):
+            patcher = mock.patch.object(llm, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _complete(self, deadline=None):
+        return llm.chat_completion(
+            [{"role": "user", "content": "Habari"}], api_key="k", model="m", api_base="http://llm", deadline=deadline
+        )
+
+    def test_rate_limits_and_server_errors_are_retried(self):
+        for status in (429, 500, 502, 503, 504):
+            with self.subTest(status=status):
+                self.session.post.reset_mock()
+                self.session.post.side_effect = [_completion_response(status), _completion_response()]
+                self.assertEqual(self._complete(), "Jibu")
+                self.assertEqual(self.session.post.call_count, 2)
+
+    def test_retries_stop_after_max_retries(self):
+        self.session.post.return_value = _completion_response(503)
+        self.assertIsNone(self._complete())
+        self.assertEqual(self.session.post.call_count, llm.MAX_RETRIES + 1)
+        self.assertEqual(llm.stats.snapshot()["statuses"], {"503": 1})
+
+    def test_client_errors_are_not_retried(self):
+        self.session.post.return_value = _completion_response(400)
+        self.assertIsNone(self._complete())
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_client_errors_between_failures_do_not_reset_the_breaker(self):
+        self.session.post.side_effect = [_completion_response(503), _completion_response(400), _completion_response(503)]
+        with mock.patch.object(llm, "MAX_RETRIES", 0):
+            for _ in range(3):
+                self.assertIsNone(self._complete())
+        self.assertEqual(self.breaker.state, "open")
+
+    def test_client_error_on_a_half_open_trial_keeps_the_circuit_half_open(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.opened_at -= self.breaker.cooldown + 1
+        self.session.post.return_value = _completion_response(400)
+        self.assertIsNone(self._complete())
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow())  # the next call is another trial
+
+    def test_no_retry_when_the_deadline_is_too_short(self):
+        self.session.post.side_effect = [_completion_response(503), _completion_response()]
+        self.assertIsNone(self._complete(deadline=Deadline(0.5)))
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_connect_timeout_cut_short_by_the_deadline_is_not_a_failure(self):
+        self.session.post.side_effect = requests.ConnectTimeout("connect timed out")
+        self.assertIsNone(self._complete(deadline=Deadline(1.0)))  # less than the 3.05 s connect timeout
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(llm.stats.snapshot()["statuses"], {"deadline": 1})
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_full_connect_timeout_is_retried_and_counts_as_a_failure(self):
+        self.session.post.side_effect = requests.ConnectTimeout("connect timed out")
+        self.assertIsNone(self._complete())
+        self.assertEqual(self.session.post.call_count, llm.MAX_RETRIES + 1)
+        self.assertEqual(llm.stats.snapshot()["statuses"], {"connect_timeout": 1})
+        self.assertEqual(self.breaker.failures, 1)
+
+    def test_expired_deadline_makes_no_request(self):
+        self.assertIsNone(self._complete(deadline=Deadline(0)))
+        self.session.post.assert_not_called()
+        self.assertEqual(llm.stats.snapshot()["statuses"], {"deadline": 1})
+
+    def test_open_circuit_makes_no_request(self):
+        self.session.post.return_value = _completion_response(503)
+        self._complete()
+        self._complete()
+        self.assertEqual(self.breaker.state, "open")
+        self.session.post.reset_mock()
+        self.assertIsNone(self._complete())
+        self.session.post.assert_not_called()
+
+    def test_stats_are_logged_once_per_interval(self):
+        self.session.post.return_value = _completion_response()
+        with mock.patch.object(llm, "STATS_LOG_SECONDS", 300), \
+                mock.patch.object(llm, "_last_stats_log", time.monotonic() - 301):
+            with self.assertLogs("chatbot.llm", "INFO") as logs:
+                self._complete()
+                self._complete()
+        stats_lines = [line for line in logs.output if "OpenAI stats" in line]
+        self.assertEqual(len(stats_lines), 1)
+        self.assertIn("calls=1", stats_lines[0])
+        self.assertIn("breaker=closed", stats_lines[0])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def _cool_down(self, breaker):
+        breaker.opened_at -= breaker.cooldown + 1
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = llm.CircuitBreaker(failure_threshold=2, cooldown=30)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_the_failure_count(self):
+        breaker = llm.CircuitBreaker(failure_threshold=2, cooldown=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = llm.CircuitBreaker(failure_threshold=1, cooldown=30)
+        breaker.record_failure()
+        self._cool_down(breaker)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one trial at a time
+
+    def test_successful_trial_closes_the_circuit(self):
+        breaker = llm.CircuitBreaker(failure_threshold=1, cooldown=30)
+        breaker.record_failure()
+        self._cool_down(breaker)
+        breaker.allow()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens_for_another_cooldown(self):
+        breaker = llm.CircuitBreaker(failure_threshold=3, cooldown=30)
+        for _ in range(3):
+            breaker.record_failure()
+        self._cool_down(breaker)
+        breaker.allow()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_released_trial_can_be_retried(self):
+        breaker = llm.CircuitBreaker(failure_threshold=1, cooldown=30)
+        breaker.record_failure()
+        self._cool_down(breaker)
+        breaker.allow()
+        breaker.release()
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+
+
+class ContentCatalogTests(SimpleTestCase):
+    def _write_sources(self, source_dir, faq_sw="Maswali", faq_en=None):
+        sw = {"language": "sw", "knowledge": [["Taarifa", "rasmi"]]}
+        for key in content.REQUIRED_KEYS:
+            section = sw
+            *parents, leaf = key.split(".")
+            for name in parents:
+                section = section.setdefault(name, {})
+            section[leaf] = key
+        sw["faq"] = faq_sw
+        en = {"language": "en", "council": {"back_hint": "Reply 3"}}
+        if faq_en:
+            en["faq"] = faq_en
+        (source_dir / "sw.json").write_text(json.dumps(sw), encoding="utf-8")
+        (source_dir / "en.json").write_text(json.dumps(en), encoding="utf-8")
+
+    def test_shipped_sources_compile(self):
+        compiled = content.compile_sources(content.load_sources())
+        self.assertEqual(compiled["version"], content.catalog.version)
+        self.assertEqual(set(compiled["languages"]), {"sw", "en"})
+
+    def test_fallback_prerendering_and_hot_reload(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dir, path = Path(tmp) / "src", Path(tmp) / "content.json"
+            source_dir.mkdir()
+            self._write_sources(source_dir)
+            catalog = content.ContentCatalog(path, source_dir, check_interval=0)  # no compiled file yet
+            self.assertEqual(catalog.text("faq", "en"), "Maswali")
+            self.assertEqual(catalog.text("council.reply.2", "en"), "council.details.2\n\nReply 3")
+            self.assertEqual(catalog.knowledge, "Taarifa\nrasmi")
+            first = catalog.version
+
+            self._write_sources(source_dir, faq_en="Questions")
+            content.write_catalog(path, content.compile_sources(content.load_sources(source_dir)))
+            self.assertEqual(catalog.text("faq", "en"), "Questions")
+            self.assertEqual(catalog.text("faq", "sw"), "Maswali")
+            self.assertNotEqual(catalog.version, first)
+
+    def test_missing_required_text_is_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dir = Path(tmp)
+            self._write_sources(source_dir, faq_sw="")
+            with self.assertRaisesMessage(ValueError, "faq"):
+                content.compile_sources(content.load_sources(source_dir))
+
+
+class _MemoryPersistence:
+    """Stand-in for sessions.DatabaseBackend that records each batch written."""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+
+    def load(self, phone):
+        session = self.rows.get(phone)
+        return session.copy() if session else None
+
+    def save_many(self, batch):
+        self.batches.append([s.phone_number for s in batch])
+        self.rows.update((s.phone_number, s.copy()) for s in batch)
+
+
+class SessionStoreTests(TransactionTestCase):
+    # Not TestCase: saves are published by on_commit callbacks, which need real commits
+
+    def setUp(self):
+        self.db = _MemoryPersistence()
+        self.store = sessions.SessionStore(sessions.LocalBackend(self.db, write_behind_seconds=3600))
+
+    def test_new_number_starts_at_welcome(self):
+        session = self.store.get("255700000001")
+        self.assertEqual((session.state, session.context, session.language), (flow.WELCOME, {}, "sw"))
+
+    def test_burst_of_saves_is_written_once_with_the_latest_state(self):
+        for state in (flow.MAIN_MENU, flow.CHECK_DEPT, flow.CHECK_ID_TYPE):
+            session = self.store.get("255700000001")
+            session.state = state
+            self.store.save(session)
+        self.store.save(sessions.Session("255700000002", flow.MAIN_MENU))
+        self.assertEqual(self.db.batches, [])
+        self.assertEqual(self.store.get("255700000001").state, flow.CHECK_ID_TYPE)
+
+        self.assertEqual(self.store.flush(), 2)
+        self.assertEqual(self.db.batches, [["255700000001", "255700000002"]])
+        self.assertEqual(self.db.rows["255700000001"].state, flow.CHECK_ID_TYPE)
+
+    def test_save_fails_if_session_was_saved_since_it_was_read(self):
+        self.store.save(sessions.Session("255700000001", flow.MAIN_MENU))
+        mine, theirs = self.store.get("255700000001"), self.store.get("255700000001")
+        theirs.state = flow.CHECK_DEPT
+        self.assertTrue(self.store.save(theirs))
+        mine.state = flow.SUBMIT_DEPT
+        self.assertFalse(self.store.save(mine))
+        self.assertEqual(self.store.get("255700000001").state, flow.CHECK_DEPT)
+
+    def test_conflicting_turn_is_rerun_on_the_fresh_session(self):
+        self.store.save(sessions.Session("255700000001", flow.MAIN_MENU))
+        calls = []
+        sent = []
+
+        def process_message(state, *args, **kwargs):
+            calls.append(state)
+            if len(calls) == 1:
+                # Another worker handles a message from the same citizen meanwhile
+                other = self.store.get("255700000001")
+                other.state = flow.COUNCIL_MENU
+                self.store.save(other)
+            return flow.process_message(state, *args, **kwargs)
+
+        message = {"from": "255700000001", "id": "wamid.1", "type": "text", "text": {"body": "0"}}
+        with mock.patch.object(inbound, "session_store", self.store), \
+                mock.patch.object(inbound, "is_processed", lambda wamid: False), \
+                mock.patch.object(inbound, "process_message", process_message), \
+                mock.patch.object(inbound, "send_reply", lambda phone, reply, state="": sent.append(state)):
+            inbound.handle_message({}, message)
+
+        self.assertEqual(calls, [flow.MAIN_MENU, flow.COUNCIL_MENU])
+        self.assertEqual(sent, [flow.MAIN_MENU])  # "0" in the council menu = back to the main menu
+        self.assertEqual(self.store.get("255700000001").version, 3)
+
+    def test_turn_whose_reply_actions_fail_leaves_the_session_as_it_was(self):
+        self.store.save(sessions.Session("255700000001", flow.MAIN_MENU))
+        self.store.flush()
+        sent = []
+        message = {"from": "255700000001", "id": "wamid.rollback", "type": "text", "text": {"body": "1"}}
+        with mock.patch.object(inbound, "session_store", self.store), \
+                mock.patch.object(inbound, "send_reply", lambda phone, reply, state="": sent.append(state)):
+            with mock.patch.object(inbound, "run_reply_actions", side_effect=RuntimeError("db down")):
+                with self.assertRaises(RuntimeError):
+                    inbound.handle_message({}, message)
+            self.assertFalse(ProcessedMessage.objects.filter(wamid="wamid.rollback").exists())
+            session = self.store.get("255700000001")
+            self.assertEqual((session.state, session.version), (flow.MAIN_MENU, 1))
+            self.assertEqual(self.store.flush(), 0)
+
+            # The redelivery runs the turn again from the main menu
+            inbound.handle_message({}, message)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(self.store.get("255700000001").version, 2)
+        self.assertEqual(self.store.flush(), 1)
+
+    def test_ticket_id_of_a_rerun_turn_has_no_gap(self):
+        self.store.save(sessions.Session("255700000001", flow.SUBMIT_MESSAGE, {"submit_dept": "maji"}))
+        calls = []
+        sent = []
+
+        def process_message(state, *args, **kwargs):
+            result = flow.process_message(state, *args, **kwargs)
+            calls.append(state)
+            if len(calls) == 1:
+                # Another worker saves the session after this turn ran, before it is stored
+                self.store.save(self.store.get("255700000001"))
+            return result
+
+        message = {"from": "255700000001", "id": "wamid.ticket", "type": "text", "text": {"body": "Maji hayatoki bombani"}}
+        with mock.patch.object(inbound, "session_store", self.store), \
+                mock.patch.object(inbound, "process_message", process_message), \
+                mock.patch.object(inbound, "send_reply", lambda phone, reply, state="": sent.append(reply)):
+            inbound.handle_message({}, message)
+
+        ticket_id = f"DCT-{timezone.now():%y%m%d}-0001"
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(list(Ticket.objects.values_list("ticket_id", flat=True)), [ticket_id])
+        self.assertIn(f"Kitambulisho: {ticket_id}\n", sent[0].text)
+        self.assertEqual(self.store.get("255700000001").context["ticket_id"], ticket_id)
+
+    def test_idle_session_is_reset_on_lookup_keeping_the_language(self):
+        self.store.save(sessions.Session("255700000001", flow.CHECK_DEPT, {"check_dept": "ardhi"}, "en"))
+        self.store.backend._sessions.get("255700000001").updated_at = timezone.now() - timedelta(minutes=11)
+        session = self.store.get("255700000001")
+        self.assertEqual((session.state, session.context, session.language), (flow.WELCOME, {}, "en"))
+
+
+def _text_payload(*messages):
+    """Webhook body with one text message per (phone, wamid, text)."""
+    return {"entry": [{"changes": [{"value": {"messages": [
+        {"from": phone, "id": wamid, "type": "text", "text": {"body": text}} for phone, wamid, text in messages
+    ]}}]}]}
+
+
+class InboundRedeliveryTests(TestCase):
+    def setUp(self):
+        inbound._seen_message_ids.clear()
+        self.sent = []
+        patcher = mock.patch.object(
+            inbound, "send_reply", lambda phone, reply, state="": self.sent.append((phone, state))
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_turn_is_processed_on_redelivery(self):
+        payload = _text_payload(("255700000001", "wamid.1", "hi"))
+        with mock.patch.object(inbound, "process_message", side_effect=RuntimeError("OpenAI down")):
+            with self.assertRaises(RuntimeError):
+                inbound.process_payload(payload)
+        self.assertFalse(ProcessedMessage.objects.exists())
+
+        inbound.process_payload(payload)  # Meta retries after our 500
+        inbound.process_payload(payload)  # ... and a later duplicate is dropped
+        self.assertEqual(self.sent, [("255700000001", flow.MAIN_MENU)])
+        self.assertTrue(ProcessedMessage.objects.filter(wamid="wamid.1").exists())
+
+    def test_session_conflict_leaves_the_message_unprocessed(self):
+        with mock.patch.object(inbound.session_store, "save", return_value=False):
+            with self.assertRaises(sessions.SessionConflict):
+                inbound.process_payload(_text_payload(("255700000001", "wamid.1", "hi")))
+        self.assertFalse(ProcessedMessage.objects.exists())
+        self.assertEqual(self.sent, [])
+
+    def test_requeued_event_is_replayed(self):
+        event = inbound.enqueue_payload(_text_payload(("255700000001", "wamid.1", "hi")))
+        self.assertEqual([e.pk for e in inbound.claim_events()], [event.pk])
+        # The worker that claimed it dies; after STALE_LOCK_SECONDS the event goes back to pending
+        InboundEvent.objects.filter(pk=event.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(inbound.requeue_stale(), 1)
+
+        self.assertEqual(inbound.drain_queue(), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, InboundEvent.STATUS_DONE)
+        self.assertEqual(self.sent, [("255700000001", flow.MAIN_MENU)])
+
+
+class InboundQueueTests(TestCase):
+    def test_claim_events_takes_due_pending_events_once(self):
+        first, later, second = (inbound.enqueue_payload(_text_payload()) for _ in range(3))
+        InboundEvent.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=1))
+        claimed = inbound.claim_events(batch_size=10)
+        self.assertEqual([e.pk for e in claimed], [first.pk, second.pk])
+        self.assertEqual({(e.status, e.attempts) for e in claimed}, {(InboundEvent.STATUS_PROCESSING, 1)})
+        self.assertEqual(inbound.claim_events(batch_size=10), [])
+
+    def test_requeue_stale_puts_back_only_old_claims(self):
+        old, recent, exhausted = (inbound.enqueue_payload(_text_payload()) for _ in range(3))
+        inbound.claim_events()
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        InboundEvent.objects.filter(pk__in=[old.pk, exhausted.pk]).update(locked_at=an_hour_ago)
+        InboundEvent.objects.filter(pk=exhausted.pk).update(attempts=inbound.INBOUND_MAX_ATTEMPTS)
+
+        self.assertEqual(inbound.requeue_stale(), 1)
+        statuses = dict(InboundEvent.objects.values_list("pk", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                old.pk: InboundEvent.STATUS_PENDING,
+                recent.pk: InboundEvent.STATUS_PROCESSING,
+                exhausted.pk: InboundEvent.STATUS_FAILED,
+            },
+        )
+
+    def test_failed_event_is_retried_with_backoff_then_marked_failed(self):
+        event = inbound.enqueue_payload(_text_payload())
+        with mock.patch.object(inbound, "process_payload", side_effect=RuntimeError("DB hiccup")), \
+                mock.patch.object(inbound, "INBOUND_MAX_ATTEMPTS", 3):
+            for attempt in range(1, 4):
+                [claimed] = inbound.claim_events()
+                self.assertFalse(inbound.process_event(claimed))
+                event.refresh_from_db()
+                self.assertEqual(event.attempts, attempt)
+                if attempt < 3:
+                    self.assertEqual(event.status, InboundEvent.STATUS_PENDING)
+                    self.assertGreater(event.next_attempt_at, timezone.now())
+                    self.assertEqual(inbound.claim_events(), [])  # not due yet
+                    event.next_attempt_at = timezone.now()
+                    event.save(update_fields=["next_attempt_at"])
+        self.assertEqual(event.status, InboundEvent.STATUS_FAILED)
+        self.assertIn("DB hiccup", event.error)
+        self.assertEqual(inbound.claim_events(), [])
+
+    def test_process_event_marks_success_done(self):
+        inbound.enqueue_payload(_text_payload())
+        [event] = inbound.claim_events()
+        with mock.patch.object(inbound, "process_payload") as process_payload:
+            self.assertTrue(inbound.process_event(event))
+        process_payload.assert_called_once_with(event.payload)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.error), (InboundEvent.STATUS_DONE, ""))
+        self.assertIsNotNone(event.processed_at)
+
+    @override_settings(WEBHOOK_MODE="queue")
+    def test_queue_mode_webhook_only_stores_payloads_with_messages(self):
+        statuses_only = {"entry": [{"changes": [{"value": {"statuses": [{"id": "wamid.0", "status": "read"}]}}]}]}
+        with mock.patch("chatbot.views.process_payload") as process_payload:
+            for body, status in (
+                (_text_payload(("255700000001", "wamid.1", "hi")), 200),
+                (statuses_only, 200),
+                ({"entry": "nope"}, 400),
+            ):
+                response = self.client.post("/webhook/", json.dumps(body), content_type="application/json")
+                self.assertEqual(response.status_code, status)
+            response = self.client.post("/webhook/", "{not json", content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+        process_payload.assert_not_called()
+        [event] = InboundEvent.objects.all()
+        self.assertEqual(event.status, InboundEvent.STATUS_PENDING)
+        self.assertEqual(event.payload["entry"][0]["changes"][0]["value"]["messages"][0]["id"], "wamid.1")
+
+
+class LanePoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = LanePool(2, name="test")
+        self.addCleanup(self.pool.shutdown)
+
+    def test_messages_of_one_phone_run_one_at_a_time_in_order(self):
+        ran = []
+        running = set()
+        overlaps = []
+
+        def turn(phone, n):
+            if phone in running:
+                overlaps.append((phone, n))
+            running.add(phone)
+            time.sleep(0.001)
+            ran.append((phone, n))
+            running.discard(phone)
+
+        futures = [self.pool.submit(phone, turn, phone, n) for n in range(20) for phone in ("A", "B", "C")]
+        for future in futures:
+            future.result(timeout=5)
+        for phone in ("A", "B", "C"):
+            self.assertEqual([n for p, n in ran if p == phone], list(range(20)))
+        self.assertEqual(overlaps, [])
+
+    def test_slow_phone_does_not_hold_back_other_phones(self):
+        release = threading.Event()
+        slow = self.pool.submit("A", release.wait, 5)
+        behind_slow = self.pool.submit("A", lambda: "A2")
+        # With hash-pinned lanes some of these phones would share A's lane and wait for it
+        others = [self.pool.submit(f"B{i}", lambda i=i: i) for i in range(10)]
+        self.assertEqual([f.result(timeout=2) for f in others], list(range(10)))
+        self.assertFalse(slow.done() or behind_slow.done())
+        self.assertTrue(self.pool.busy("A"))
+        release.set()
+        self.assertEqual(behind_slow.result(timeout=2), "A2")
+
+
+class QueueDispatcherTests(TestCase):
+    def test_other_phones_keep_flowing_while_one_turn_is_slow(self):
+        release = threading.Event()
+        handled = []
+
+        def handle_message(value, message):
+            if message["from"] == "255700000001":
+                release.wait(5)
+            handled.append(message["id"])
+
+        pool = LanePool(2, name="test")
+        self.addCleanup(pool.shutdown)
+        dispatcher = inbound.QueueDispatcher(pool, max_in_flight=5)
+        slow = inbound.enqueue_payload(_text_payload(("255700000001", "wamid.a1", "hi")))
+        first = inbound.enqueue_payload(_text_payload(("255700000002", "wamid.b1", "hi")))
+        with mock.patch.object(inbound, "handle_message", handle_message):
+            self.assertEqual(dispatcher.poll(), 2)
+            later = inbound.enqueue_payload(_text_payload(("255700000002", "wamid.b2", "menu")))
+            behind_slow = inbound.enqueue_payload(_text_payload(("255700000001", "wamid.a2", "0")))
+            # Claimed and run while the first turn of 255700000001 is still going
+            while dispatcher.in_flight > 2 or not InboundEvent.objects.filter(pk=later.pk, status="done").exists():
+                dispatcher.wait(0.05)
+                dispatcher.poll()
+            self.assertEqual(handled, ["wamid.b1", "wamid.b2"])
+            statuses = dict(InboundEvent.objects.values_list("pk", "status"))
+            self.assertEqual(statuses[first.pk], InboundEvent.STATUS_DONE)
+            self.assertEqual(statuses[slow.pk], InboundEvent.STATUS_PROCESSING)
+            self.assertEqual(statuses[behind_slow.pk], InboundEvent.STATUS_PROCESSING)
+
+            release.set()
+            while dispatcher.in_flight:
+                dispatcher.wait(0.05)
+                dispatcher.poll()
+        self.assertEqual(handled, ["wamid.b1", "wamid.b2", "wamid.a1", "wamid.a2"])
+        self.assertEqual(set(InboundEvent.objects.values_list("status", flat=True)), {InboundEvent.STATUS_DONE})
+
+
+class TicketIdTests(TestCase):
+    def test_ids_are_dated_and_sequential(self):
+        generate = tickets.TicketIdGenerator()
+        day = timezone.now().strftime("%y%m%d")
+        self.assertEqual([generate() for _ in range(3)], [f"DCT-{day}-0001", f"DCT-{day}-0002", f"DCT-{day}-0003"])
+
+    def test_generators_sharing_a_sequence_never_repeat_an_id(self):
+        # Separate generators stand for separate processes; blocks are reserved in the DB
+        first, second = tickets.TicketIdGenerator(block_size=5), tickets.TicketIdGenerator(block_size=5)
+        ids = [generate() for _ in range(7) for generate in (first, second)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(tickets.reserve_numbers(f"DCT-{timezone.now():%y%m%d}"), 21)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite's")
+class TicketQueryPlanTests(TestCase):
+    """The hot Ticket queries must stay index lookups: no full scan, no sort in a temp B-tree."""
+
+    def assertUsesIndex(self, qs, index):
+        plan = qs.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_track_list(self):
+        qs = Ticket.objects.track_list("255700000001", Ticket.TYPE_COMPLAINT)
+        self.assertUsesIndex(qs, "USING INDEX ticket_phone_type_created_idx (phone_number=? AND ticket_type=?)")
+
+    def test_dashboard_tabs(self):
+        self.assertUsesIndex(Ticket.objects.dashboard_tab(), "USING INDEX ticket_created_idx")
+        self.assertUsesIndex(
+            Ticket.objects.dashboard_tab(Ticket.TYPE_QUESTION), "USING INDEX ticket_type_created_idx (ticket_type=?)"
+        )
+
+    def test_lookup_by_ticket_id(self):
+        # The unique constraint's index (SQLite names it sqlite_autoindex_*); [:1] as in .first()
+        qs = Ticket.objects.lookup("DCT-260112-0001", Ticket.TYPE_QUESTION)[:1]
+        self.assertUsesIndex(qs, "(ticket_id=?)")
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return cls(2026, 1, 12, 8, 30)
+
+
+def _stub_web_search(question, lang="sw", deadline=None):
+    """Deterministic stand-in for the AI search: answers only questions about Chemba."""
+    if "chemba" in question.lower():
+        return f"[{lang}] Jibu kuhusu: {question}", True
+    return "", False
+
+
+def _stub_rewrite(header, body, lang="sw", deadline=None):
+    return f"[{lang}] {header}\n\n{body[:60]}"
+
+
+def _reply_dict(reply):
+    """Reply as recorded in the corpus: plain JSON, actions tagged with their type."""
+    data = dataclasses.asdict(reply)
+    data["buttons"] = [dataclasses.asdict(b) for b in reply.buttons]
+    data["actions"] = [{"type": type(a).__name__, **dataclasses.asdict(a)} for a in reply.actions]
+    return data
+
+
+def replay_conversation(conversation):
+    """
+    Run a scripted conversation through process_message with the AI, ticket ids and clock
+    stubbed, carrying state/context/language between turns like inbound.process_payload
+    (which also fills in the ids of created tickets, see inbound.run_reply_actions).
+    Returns one {"message", "state", "context", "reply"} dict per turn.
+    """
+    ids = iter(range(1, 1000))
+    state = conversation.get("state")
+    ctx = dict(conversation.get("context") or {})
+    lang = conversation.get("language", "sw")
+    turns = []
+    with mock.patch.object(flow, "answer_from_web_search", _stub_web_search), \
+            mock.patch.object(flow, "rewrite_info_answer", _stub_rewrite), \
+            mock.patch.object(flow, "datetime", _FrozenDatetime):
+        for turn in conversation["turns"]:
+            state, ctx, reply = flow.process_message(
+                state, ctx, lang, turn["message"], profile_name=conversation.get("profile_name") or None
+            )
+            for action in reply.actions:
+                if isinstance(action, replies.CreateTicket):
+                    ctx["ticket_id"] = f"DCT-260112-{next(ids):04d}"
+                    reply = reply.with_ticket_id(ctx["ticket_id"])
+            turns.append({"message": turn["message"], "state": state, "context": dict(ctx), "reply": _reply_dict(reply)})
+            if "language" in ctx:
+                lang = ctx["language"]
+    return turns
+
+
+class GoldenConversationTests(SimpleTestCase):
+    """
+    Recorded conversations (chatbot/testdata/golden_conversations.json) must replay exactly.
+    After an intended change of behaviour, re-record with
+    GOLDEN_RECORD=1 python manage.py test chatbot.tests.GoldenConversationTests
+    """
+
+    def test_conversations_replay_exactly(self):
+        corpus = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+        if os.environ.get("GOLDEN_RECORD"):
+            for conversation in corpus["conversations"]:
+                conversation["turns"] = replay_conversation(conversation)
+            GOLDEN_PATH.write_text(json.dumps(corpus, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+        for conversation in corpus["conversations"]:
+            with self.subTest(conversation=conversation["name"]):
+                self.assertEqual(replay_conversation(conversation), conversation["turns"])
+
+    def test_corpus_covers_every_state(self):
+        corpus = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+        seen = {c.get("state") or flow.WELCOME for c in corpus["conversations"]}
+        seen |= {t["state"] for c in corpus["conversations"] for t in c["turns"]}
+        self.assertEqual(set(flow.STATE_HANDLERS) - seen, set())
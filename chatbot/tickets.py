@@ -0,0 +1,62 @@
+# chatbot/tickets.py – ticket ids: DCT-YYMMDD-NNNN from a per-day sequence row in the DB
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TicketSequence
+
+TICKET_ID_PREFIX = "DCT"
+# Numbers reserved from the DB per round trip. 1 keeps ids strictly increasing across all
+# processes; a larger block serves ids from memory (still unique, ordered per process only).
+TICKET_ID_BLOCK_SIZE = max(1, int(getattr(settings, "TICKET_ID_BLOCK_SIZE", 1)))
+
+
+def reserve_numbers(prefix, count=1):
+    """
+    Atomically add `count` to the sequence of `prefix` and return the last number reserved,
+    so numbers last - count + 1 .. last belong to the caller. The conditional UPDATE locks
+    the row, so concurrent processes never get the same number.
+    """
+    with transaction.atomic():
+        if not TicketSequence.objects.filter(prefix=prefix).update(last=F("last") + count):
+            try:
+                with transaction.atomic():
+                    TicketSequence.objects.create(prefix=prefix, last=count)
+                return count
+            except IntegrityError:
+                # Another process created the row first: take ours from it
+                TicketSequence.objects.filter(prefix=prefix).update(last=F("last") + count)
+        return TicketSequence.objects.filter(prefix=prefix).values_list("last", flat=True).get()
+
+
+class TicketIdGenerator:
+    """
+    Ids like DCT-260112-0042: the UTC day and its sequence number (at least 4 digits), short
+    enough to type back and sorting by creation time. Ticket.ticket_id is unique in the DB too.
+    """
+
+    def __init__(self, prefix=TICKET_ID_PREFIX, block_size=TICKET_ID_BLOCK_SIZE):
+        self.prefix = prefix
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._day = None
+        self._next = self._end = 0
+
+    def __call__(self):
+        day = f"{self.prefix}-{timezone.now():%y%m%d}"
+        if self.block_size == 1:
+            return f"{day}-{reserve_numbers(day):04d}"
+        with self._lock:
+            if day != self._day or self._next > self._end:
+                self._end = reserve_numbers(day, self.block_size)
+                self._next = self._end - self.block_size + 1
+                self._day = day
+            number = self._next
+            self._next += 1
+        return f"{day}-{number:04d}"
+
+
+next_ticket_id = TicketIdGenerator()
@@ -1,10 +1,51 @@
 # chatbot/utils.py
+import hashlib
+import mimetypes
 import re
-import requests
+from pathlib import Path
+from urllib.parse import urlparse
 from django.conf import settings
+from django.core.cache import cache
+from .http_client import get_session
+from .models import OutboundMessage
 
 PHONE_ID = settings.WHATSAPP_PHONE_ID
 ACCESS_TOKEN = settings.WHATSAPP_ACCESS_TOKEN
+GRAPH_API_URL = getattr(settings, "WHATSAPP_GRAPH_URL", "https://graph.facebook.com/v21.0")
+# Keep-alive pool shared by all sends in this worker process; (connect, read) timeouts in seconds
+HTTP_POOL_SIZE = getattr(settings, "WHATSAPP_HTTP_POOL_SIZE", 10)
+HTTP_TIMEOUT = (
+    getattr(settings, "WHATSAPP_CONNECT_TIMEOUT", 3.05),
+    getattr(settings, "WHATSAPP_READ_TIMEOUT", 15),
+)
+
+
+# Meta keeps uploaded media for 30 days; re-upload a little before that
+MEDIA_ID_TTL_SECONDS = getattr(settings, "WHATSAPP_MEDIA_ID_TTL_SECONDS", 29 * 24 * 3600)
+# When True, sends are stored in the outbox and delivered by `manage.py send_outbox`
+OUTBOX_ENABLED = getattr(settings, "WHATSAPP_OUTBOX", False)
+
+
+def _messages_url():
+    return f"{GRAPH_API_URL}/{PHONE_ID}/messages"
+
+
+def _graph_post(url, payload):
+    """POST a JSON payload to the Graph API over the pooled keep-alive session."""
+    session = get_session("graph", HTTP_POOL_SIZE)
+    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}", "Content-Type": "application/json"}
+    return session.post(url, headers=headers, json=payload, timeout=HTTP_TIMEOUT)
+
+
+def _queue_outbound(to, payload):
+    """Store a message in the outbox instead of sending it now. Returns {"queued": <outbox id>}."""
+    msg = OutboundMessage.objects.create(to=to, payload=payload)
+    print("📥 Queued", payload.get("type"), "message to=" + to, "| outbox id:", msg.pk)
+    return {"queued": msg.pk}
+
+
+# WhatsApp limit for the body text of an interactive message
+INTERACTIVE_BODY_MAX_CHARS = 1024
 
 
 def _normalize_phone(to):
@@ -29,16 +70,16 @@ def send_message(to, text):
         print("📤 Message skipped: empty text")
         return {"error": "empty_text"}
 
-    url = f"https://graph.facebook.com/v21.0/{PHONE_ID}/messages"
-    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}", "Content-Type": "application/json"}
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
         "type": "text",
         "text": {"body": (text or "").strip()},
     }
+    if OUTBOX_ENABLED:
+        return _queue_outbound(to, payload)
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=15)
+        r = _graph_post(_messages_url(), payload)
         data = r.json() if r.text else {}
         print("📤 Message sent:", r.status_code, "to=" + to, "response:", data.get("messages") or data.get("error") or r.text[:200])
         if r.status_code != 200:
@@ -50,10 +91,11 @@ def send_message(to, text):
         return {"error": str(e)}
 
 
-def send_image_with_caption(to, image_path, caption):
+def send_image_with_caption(to, image_path, caption, media_id=None):
     """
     Send a WhatsApp image with optional caption.
-    image_path: path to local file (e.g. logo.png).
+    image_path: image URL (sent by link) or path to a local file (uploaded once, then sent by media id).
+    media_id: send an already-uploaded media id instead of image_path.
     caption: text under the image (max 1024 chars; can be empty).
     Returns API response dict or {"error": "..."} on failure.
     """
@@ -61,20 +103,24 @@ def send_image_with_caption(to, image_path, caption):
     if not to:
         print("📤 Image skipped: no valid phone number")
         return {"error": "no_phone"}
-    url_send = f"https://graph.facebook.com/v21.0/{PHONE_ID}/messages"
-    headers_send = {"Authorization": f"Bearer {ACCESS_TOKEN}", "Content-Type": "application/json"}
-    # If image_path is a URL, send by link; otherwise you could extend this to upload media.
-    if not image_path or not str(image_path).strip():
-        print("📤 Image skipped: no image URL/path provided")
-        return {"error": "no_image"}
-    image_source = str(image_path).strip()
     image_obj = {}
-    if image_source.startswith("http://") or image_source.startswith("https://"):
-        image_obj["link"] = image_source
+    if media_id:
+        image_source = f"media:{media_id}"
+        image_obj["id"] = media_id
     else:
-        # For now we only support sending by URL (no local upload in this helper).
-        print("📤 Image skipped: only URL is supported in image_path right now ->", image_source)
-        return {"error": "unsupported_image_source"}
+        if not image_path or not str(image_path).strip():
+            print("📤 Image skipped: no image URL/path provided")
+            return {"error": "no_image"}
+        image_source = str(image_path).strip()
+        if image_source.startswith("http://") or image_source.startswith("https://"):
+            image_obj["link"] = image_source
+        else:
+            # Local file: upload through the media endpoint (cached) and send by id
+            local_id = get_media_id(image_source)
+            if not local_id:
+                print("📤 Image skipped: could not upload local image ->", image_source)
+                return {"error": "media_upload_failed"}
+            image_obj["id"] = local_id
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
@@ -83,9 +129,11 @@ def send_image_with_caption(to, image_path, caption):
     }
     if caption and str(caption).strip():
         payload["image"]["caption"] = (str(caption).strip()[:1024])
+    if OUTBOX_ENABLED:
+        return _queue_outbound(to, payload)
     try:
-        print("📤 Sending logo image to", to, "| link:", image_source[:60] + "...")
-        r = requests.post(url_send, headers=headers_send, json=payload, timeout=15)
+        print("📤 Sending logo image to", to, "| source:", image_source[:60] + "...")
+        r = _graph_post(_messages_url(), payload)
         data = r.json() if r.text else {}
         if r.status_code == 200 and data.get("messages"):
             print("✅ Logo image sent successfully to", to, "| message_id:", data.get("messages", [{}])[0].get("id", ""))
@@ -98,6 +146,127 @@ def send_image_with_caption(to, image_path, caption):
         return {"error": str(e)}
 
 
+def _media_cache_key(source):
+    digest = hashlib.sha1(f"{PHONE_ID}|{source}".encode("utf-8")).hexdigest()
+    return f"wa_media_id:{digest}"
+
+
+def _media_source_key(media_id):
+    return f"wa_media_source:{media_id}"
+
+
+def media_source(media_id):
+    """Image URL/path a media id was uploaded from (None if unknown), to re-upload it."""
+    return cache.get(_media_source_key(media_id)) if media_id else None
+
+
+def is_media_id_error(result):
+    """
+    True if a send failed because Meta cannot use the media id (expired, deleted or unknown),
+    the only failure a re-upload fixes. Timeouts and recipient errors are not.
+    """
+    err = (result or {}).get("error")
+    if not isinstance(err, dict):
+        return False
+    if err.get("code") == 131053:  # media upload error
+        return True
+    details = f"{err.get('message', '')} {(err.get('error_data') or {}).get('details', '')}".lower()
+    return err.get("code") == 100 and ("media" in details or "['id']" in details)
+
+
+def upload_media(source):
+    """
+    Upload an image to the WhatsApp media endpoint. `source` is a URL (downloaded first)
+    or a local file path. Returns the media id, or None on failure.
+    """
+    session = get_session("graph", HTTP_POOL_SIZE)
+    try:
+        if source.startswith("http://") or source.startswith("https://"):
+            # Own pool: fetching from another host must not evict the Graph keep-alive connection
+            resp = get_session("media", 1).get(source, timeout=HTTP_TIMEOUT)
+            resp.raise_for_status()
+            content = resp.content
+            mime_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
+        else:
+            content = Path(source).read_bytes()
+            mime_type = ""
+        filename = Path(urlparse(source).path).name or "image"
+        mime_type = mime_type or mimetypes.guess_type(filename)[0] or "image/jpeg"
+        r = session.post(
+            f"{GRAPH_API_URL}/{PHONE_ID}/media",
+            headers={"Authorization": f"Bearer {ACCESS_TOKEN}"},
+            data={"messaging_product": "whatsapp", "type": mime_type},
+            files={"file": (filename, content, mime_type)},
+            timeout=HTTP_TIMEOUT,
+        )
+        data = r.json() if r.text else {}
+        if r.status_code == 200 and data.get("id"):
+            print("🖼️ Media uploaded:", filename, "| media_id:", data["id"])
+            return data["id"]
+        print("❌ Media upload failed:", r.status_code, data.get("error") or r.text[:200])
+    except Exception as e:
+        print("❌ Media upload exception:", source[:60], "|", e)
+    return None
+
+
+def get_media_id(source, refresh=False):
+    """
+    Media id for an image, uploading it only when the shared cache has no live id
+    (ids are cached for MEDIA_ID_TTL_SECONDS across all workers). refresh=True forces a re-upload.
+    """
+    key = _media_cache_key(source)
+    if not refresh:
+        media_id = cache.get(key)
+        if media_id:
+            return media_id
+    media_id = upload_media(source)
+    if media_id:
+        cache.set(key, media_id, MEDIA_ID_TTL_SECONDS)
+        cache.set(_media_source_key(media_id), source, MEDIA_ID_TTL_SECONDS)
+    else:
+        cache.delete(key)
+    return media_id
+
+
+def replacement_media_id(source, rejected_id):
+    """
+    Media id to use after Meta rejected `rejected_id`: the cached one if another send already
+    re-uploaded the image, otherwise a fresh upload (one upload however many sends hit the error).
+    """
+    media_id = cache.get(_media_cache_key(source))
+    if media_id and media_id != rejected_id:
+        return media_id
+    return get_media_id(source, refresh=True)
+
+
+def send_logo_with_caption(to, caption):
+    """
+    Send the welcome logo (settings.LOGO_URL) with a caption by cached media id, so Meta does
+    not re-fetch the image for every welcome. Only a send rejected for its media id is repeated,
+    once, with a re-uploaded image; if media upload is unavailable the image is sent by link.
+    Other failures (timeouts, recipient errors) are returned as they are: the image may have
+    been delivered, and sending it again would duplicate the welcome.
+
+    With the outbox enabled this only queues the message; outbox.deliver re-uploads an
+    expired media id when Meta rejects it.
+    """
+    logo = getattr(settings, "LOGO_URL", None)
+    if not logo:
+        return {"error": "no_image"}
+    media_id = get_media_id(logo)
+    if media_id:
+        result = send_image_with_caption(to, None, caption, media_id=media_id)
+        if not is_media_id_error(result):
+            return result
+        print("🔁 Cached logo media id rejected; re-uploading")
+        media_id = replacement_media_id(logo, media_id)
+        if media_id:
+            result = send_image_with_caption(to, None, caption, media_id=media_id)
+            if not is_media_id_error(result):
+                return result
+    return send_image_with_caption(to, logo, caption)
+
+
 def send_interactive_buttons(to, body_text, buttons):
     """
     Send WhatsApp interactive message with reply buttons (max 3, title max 20 chars).
@@ -121,20 +290,20 @@ def send_interactive_buttons(to, body_text, buttons):
         action_buttons.append({"type": "reply", "reply": {"id": bid or title, "title": title}})
     if not action_buttons:
         return {"error": "no_buttons"}
-    url = f"https://graph.facebook.com/v21.0/{PHONE_ID}/messages"
-    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}", "Content-Type": "application/json"}
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
         "type": "interactive",
         "interactive": {
             "type": "button",
-            "body": {"text": (body_text or "").strip()[:1024]},
+            "body": {"text": (body_text or "").strip()[:INTERACTIVE_BODY_MAX_CHARS]},
             "action": {"buttons": action_buttons},
         },
     }
+    if OUTBOX_ENABLED:
+        return _queue_outbound(to, payload)
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=15)
+        r = _graph_post(_messages_url(), payload)
         data = r.json() if r.text else {}
         if r.status_code != 200:
             print("❌ Interactive buttons failed to", to, "|", data.get("error"))
@@ -142,3 +311,19 @@ def send_interactive_buttons(to, body_text, buttons):
     except Exception as e:
         print("❌ Interactive buttons exception to", to, "|", e)
         return {"error": str(e)}
+
+
+def send_text_with_buttons(to, text, buttons, prompt, merge_prompt=True):
+    """
+    Send a reply followed by reply buttons using as few API calls as possible.
+    If the text (plus `prompt` when merge_prompt is True) fits the interactive body limit,
+    it goes out as ONE interactive message; otherwise the text is sent first and the
+    buttons follow in a second message under `prompt`.
+    Returns the API response dict of the last send.
+    """
+    text = (text or "").strip()
+    body = f"{text}\n\n{prompt}" if merge_prompt and prompt and text else (text or prompt)
+    if body and len(body) <= INTERACTIVE_BODY_MAX_CHARS:
+        return send_interactive_buttons(to, body, buttons)
+    send_message(to, text)
+    return send_interactive_buttons(to, prompt, buttons)